@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Compares the memory held by the Board object model against the previous
+__dict__ based classes for a large synthetic board.
+
+    python -m benchmarks.memory --lanes 50 --cards 1000
+"""
+import argparse
+import sys
+
+from lucky.board import Board, extract_mapping
+from lucky.config import Config
+
+from .synthetic import make_board
+
+
+class DictBoard(object):
+
+    def __init__(self, config, data):
+        self.config = config
+        self.id = data["Id"]
+        self.title = data["Title"]
+        self.description = data["Description"]
+        self.active = data["Active"]
+        self.lanes = [DictLane(config, lane) for lane in data["Lanes"]]
+        self.card_types = extract_mapping(data["CardTypes"])
+
+
+class DictLane(object):
+
+    def __init__(self, config, data):
+        self.id = data["Id"]
+        self.title = data["Title"]
+        self.index = data["Index"]
+        self.card_limit = data["CardLimit"]
+        self.cards = [DictCard(config, card) for card in data["Cards"]]
+
+
+class DictCard(object):
+
+    def __init__(self, config, data):
+        self.config = config
+        self.id = data["Id"]
+        self.title = data["Title"]
+        self.type_id = data["TypeId"]
+        self.assigned_user = data["AssignedUserName"]
+
+
+def object_size(obj):
+    """
+    Size of an object and its instance dictionary, excluding the values it
+    refers to.
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def model_size(board):
+    """
+    Total size of the board, lane and card objects and the lists holding
+    them.
+    """
+    total = object_size(board) + sys.getsizeof(board.lanes)
+    for lane in board.lanes:
+        total += object_size(lane) + sys.getsizeof(lane.cards)
+        for card in lane.cards:
+            total += object_size(card)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lanes", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=1000,
+                        help="cards per lane")
+    args = parser.parse_args(argv)
+
+    config = Config("benchmark", "benchmark@example.com", "password")
+    data = make_board(1, args.lanes, args.cards)
+    cards = args.lanes * args.cards
+
+    legacy = model_size(DictBoard(config, data))
+    compact = model_size(Board.create_from_board_json(config, data))
+    print("cards:        %d" % cards)
+    print("dict model:   %d bytes (%.1f per card)" % (
+        legacy, float(legacy) / cards))
+    print("slots model:  %d bytes (%.1f per card)" % (
+        compact, float(compact) / cards))
+    print("reduction:    %.1f%%" % (100.0 * (legacy - compact) / legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+A local stand-in for the LeanKit API, serving synthetic boards.
+
+    python -m benchmarks.server --port 8000 --boards 5 --lanes 20 --cards 500
+
+Point lucky at it with LK_BASE_URL=http://localhost:8000/Kanban/API/
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+from .synthetic import (
+    make_board, make_board_summaries, make_identifiers, reply)
+
+API_PATH = "/Kanban/API/"
+
+ROUTES = [
+    (re.compile(r"^Boards$"), "summaries"),
+    (re.compile(r"^Boards/(\d+)$"), "board"),
+    (re.compile(r"^Boards/(\d+)/GetBoardIdentifiers$"), "identifiers"),
+]
+
+
+class SyntheticAPI(object):
+    """
+    Renders the responses for boards of lanes * cards_per_lane cards,
+    numbered from 1.
+
+    Each response is only rendered once, so that the server doesn't add the
+    time taken to generate it to every request.
+    """
+
+    def __init__(self, boards=3, lanes=10, cards_per_lane=100, users=10):
+        self.boards = boards
+        self.lanes = lanes
+        self.cards_per_lane = cards_per_lane
+        self.users = users
+        self._rendered = {}
+        self._lock = threading.Lock()
+
+    def summaries(self):
+        return make_board_summaries(self.boards)[0]
+
+    def board(self, board_id):
+        return make_board(
+            board_id, self.lanes, self.cards_per_lane, self.users)
+
+    def identifiers(self, board_id):
+        return make_identifiers(board_id, self.lanes, self.users)
+
+    def render(self, path):
+        """
+        Returns the JSON body for the API path, or None if there's no such
+        resource.
+        """
+        with self._lock:
+            if path in self._rendered:
+                return self._rendered[path]
+        for pattern, name in ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            board_ids = [int(board_id) for board_id in match.groups()]
+            if any(not 1 <= board_id <= self.boards
+                   for board_id in board_ids):
+                return
+            body = json.dumps(reply(getattr(self, name)(*board_ids)))
+            with self._lock:
+                self._rendered[path] = body
+            return body
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    # Send the headers and body together rather than a write per line.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        body = None
+        if self.path.startswith(API_PATH):
+            body = server.api.render(self.path[len(API_PATH):])
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+
+class FakeLeanKitServer(object):
+    """
+    Serves a SyntheticAPI over HTTP from a background thread.
+
+        with FakeLeanKitServer(SyntheticAPI(boards=5)) as server:
+            config = Config("bench", "bench@example.com", "password",
+                            base_url=server.base_url)
+
+    latency is a delay in seconds added to every request.
+    """
+
+    def __init__(self, api=None, host="127.0.0.1", port=0, latency=0):
+        self.api = api or SyntheticAPI()
+        self.httpd = _ThreadingHTTPServer((host, port), RequestHandler)
+        self.httpd.api = self.api
+        self.httpd.latency = latency
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://%s:%d%s" % (host, port, API_PATH)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--boards", type=int, default=3)
+    parser.add_argument("--lanes", type=int, default=10)
+    parser.add_argument("--cards", type=int, default=100,
+                        help="cards per lane")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="seconds to delay each request")
+    args = parser.parse_args(argv)
+
+    api = SyntheticAPI(args.boards, args.lanes, args.cards)
+    server = FakeLeanKitServer(api, args.host, args.port, args.latency)
+    print("Serving on %s" % server.base_url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Measures how long the lucky command takes to start, by timing fresh
+interpreters parsing command-lines that don't need the network.
+
+    python -m benchmarks.startup --runs 20
+"""
+import argparse
+import subprocess
+import sys
+import time
+from os.path import abspath, dirname
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+COMMANDS = [
+    ("python", ["-c", "pass"]),
+    ("lucky --help", ["-c", "from lucky.scripts import main; main()",
+                      "--help"]),
+    ("import lucky.board", ["-c", "import lucky.board"]),
+    ("import requests", ["-c", "import requests"]),
+]
+
+
+def median_time(args, runs):
+    times = []
+    for i in range(runs):
+        start = time.time()
+        with open("/dev/null", "w") as devnull:
+            subprocess.call([sys.executable] + args, cwd=ROOT,
+                            stdout=devnull, stderr=devnull)
+        times.append(time.time() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+    for name, command in COMMANDS:
+        milliseconds = median_time(command, args.runs) * 1000
+        print("%-20s %7.1f ms" % (name, milliseconds))
+
+
+if __name__ == "__main__":
+    main()
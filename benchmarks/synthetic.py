@@ -0,0 +1,107 @@
+"""
+Generates synthetic LeanKit API payloads of configurable size.
+"""
+CARD_TYPES = ["Task", "Feature", "Improvement", "Defect"]
+
+
+def card_type_id(board_id, index):
+    return board_id * 100 + index
+
+
+def user_name(index):
+    return "user%d@example.com" % index
+
+
+def make_card(board_id, lane_id, card_id, index, users=10):
+    type_index = card_id % len(CARD_TYPES)
+    user_index = card_id % users
+    return {
+        "Id": card_id,
+        "LaneId": lane_id,
+        "Title": "Synthetic card %d" % card_id,
+        "Description": "",
+        "TypeId": card_type_id(board_id, type_index),
+        "TypeName": CARD_TYPES[type_index],
+        "Priority": 1,
+        "Index": index,
+        "Version": 1,
+        "AssignedUserId": user_index,
+        "AssignedUserName": user_name(user_index),
+        "IsBlocked": False,
+        "BlockReason": "",
+        "ExternalSystemName": "",
+        "ExternalSystemUrl": "",
+        "Tags": "",
+    }
+
+
+def make_board(board_id, lanes=10, cards_per_lane=100, users=10):
+    """
+    Returns the ReplyData for a board with lanes * cards_per_lane cards.
+    """
+    lane_data = []
+    for lane_index in range(lanes):
+        lane_id = board_id * 1000 + lane_index
+        first_card = board_id * 10000000 + lane_index * cards_per_lane
+        lane_data.append({
+            "Id": lane_id,
+            "Index": lane_index,
+            "Active": True,
+            "Title": "Lane %d" % lane_index,
+            "CardLimit": 0,
+            "Cards": [
+                make_card(board_id, lane_id, first_card + i, i, users)
+                for i in range(cards_per_lane)],
+        })
+    return {
+        "Id": board_id,
+        "Title": "Synthetic board %d" % board_id,
+        "Description": "Board with %d lanes of %d cards" % (
+            lanes, cards_per_lane),
+        "Version": 1,
+        "Active": True,
+        "Lanes": lane_data,
+        "CardTypes": [
+            {"Id": card_type_id(board_id, i), "Name": name}
+            for i, name in enumerate(CARD_TYPES)],
+        "BoardUsers": [
+            {"Id": i, "UserName": user_name(i), "FullName": "User %d" % i}
+            for i in range(users)],
+    }
+
+
+def make_board_summaries(boards):
+    """
+    Returns the ReplyData for the list of boards.
+    """
+    return [[{
+        "Id": board_id,
+        "Title": "Synthetic board %d" % board_id,
+        "Description": "",
+        "IsArchived": False,
+        "CreationDate": "08/19/2009"} for board_id in range(1, boards + 1)]]
+
+
+def make_identifiers(board_id, lanes=10, users=10):
+    """
+    Returns the ReplyData for the identifiers of a synthetic board.
+    """
+    return {
+        "BoardId": board_id,
+        "CardTypes": [
+            {"Id": card_type_id(board_id, i), "Name": name}
+            for i, name in enumerate(CARD_TYPES)],
+        "BoardUsers": [
+            {"Id": i, "Name": user_name(i)} for i in range(users)],
+        "Lanes": [
+            {"Id": board_id * 1000 + i, "Name": "Lane %d" % i}
+            for i in range(lanes)],
+        "ClassesOfService": [],
+        "Priorities": [
+            {"Id": i, "Name": name}
+            for i, name in enumerate(["Low", "Normal", "High", "Critical"])],
+    }
+
+
+def reply(data):
+    return {"ReplyCode": 200, "ReplyText": "OK", "ReplyData": [data]}
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Measures the throughput and latency of the Boards API and the lucky
+subcommands against a local fake LeanKit server serving synthetic boards.
+
+    python -m benchmarks.throughput --boards 5 --lanes 20 --cards 500
+
+Each run is appended to the results file, and compared with the last run
+recorded with the same parameters.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+from os.path import abspath, dirname, join
+
+from lucky.board import Boards
+from lucky.config import Config
+from lucky.transport import RateLimiter, Transport
+
+from .server import FakeLeanKitServer, SyntheticAPI
+
+ROOT = dirname(dirname(abspath(__file__)))
+DEFAULT_RESULTS = join(ROOT, "benchmarks", "results.jsonl")
+
+CLI = ["-c", "from lucky.scripts import main; main()", "--no-cache"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(name, function, runs, concurrency=1):
+    """
+    Calls function runs times from concurrency threads, and returns the
+    requests per second and latencies in milliseconds.
+    """
+    def timed(i):
+        start = time.time()
+        function()
+        return time.time() - start
+
+    # Warm up the connection pool and the server's rendered responses.
+    function()
+    pool = ThreadPool(concurrency)
+    try:
+        start = time.time()
+        latencies = pool.map(timed, range(runs))
+        elapsed = time.time() - start
+    finally:
+        pool.close()
+        pool.join()
+    return {
+        "name": name,
+        "runs": runs,
+        "concurrency": concurrency,
+        "per_second": runs / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def library_cases(boards):
+    """
+    Returns (name, function) for each of the Boards calls to measure.
+    """
+    def get_identifiers():
+        # Measure the request rather than the cache.
+        boards.invalidate_identifiers()
+        boards.get_identifiers(1)
+
+    return [
+        ("Boards.list", lambda: list(boards.list())),
+        ("Boards.get", lambda: boards.get(1)),
+        ("Boards.get(stream=True)", lambda: boards.get(1, stream=True)),
+        ("Boards.get(lazy_cards=True)",
+         lambda: boards.get(1, lazy_cards=True)),
+        ("Boards.get_identifiers", get_identifiers),
+    ]
+
+
+def cli_cases(base_url):
+    """
+    Returns (name, function) for each of the subcommands to measure, each
+    run in a fresh interpreter.
+    """
+    env = dict(os.environ, LK_ACCOUNT="benchmark",
+               LK_EMAIL="benchmark@example.com", LK_PASSWORD="password",
+               LK_BASE_URL=base_url)
+
+    def command(*args):
+        def run():
+            with open(os.devnull, "w") as devnull:
+                subprocess.check_call(
+                    [sys.executable] + CLI + list(args), cwd=ROOT, env=env,
+                    stdout=devnull)
+        return run
+
+    return [
+        ("lucky list-boards", command("list-boards")),
+        ("lucky show-board", command("show-board", "1")),
+        ("lucky show-cards", command("show-cards", "1", "1000")),
+    ]
+
+
+def git_revision():
+    try:
+        with open(os.devnull, "w") as devnull:
+            return subprocess.check_output(
+                ["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_run(runs, parameters):
+    """
+    Returns the last of the runs made with the same parameters, or None.
+    """
+    for run in reversed(runs):
+        if run["parameters"] == parameters:
+            return run
+
+
+def report(results, previous=None, output=sys.stdout):
+    before = {}
+    if previous is not None:
+        before = dict((result["name"], result)
+                      for result in previous["results"])
+    output.write("%-30s %6s %10s %9s %9s %9s %8s\n" % (
+        "", "runs", "per sec", "p50 ms", "p95 ms", "max ms", "change"))
+    for result in results:
+        change = ""
+        if result["name"] in before:
+            change = "%+.1f%%" % (100.0 * (
+                result["p50_ms"] / before[result["name"]]["p50_ms"] - 1))
+        output.write("%-30s %6d %10.1f %9.2f %9.2f %9.2f %8s\n" % (
+            result["name"], result["runs"], result["per_second"],
+            result["p50_ms"], result["p95_ms"], result["max_ms"], change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boards", type=int, default=3)
+    parser.add_argument("--lanes", type=int, default=10)
+    parser.add_argument("--cards", type=int, default=100,
+                        help="cards per lane")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--cli-runs", type=int, default=5,
+                        help="runs of each subcommand, 0 to skip them")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="seconds the server delays each request")
+    parser.add_argument("--results", default=DEFAULT_RESULTS,
+                        help="file the results are appended to")
+    parser.add_argument("--label", help="name for this run, e.g. a release")
+    args = parser.parse_args(argv)
+
+    parameters = {
+        "boards": args.boards, "lanes": args.lanes, "cards": args.cards,
+        "concurrency": args.concurrency, "latency": args.latency}
+    api = SyntheticAPI(args.boards, args.lanes, args.cards)
+    results = []
+    with FakeLeanKitServer(api, latency=args.latency) as server:
+        config = Config("benchmark", "benchmark@example.com", "password",
+                        base_url=server.base_url)
+        # Don't let the rate limiter hide the cost of the requests.
+        transport = Transport(rate_limiter=RateLimiter(rate=1e9, burst=1e9))
+        try:
+            for name, function in library_cases(
+                    Boards(config, transport=transport)):
+                results.append(
+                    measure(name, function, args.runs, args.concurrency))
+        finally:
+            transport.close()
+        if args.cli_runs:
+            for name, function in cli_cases(server.base_url):
+                results.append(measure(name, function, args.cli_runs))
+
+    run = {
+        "label": args.label,
+        "revision": git_revision(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "results": results,
+    }
+    report(results, previous_run(load_results(args.results), parameters))
+    with open(args.results, "a") as f:
+        f.write(json.dumps(run, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict, namedtuple
+from Queue import Queue
+
+from .board import Boards
+from .iterators import map_concurrently
+from .transport import DEFAULT_BURST, DEFAULT_RATE, RateLimiter, Transport
+
+AccountResult = namedtuple(
+    "AccountResult", ["account", "board_id", "board", "error"])
+
+# Marks the end of an account's results in the merged queue.
+_DONE = object()
+
+
+class MultiAccountBoards(object):
+    """
+    Fans Boards requests out across several LeanKit accounts concurrently,
+    merging the results into a single stream.
+
+        accounts = MultiAccountBoards(Config.load_all_from_homedir())
+        for result in accounts.list():
+            print result.account, result.board["title"]
+
+    Each account gets its own Transport, so its own connection pool and
+    RateLimiter, rather than sharing the default ones, and a slow or
+    failing account doesn't hold up the others.
+    """
+
+    def __init__(self, configs, max_workers=4, rate=DEFAULT_RATE,
+                 burst=DEFAULT_BURST):
+        self.max_workers = max_workers
+        self.rate = rate
+        self.burst = burst
+        self.accounts = OrderedDict()
+        for config in configs:
+            self.accounts[config.account] = Boards(
+                config, transport=self.create_transport(config))
+
+    def create_transport(self, config):
+        """
+        Returns the Transport for an account, with its own rate budget.
+        """
+        return Transport(rate_limiter=RateLimiter(self.rate, self.burst))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        for boards in self.accounts.values():
+            boards.transport.close()
+
+    def list(self):
+        """
+        Yields an AccountResult with the details of each board (see
+        Boards.list) in all the accounts, as they arrive from each account.
+
+        If listing an account's boards fails, an AccountResult with the error
+        is yielded, and the other accounts' boards are still listed.
+        """
+        queue = Queue()
+
+        def list_account(account, boards):
+            try:
+                for board in boards.list():
+                    queue.put(AccountResult(
+                        account, board["board_id"], board, None))
+            except Exception as e:
+                queue.put(AccountResult(account, None, None, e))
+            finally:
+                queue.put(_DONE)
+
+        for account, boards in self.accounts.items():
+            thread = threading.Thread(
+                target=list_account, args=(account, boards))
+            thread.daemon = True
+            thread.start()
+        remaining = len(self.accounts)
+        while remaining:
+            result = queue.get()
+            if result is _DONE:
+                remaining -= 1
+            else:
+                yield result
+
+    def get_many(self, board_ids, **kwargs):
+        """
+        Fetches boards from several accounts concurrently, board_ids is an
+        iterable of (account, board_id) pairs.
+
+        Yields an AccountResult for each board as soon as it has been
+        fetched, the keyword arguments are passed to Boards.get.
+        """
+        def fetch(item):
+            account, board_id = item
+            try:
+                board = self.accounts[account].get(board_id, **kwargs)
+                return AccountResult(account, board_id, board, None)
+            except Exception as e:
+                return AccountResult(account, board_id, None, e)
+
+        return map_concurrently(fetch, board_ids, self.max_workers)
@@ -0,0 +1,86 @@
+from multiprocessing.pool import ThreadPool
+
+from .board import Boards
+from .transport import Transport
+
+DEFAULT_CONCURRENCY = 10
+
+
+class AsyncBoards(object):
+    """
+    Non-blocking flavour of Boards.
+
+    Each method returns immediately with an AsyncResult, call .get() on it to
+    wait for the value. At most concurrency requests are in flight at once,
+    further requests are queued until a worker is free.
+
+        with AsyncBoards(config) as boards:
+            pending = [boards.get(board_id) for board_id in board_ids]
+            for board in AsyncBoards.gather(pending):
+                ...
+    """
+
+    def __init__(
+            self, config, concurrency=DEFAULT_CONCURRENCY, transport=None,
+            identifier_cache=None):
+        self.concurrency = concurrency
+        # A transport created here is closed along with the pool.
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = Transport(pool_maxsize=concurrency)
+        self.transport = transport
+        self.boards = Boards(
+            config, transport=transport, identifier_cache=identifier_cache)
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPool(self.concurrency)
+        return self._pool
+
+    def list(self):
+        """
+        Returns an AsyncResult for the list of board dictionaries returned by
+        Boards.list().
+        """
+        return self.pool.apply_async(lambda: list(self.boards.list()))
+
+    def get(self, board_id):
+        """
+        Returns an AsyncResult for the Board with the supplied id.
+        """
+        return self.pool.apply_async(self.boards.get, (board_id,))
+
+    def get_identifiers(self, board_id):
+        """
+        Returns an AsyncResult for the identifiers of the board with the
+        supplied id.
+        """
+        return self.pool.apply_async(self.boards.get_identifiers, (board_id,))
+
+    @staticmethod
+    def gather(results, timeout=None):
+        """
+        Waits for each of the results in turn and returns their values in
+        the same order, re-raising the first error encountered.
+        """
+        return [result.get(timeout) for result in results]
+
+    def close(self):
+        """
+        Waits for the outstanding requests to finish and stops the workers,
+        closing the transport's connections if it was created here.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._owns_transport:
+            self.transport.close()
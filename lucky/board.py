@@ -1,4 +1,20 @@
-import requests
+import json
+from collections import namedtuple
+
+from .cache import IdentifierCache
+from .errors import APIError, LuckyError, SUCCESS_REPLY_CODES
+from .instrument import count_objects
+from .iterators import batches, map_concurrently
+from .stream import iter_json
+from .transport import endpoint_for_url, get_default_transport
+
+CHUNK_SIZE = 64 * 1024
+
+BOARD_FIELDS = [
+    "Id", "Title", "Description", "Active", "Version", "CardTypes"]
+
+# The number of cards sent in each AddCards or UpdateCards request.
+DEFAULT_BATCH_SIZE = 100
 
 
 def dict_from_items(data, items):
@@ -12,60 +28,495 @@ def extract_mapping(items):
     return {t["Id"]: t["Name"]for t in items}
 
 
+def build_identifiers(data):
+    result = data[0]
+    response = {}
+    response["card_types"] = extract_mapping(result["CardTypes"])
+    response["users"] = extract_mapping(result["BoardUsers"])
+    response["lanes"] = extract_mapping(result["Lanes"])
+    response["classes_of_service"] = extract_mapping(
+        result["ClassesOfService"])
+    response["priorities"] = extract_mapping(result["Priorities"])
+    return response
+
+
+def endpoint_for_path(path):
+    return endpoint_for_url("/" + path)
+
+
+BoardResult = namedtuple("BoardResult", ["board_id", "board", "error"])
+CardResult = namedtuple("CardResult", ["card", "card_id", "error"])
+CardMove = namedtuple("CardMove", ["card_id", "lane_id", "position"])
+
+# The kinds of CardChange returned by Board.diff.
+CARD_ADDED = "added"
+CARD_REMOVED = "removed"
+CARD_MOVED = "moved"
+CARD_REASSIGNED = "reassigned"
+CARD_RETITLED = "retitled"
+CARD_TYPE_CHANGED = "type changed"
+
+# A change to a card, before and after are the cards for added and removed
+# cards, and the lane ids, users, titles or type ids for the other kinds.
+CardChange = namedtuple("CardChange", ["kind", "card_id", "before", "after"])
+
+CARD_FIELD_CHANGES = [
+    ("assigned_user", CARD_REASSIGNED),
+    ("title", CARD_RETITLED),
+    ("type_id", CARD_TYPE_CHANGED),
+]
+
+
 class Boards(object):
 
-    def __init__(self, config):
+    def __init__(
+            self, config, transport=None, identifier_cache=None,
+            snapshot=None, profiler=None):
         self.config = config
+        self.transport = transport or get_default_transport()
+        if identifier_cache is None:
+            identifier_cache = IdentifierCache()
+        self.identifier_cache = identifier_cache
+        self.snapshot = snapshot
+        self.profiler = profiler
+
+    def open_snapshot(self, path):
+        """
+        Serve boards from the snapshot file at path where they're in it, see
+        lucky.snapshot.SnapshotStore.
+        """
+        from .snapshot import SnapshotStore
+        self.snapshot = SnapshotStore(path, self.config)
+        return self.snapshot
+
+    def _start_timing(self, path):
+        if self.profiler is not None:
+            return self.profiler.start(path, endpoint_for_path(path))
+
+    def _get(self, path, timing=None, **kwargs):
+        """
+        Performs a GET request for the API path, raising an APIError if the
+        response has an HTTP error status.
+        """
+        url = self.config.get_url_for_path(path)
+        if timing is not None:
+            start = self.profiler.clock()
+        response = self.transport.get(
+            url, auth=(self.config.email, self.config.password), **kwargs)
+        if timing is not None:
+            timing.connect = self.profiler.clock() - start
+        self._check_status(url, response)
+        return response
+
+    def _check_status(self, url, response):
+        """
+        Raises an APIError if the response has an HTTP error status.
+        """
+        if response.status_code != 200:
+            reply_code = reply_text = None
+            try:
+                data = response.json()
+                reply_code, reply_text = data["ReplyCode"], data["ReplyText"]
+            except (ValueError, TypeError, KeyError):
+                pass
+            raise APIError(url, response.status_code, reply_code, reply_text)
+
+    def _post_reply(self, path, data=None):
+        """
+        POSTs data as JSON to the API path, and returns the ReplyData from
+        the response, raising an APIError if LeanKit reports an error.
+        """
+        url = self.config.get_url_for_path(path)
+        kwargs = {}
+        if data is not None:
+            kwargs["data"] = json.dumps(data)
+            kwargs["headers"] = {"Content-Type": "application/json"}
+        response = self.transport.post(
+            url, auth=(self.config.email, self.config.password), **kwargs)
+        self._check_status(url, response)
+        reply = response.json()
+        if reply["ReplyCode"] not in SUCCESS_REPLY_CODES:
+            raise APIError(
+                url, response.status_code, reply["ReplyCode"],
+                reply["ReplyText"])
+        return reply["ReplyData"]
+
+    def _get_reply(self, path, build=None):
+        """
+        Returns the ReplyData from the response for the API path, raising an
+        APIError if LeanKit reports an error.
+
+        If build is provided, it's called with the ReplyData and its result
+        is returned instead.
+        """
+        timing = self._start_timing(path)
+        if timing is None:
+            response = self._get(path)
+        else:
+            # Stream the response, so that the time until the headers arrive
+            # can be told apart from the time reading the body.
+            response = self._get(path, timing, stream=True)
+            start = self.profiler.clock()
+            timing.bytes = len(response.content)
+            timing.transfer = self.profiler.clock() - start
+            start = self.profiler.clock()
+        data = response.json()
+        if timing is not None:
+            timing.decode = self.profiler.clock() - start
+        if data["ReplyCode"] not in SUCCESS_REPLY_CODES:
+            raise APIError(
+                response.url, response.status_code, data["ReplyCode"],
+                data["ReplyText"])
+        result = data["ReplyData"]
+        if build is not None:
+            if timing is not None:
+                start = self.profiler.clock()
+            result = build(result)
+            if timing is not None:
+                timing.build = self.profiler.clock() - start
+                timing.objects = count_objects(result)
+        if timing is not None:
+            self.profiler.record(timing)
+        return result
+
+    def _timed_chunks(self, response, timing):
+        """
+        Yields the chunks of the response body, adding the time spent reading
+        them and their size to the timing.
+        """
+        chunks = response.iter_content(CHUNK_SIZE)
+        clock = self.profiler.clock
+        while True:
+            start = clock()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                timing.transfer += clock() - start
+                return
+            timing.transfer += clock() - start
+            timing.bytes += len(chunk)
+            yield chunk
+
+    def _stream(self, path, patterns, build=None):
+        """
+        Yields (path, value) for the parts of the response matching the
+        patterns as they're read from the network, see lucky.stream.iter_json.
+
+        If build is provided, it's called with each (path, value) and its
+        result is yielded instead.
 
-    def _get(self, path):
-        return requests.get(
-            self.config.get_url_for_path(path),
-            auth=(self.config.email, self.config.password))
+        Raises an APIError if LeanKit reports an error.
+        """
+        timing = self._start_timing(path)
+        response = self._get(path, timing, stream=True)
+        if timing is not None:
+            clock = self.profiler.clock
+            chunks = self._timed_chunks(response, timing)
+            active = 0.0
+            resumed = clock()
+        else:
+            chunks = response.iter_content(CHUNK_SIZE)
+        reply = {}
+        patterns = list(patterns) + [("ReplyCode",), ("ReplyText",)]
+        try:
+            for item in iter_json(chunks, patterns):
+                if item[0] in [("ReplyCode",), ("ReplyText",)]:
+                    reply[item[0][0]] = item[1]
+                    if reply.get("ReplyCode", 200) not in \
+                            SUCCESS_REPLY_CODES and "ReplyText" in reply:
+                        break
+                    continue
+                if build is not None:
+                    if timing is not None:
+                        start = clock()
+                    item = build(*item)
+                    if timing is not None:
+                        timing.build += clock() - start
+                        timing.objects += count_objects(item)
+                if timing is not None:
+                    active += clock() - resumed
+                yield item
+                if timing is not None:
+                    resumed = clock()
+        finally:
+            response.close()
+            if timing is not None:
+                active += clock() - resumed
+                timing.decode = max(
+                    0.0, active - timing.transfer - timing.build)
+                self.profiler.record(timing)
+        if reply.get("ReplyCode", 200) not in SUCCESS_REPLY_CODES:
+            raise APIError(
+                response.url, response.status_code, reply["ReplyCode"],
+                reply.get("ReplyText"))
 
     def list(self):
         """
         Yields dictionaries with details of each of the Boards in the
-        configured account.
+        configured account, as they're read from the response.
         """
-        response = self._get("Boards")
-        for data in response.json()["ReplyData"][0]:
-            yield {
+        def build(path, data):
+            return {
                 "board_id": data["Id"],
                 "title": data["Title"],
                 "description": data["Description"],
                 "is_archived": data["IsArchived"],
                 "created": self.config.parse_date(data["CreationDate"]).date()
             }
+        return self._stream("Boards", [("ReplyData", 0, "*")], build)
 
-    def get(self, board_id):
+    def get(self, board_id, lazy_cards=False, stream=False,
+            use_snapshot=True):
         """
         Fetch a board by id.
+
+        If lazy_cards is True, the cards in each lane are only built when
+        they're accessed.
+
+        If stream is True, the lanes are built as the response is read rather
+        than after parsing the whole response, so that the complete JSON
+        document is never held in memory.
+
+        If a snapshot is open and holds the board, it's read from there
+        instead, unless use_snapshot is False.
+        """
+        if use_snapshot and self.snapshot is not None:
+            board = self.snapshot.get(board_id)
+            if board is not None:
+                return board
+        if stream:
+            return self._get_streamed(board_id, lazy_cards)
+        return self._get_reply(
+            "Boards/%s" % board_id,
+            lambda data: Board.create_from_board_json(
+                self.config, data[0], lazy_cards))
+
+    def _get_streamed(self, board_id, lazy_cards):
+        data = {"Lanes": []}
+        patterns = [("ReplyData", 0, field) for field in BOARD_FIELDS]
+        patterns.append(("ReplyData", 0, "Lanes", "*"))
+
+        def build(path, value):
+            if path[2] == "Lanes":
+                return Lane.create_from_lane_json(
+                    self.config, value, lazy_cards)
+            data[path[2]] = value
+
+        lanes = [lane for lane in self._stream(
+            "Boards/%s" % board_id, patterns, build) if lane is not None]
+        board = Board.create_from_board_json(self.config, data)
+        board.lanes = lanes
+        return board
+
+    def iter_lanes(self, board_id, lazy_cards=False):
+        """
+        Yields the lanes of the board with the supplied id as they're read
+        from the response, without building the board.
+        """
+        return self._stream(
+            "Boards/%s" % board_id, [("ReplyData", 0, "Lanes", "*")],
+            lambda path, value: Lane.create_from_lane_json(
+                self.config, value, lazy_cards))
+
+    def get_many(self, board_ids, max_workers=4, ordered=False):
+        """
+        Fetch several boards concurrently.
+
+        Yields a BoardResult for each board as soon as it has been fetched, or
+        in the order of board_ids if ordered is True. If fetching a board
+        fails, the error is reported on its result and the remaining boards
+        are still fetched.
+        """
+        def fetch(board_id):
+            try:
+                return BoardResult(board_id, self.get(board_id), None)
+            except Exception as e:
+                return BoardResult(board_id, None, e)
+
+        return map_concurrently(fetch, board_ids, max_workers, ordered)
+
+    def _write_concurrently(self, send, batches, max_workers, ordered):
+        """
+        Calls send with each of the batches from max_workers threads, and
+        yields the CardResults it returns as each batch completes, or in the
+        order of the batches if ordered is True.
+
+        If a batch fails, each of its cards is reported with the error.
+        """
+        def write(batch):
+            try:
+                return send(batch)
+            except Exception as e:
+                return [CardResult(card, None, e) for card in batch]
+
+        for batch_results in map_concurrently(
+                write, batches, max_workers, ordered):
+            for result in batch_results:
+                yield result
+
+    def _cards_path(self, board_id, operation, wip_override_comment):
+        path = "Board/%s/%s" % (board_id, operation)
+        if wip_override_comment:
+            from urllib import urlencode
+            path += "?" + urlencode(
+                {"wipOverrideComment": wip_override_comment})
+        return path
+
+    def add_cards(self, board_id, cards, batch_size=DEFAULT_BATCH_SIZE,
+                  max_workers=4, ordered=False, wip_override_comment=None):
+        """
+        Adds the cards to the board, sending them in batches of up to
+        batch_size cards, with up to max_workers batches in flight at once.
+
+        cards are dictionaries in LeanKit's format, with at least "LaneId",
+        "Title" and "TypeId", see lucky.cards.card_json.
+
+        Yields a CardResult for each card, with the id of the new card or the
+        error that prevented the batch it was in from being added.
+        """
+        path = self._cards_path(board_id, "AddCards", wip_override_comment)
+
+        def send(batch):
+            added = self._post_reply(path, batch)[0] or []
+            results = [CardResult(card, created.get("Id"), None)
+                       for card, created in zip(batch, added)]
+            if len(added) < len(batch):
+                error = LuckyError(
+                    "LeanKit only reported adding %d of the %d cards in the "
+                    "batch" % (len(added), len(batch)))
+                results.extend(CardResult(card, None, error)
+                               for card in batch[len(added):])
+            return results
+
+        return self._write_concurrently(
+            send, batches(cards, batch_size), max_workers, ordered)
+
+    def update_cards(self, board_id, cards, batch_size=DEFAULT_BATCH_SIZE,
+                     max_workers=4, ordered=False, wip_override_comment=None):
+        """
+        Updates the cards on the board, in batches like add_cards.
+
+        Each card is a complete card dictionary including its "Id".
+
+        Yields a CardResult for each card. LeanKit only replies with the
+        number of cards updated, so if it's short, each card in the batch is
+        reported with an error.
+        """
+        path = self._cards_path(board_id, "UpdateCards", wip_override_comment)
+
+        def send(batch):
+            reply = self._post_reply(path, batch)[0] or {}
+            updated = reply.get("UpdatedCardsCount", len(batch))
+            error = None
+            if updated < len(batch):
+                error = LuckyError(
+                    "LeanKit only reported updating %d of the %d cards in "
+                    "the batch" % (updated, len(batch)))
+            return [CardResult(card, card["Id"], error) for card in batch]
+
+        return self._write_concurrently(
+            send, batches(cards, batch_size), max_workers, ordered)
+
+    def move_cards(self, board_id, moves, max_workers=4, ordered=False,
+                   wip_override_comment=None):
+        """
+        Moves cards to other lanes, moves are CardMoves or (card_id, lane_id,
+        position) tuples.
+
+        LeanKit doesn't have a multi-card move, so each card is moved with its
+        own request, with up to max_workers in flight at once.
+
+        Yields a CardResult for each move.
+        """
+        def send(batch):
+            move = batch[0]
+            self._post_reply(self._cards_path(
+                board_id, "MoveCard/%s/Lane/%s/Position/%s" % move,
+                wip_override_comment))
+            return [CardResult(move, move.card_id, None)]
+
+        moves = (CardMove(*move) for move in moves)
+        return self._write_concurrently(
+            send, batches(moves, 1), max_workers, ordered)
+
+    def get_newer_if_exists(self, board_id, version):
+        """
+        Fetch the board by id if there's a version newer than the one
+        provided, otherwise returns None.
+        """
+        data = self._get_reply(
+            "Board/%s/BoardVersion/%s/GetNewerIfExists" % (
+                board_id, version))[0]
+        if data is not None:
+            return Board.create_from_board_json(self.config, data)
+
+    def get_board_history_since(self, board_id, version):
+        """
+        Returns the list of events that have happened on the board since the
+        version provided.
+        """
+        return self._get_reply(
+            "Board/%s/BoardVersion/%s/GetBoardHistorySince" % (
+                board_id, version))[0]
+
+    def check_for_updates(self, board_id, version):
+        """
+        Returns a dictionary describing the changes to the board since the
+        version provided, with the keys "HasUpdates", "CurrentBoardVersion",
+        "Events", "RequiresRefesh" and "NewPayload".
+        """
+        return self._get_reply(
+            "Board/%s/BoardVersion/%s/CheckForUpdates" % (
+                board_id, version))[0]
+
+    def get_card_json(self, board_id, card_id):
         """
-        response = self._get("Boards/%s" % board_id)
-        return Board.create_from_board_json(
-            self.config,
-            response.json()["ReplyData"][0])
+        Returns the JSON for a single card on the board.
+        """
+        return self._get_reply(
+            "Board/%s/GetCard/%s" % (board_id, card_id))[0]
 
     def get_identifiers(self, board_id):
         """
         Returns a dictionary with the board identifiers
         as dictionaries for performing lookups on.
 
-        TODO: This should probably provide caching functionality.
-        """
-        response = self._get("Boards/%s/GetBoardIdentifiers" % board_id)
-        result = response.json()["ReplyData"][0]
-        response = {}
-        response["card_types"] = extract_mapping(result["CardTypes"])
-        response["users"] = extract_mapping(result["BoardUsers"])
-        response["lanes"] = extract_mapping(result["Lanes"])
-        response["classes_of_service"] = extract_mapping(
-            result["ClassesOfService"])
-        response["priorities"] = extract_mapping(result["Priorities"])
-        return response
+        The identifiers are cached in the identifier_cache, use
+        invalidate_identifiers to force them to be fetched again.
+        """
+        identifiers = self.identifier_cache.get(str(board_id))
+        if identifiers is None:
+            identifiers = self._fetch_identifiers(board_id)
+            self.identifier_cache.set(str(board_id), identifiers)
+        return identifiers
+
+    def invalidate_identifiers(self, board_id=None):
+        """
+        Drops the cached identifiers for board_id, or for all boards.
+        """
+        if board_id is not None:
+            board_id = str(board_id)
+        self.identifier_cache.invalidate(board_id)
+
+    def _fetch_identifiers(self, board_id):
+        return self._get_reply(
+            "Boards/%s/GetBoardIdentifiers" % board_id, build_identifiers)
 
 
 class Board(object):
+    """
+    A board and its lanes.
+
+    Lanes are indexed by id and title, and cards by id, user and type so that
+    lookups don't need to walk the lanes. The card indexes are built when
+    first needed. Use add_lane, add_card, move_card, update_card and
+    remove_card to change the board, or call reindex after changing the lanes
+    or cards directly.
+    """
+    __slots__ = [
+        "config", "id", "title", "description", "active", "version",
+        "_lanes", "card_types", "_lanes_by_id", "_lanes_by_title",
+        "_cards_by_id", "_card_lanes", "_cards_by_user", "_cards_by_type"]
 
     def __init__(self, config, board_id, title, description, active):
         self.config = config
@@ -73,48 +524,271 @@ class Board(object):
         self.title = title
         self.description = description
         self.active = active
+        self.version = None
         self.lanes = []
         self.card_types = {}
 
+    def __getstate__(self):
+        # The indexes are left out, they're rebuilt from the lanes.
+        return (self.config, self.id, self.title, self.description,
+                self.active, self.version, self._lanes, self.card_types)
+
+    def __setstate__(self, state):
+        (self.config, self.id, self.title, self.description, self.active,
+         self.version, lanes, self.card_types) = state
+        self.lanes = lanes
+
     @classmethod
-    def create_from_board_json(cls, config, data):
+    def create_from_board_json(cls, config, data, lazy_cards=False):
+        """
+        Creates a Board from the JSON, if lazy_cards is True, the cards in
+        each lane are only built when they're accessed.
+        """
         board = cls(
             config,
             data["Id"],
             data["Title"],
             data["Description"],
             data["Active"])
-        board.lanes = [Lane.create_from_lane_json(config, lane)
+        board.lanes = [Lane.create_from_lane_json(config, lane, lazy_cards)
                        for lane in data["Lanes"]]
         board.card_types = extract_mapping(data["CardTypes"])
+        board.version = data.get("Version")
         return board
 
+    def replace_with(self, other):
+        """
+        Replace the contents of this board with those of another, keeping
+        references to this board valid.
+        """
+        self.title = other.title
+        self.description = other.description
+        self.active = other.active
+        self.version = other.version
+        self.card_types = other.card_types
+        self.lanes = other.lanes
+
+    @property
+    def lanes(self):
+        return self._lanes
+
+    @lanes.setter
+    def lanes(self, lanes):
+        self._lanes = lanes
+        self.reindex()
+
+    def reindex(self):
+        """
+        Rebuild the lane indexes, and discard the card indexes so that they
+        are rebuilt on the next card lookup.
+        """
+        self._lanes_by_id = {}
+        self._lanes_by_title = {}
+        for lane in self._lanes:
+            self._lanes_by_id[lane.id] = lane
+            self._lanes_by_title.setdefault(lane.title, lane)
+        self._cards_by_id = None
+
+    def _index_cards(self):
+        if self._cards_by_id is not None:
+            return
+        self._cards_by_id = {}
+        self._card_lanes = {}
+        self._cards_by_user = {}
+        self._cards_by_type = {}
+        for lane in self._lanes:
+            for card in lane.cards:
+                self._add_to_card_indexes(lane, card)
+
+    def _add_to_card_indexes(self, lane, card):
+        self._cards_by_id[card.id] = card
+        self._card_lanes[card.id] = lane
+        self._cards_by_user.setdefault(
+            card.assigned_user, {})[card.id] = card
+        self._cards_by_type.setdefault(card.type_id, {})[card.id] = card
+
+    def _remove_from_card_indexes(self, card):
+        del self._cards_by_id[card.id]
+        del self._card_lanes[card.id]
+        for index, key in [(self._cards_by_user, card.assigned_user),
+                           (self._cards_by_type, card.type_id)]:
+            cards = index[key]
+            del cards[card.id]
+            if not cards:
+                del index[key]
+
     def get_lane_by_id(self, lane_id):
         """
         Fetch a lane by the numeric id.
         """
-        for lane in self.lanes:
-            if lane.id == lane_id:
-                return lane
+        return self._lanes_by_id.get(lane_id)
 
     def get_lane_by_title(self, title):
         """
         Fetch a lane by the title.
         """
-        for lane in self.lanes:
-            if lane.title == title:
-                return lane
+        return self._lanes_by_title.get(title)
+
+    def get_card_by_id(self, card_id):
+        """
+        Fetch a card by the numeric id.
+        """
+        self._index_cards()
+        return self._cards_by_id.get(card_id)
+
+    def get_lane_for_card(self, card_id):
+        """
+        Fetch the lane holding the card with the numeric id.
+        """
+        self._index_cards()
+        return self._card_lanes.get(card_id)
+
+    def get_cards_by_user(self, user):
+        """
+        Returns a list of the cards assigned to the named user, in no
+        particular order.
+        """
+        self._index_cards()
+        return list(self._cards_by_user.get(user, {}).values())
+
+    def get_cards_by_type(self, type_id):
+        """
+        Returns a list of the cards with the numeric type id, in no particular
+        order.
+        """
+        self._index_cards()
+        return list(self._cards_by_type.get(type_id, {}).values())
+
+    def add_lane(self, lane):
+        self._lanes.append(lane)
+        self._lanes_by_id[lane.id] = lane
+        self._lanes_by_title.setdefault(lane.title, lane)
+        if self._cards_by_id is not None:
+            for card in lane.cards:
+                self._add_to_card_indexes(lane, card)
+
+    def remove_lane(self, lane_id):
+        """
+        Remove the lane with the numeric id and its cards from the board.
+        """
+        lane = self._lanes_by_id[lane_id]
+        self._lanes.remove(lane)
+        self.reindex()
+        return lane
+
+    def add_card(self, lane_id, card, position=None):
+        """
+        Add a card to the lane with the numeric id, at the end of the lane
+        unless a position is provided.
+        """
+        self._index_cards()
+        lane = self._lanes_by_id[lane_id]
+        if position is None:
+            lane.cards.append(card)
+        else:
+            lane.cards.insert(position, card)
+        self._add_to_card_indexes(lane, card)
+
+    def remove_card(self, card_id):
+        """
+        Remove the card with the numeric id from its lane and returns it.
+        """
+        self._index_cards()
+        card = self._cards_by_id[card_id]
+        self._card_lanes[card_id].cards.remove(card)
+        self._remove_from_card_indexes(card)
+        return card
+
+    def move_card(self, card_id, lane_id, position=None):
+        """
+        Move the card with the numeric id to another lane.
+        """
+        self.add_card(lane_id, self.remove_card(card_id), position)
+
+    def update_card(self, card):
+        """
+        Replace the card with the same id as card, keeping its lane and
+        position.
+        """
+        self._index_cards()
+        previous = self._cards_by_id[card.id]
+        lane = self._card_lanes[card.id]
+        lane.cards[lane.cards.index(previous)] = card
+        self._remove_from_card_indexes(previous)
+        self._add_to_card_indexes(lane, card)
+
+    def diff(self, other):
+        """
+        Returns a list of the CardChanges that turn this board into other, a
+        later copy of the same board.
+
+        Cards are matched by id through the card indexes, so the comparison
+        takes time proportional to the number of cards.
+
+        Removed, moved and changed cards are listed in this board's order,
+        followed by the added cards in other's order.
+        """
+        self._index_cards()
+        other._index_cards()
+        before_lanes = self._card_lanes
+        after_cards = other._cards_by_id
+        after_lanes = other._card_lanes
+        changes = []
+        for lane in self._lanes:
+            for card in lane.cards:
+                after = after_cards.get(card.id)
+                if after is None:
+                    changes.append(
+                        CardChange(CARD_REMOVED, card.id, card, None))
+                    continue
+                after_lane = after_lanes[card.id]
+                if lane.id != after_lane.id:
+                    changes.append(CardChange(
+                        CARD_MOVED, card.id, lane.id, after_lane.id))
+                if after is card:
+                    continue
+                for field, kind in CARD_FIELD_CHANGES:
+                    value = getattr(card, field)
+                    new_value = getattr(after, field)
+                    if value != new_value:
+                        changes.append(
+                            CardChange(kind, card.id, value, new_value))
+        for lane in other._lanes:
+            for card in lane.cards:
+                if card.id not in before_lanes:
+                    changes.append(CardChange(CARD_ADDED, card.id, None, card))
+        return changes
 
 
 class Lane(object):
+    """
+    A lane and its cards.
+
+    Lanes created with lazy=True keep the card JSON and only build the Card
+    objects when cards is first accessed, iter_cards builds them one at a
+    time without keeping them.
+    """
+    __slots__ = [
+        "id", "title", "index", "card_limit", "_cards", "_card_data",
+        "_config"]
+
     def __init__(self, config, lane_id, title, index, card_limit):
         self.id = lane_id
         self.title = title
         self.index = index
         self.card_limit = card_limit
+        self.cards = []
+
+    def __getstate__(self):
+        return (self.id, self.title, self.index, self.card_limit,
+                self._cards, self._card_data, self._config)
+
+    def __setstate__(self, state):
+        (self.id, self.title, self.index, self.card_limit, self._cards,
+         self._card_data, self._config) = state
 
     @classmethod
-    def create_from_lane_json(cls, config, data):
+    def create_from_lane_json(cls, config, data, lazy=False):
         lane = cls(
             config,
             data["Id"],
@@ -122,19 +796,54 @@ class Lane(object):
             data["Index"],
             data["CardLimit"]
         )
-        lane.cards = [Card.create_from_card_json(config, card)
-                      for card in data["Cards"]]
+        if lazy:
+            lane._cards = None
+            lane._card_data = data["Cards"]
+            lane._config = config
+        else:
+            lane.cards = [Card.create_from_card_json(config, card)
+                          for card in data["Cards"]]
         return lane
 
+    @property
+    def cards(self):
+        if self._cards is None:
+            self.cards = list(self.iter_cards())
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards):
+        self._cards = cards
+        self._card_data = None
+        self._config = None
+
+    def iter_cards(self):
+        """
+        Yields the cards in the lane, without materialising them all if they
+        haven't yet been built.
+        """
+        if self._cards is not None:
+            return iter(self._cards)
+        config = self._config
+        return (Card.create_from_card_json(config, card)
+                for card in self._card_data)
+
 
 class Card(object):
+    __slots__ = ["id", "title", "type_id", "assigned_user"]
+
     def __init__(self, config, card_id, title, type_id, assigned_user):
-        self.config = config
         self.id = card_id
         self.title = title
         self.type_id = type_id
         self.assigned_user = assigned_user
 
+    def __getstate__(self):
+        return (self.id, self.title, self.type_id, self.assigned_user)
+
+    def __setstate__(self, state):
+        self.id, self.title, self.type_id, self.assigned_user = state
+
     @classmethod
     def create_from_card_json(cls, config, data):
         return cls(
@@ -0,0 +1,61 @@
+import time
+import threading
+from collections import OrderedDict
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_BOARDS = 100
+
+
+class IdentifierCache(object):
+    """
+    Holds the identifiers for recently used boards.
+
+    Entries expire ttl seconds after they were stored, and once more than
+    max_boards boards are held, the least recently used is evicted.
+    """
+
+    def __init__(
+            self, ttl=DEFAULT_TTL, max_boards=DEFAULT_MAX_BOARDS,
+            clock=time.time):
+        self.ttl = ttl
+        self.max_boards = max_boards
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, board_id):
+        """
+        Returns the cached identifiers for board_id, or None if there are no
+        unexpired identifiers held.
+        """
+        with self._lock:
+            entry = self._entries.pop(board_id, None)
+            if entry is None or entry[0] <= self.clock():
+                self.misses += 1
+                return
+            self._entries[board_id] = entry
+            self.hits += 1
+            return entry[1]
+
+    def set(self, board_id, identifiers):
+        with self._lock:
+            self._entries.pop(board_id, None)
+            self._entries[board_id] = (self.clock() + self.ttl, identifiers)
+            while len(self._entries) > self.max_boards:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, board_id=None):
+        """
+        Drops the identifiers for board_id, or for all boards if no board_id
+        is provided.
+        """
+        with self._lock:
+            if board_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(board_id, None)
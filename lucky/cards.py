@@ -1,11 +1,154 @@
+import mmap
+import os
+from collections import namedtuple
+from glob import glob
+
+from .errors import LuckyError
+
+SEPARATOR = "----\n"
+
+# Files larger than this are read through a memory-map rather than read
+# into a string.
+MMAP_THRESHOLD = 64 * 1024
+
+CardFileResult = namedtuple("CardFileResult", ["filename", "card", "error"])
+
+
+class CardFileError(LuckyError):
+    """
+    Raised when a card file doesn't have a title, body and link URL
+    separated by ---- lines.
+    """
+
+    def __init__(self, filename, reason):
+        self.filename = filename
+        self.reason = reason
+        super(CardFileError, self).__init__("%s: %s" % (filename, reason))
+
+    def __reduce__(self):
+        # Allow the error to be returned from a process pool.
+        return (self.__class__, (self.filename, self.reason))
+
+
+def parse_card_data(data, filename=None):
+    """
+    Returns the card from data, which can be a string or a memory-map, with
+    only the title, body and link URL copied out of it.
+    """
+    first = data.find(SEPARATOR)
+    second = data.find(SEPARATOR, first + len(SEPARATOR)) \
+        if first != -1 else -1
+    if second == -1:
+        raise CardFileError(
+            filename, "expected a title, body and link URL separated by "
+                      "---- lines")
+    end = data.find(SEPARATOR, second + len(SEPARATOR))
+    if end == -1:
+        end = len(data)
+    return {
+        "title": data[:first].strip(),
+        "body": data[first + len(SEPARATOR):second],
+        "link_url": data[second + len(SEPARATOR):end].strip(),
+    }
+
+
+def read_card(filename):
+    """
+    Parses the card file, raising an IOError if it can't be read, or a
+    CardFileError if it isn't a card.
+    """
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return parse_card_data(f.read(), filename)
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return parse_card_data(data, filename)
+        finally:
+            data.close()
+
+
 def parse_card(filename):
     try:
-        with open(filename, "r") as f:
-            result = {}
-            lines = f.read().split("----\n")
-            result["title"] = lines[0].strip()
-            result["body"] = lines[1]
-            result["link_url"] = lines[2].strip()
-        return result
+        return read_card(filename)
     except IOError:
         return
+
+
+def find_card_files(paths, pattern="*"):
+    """
+    Yields the files for each of the paths, which can be files, glob
+    patterns or directories, whose files matching pattern are included
+    recursively in name order.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, filenames in os.walk(path):
+                subdirectories.sort()
+                matches = glob(os.path.join(directory, pattern))
+                for filename in sorted(matches):
+                    if os.path.isfile(filename):
+                        yield filename
+        elif os.path.exists(path):
+            yield path
+        else:
+            # Patterns that match nothing are reported as missing files.
+            matches = sorted(glob(path))
+            for filename in matches or [path]:
+                yield filename
+
+
+def read_card_result(filename):
+    """
+    Returns a CardFileResult for the file, with the error that prevented it
+    from being read rather than raising it.
+    """
+    try:
+        return CardFileResult(filename, read_card(filename), None)
+    except (IOError, OSError, CardFileError) as e:
+        return CardFileResult(filename, None, e)
+
+
+def ingest_cards(paths, max_workers=4, processes=False, ordered=False,
+                 pattern="*", chunk_size=64):
+    """
+    Parses the card files found in paths (see find_card_files) with a pool
+    of max_workers threads, or processes if processes is True.
+
+    Yields a CardFileResult for each file as it's parsed, or in the order
+    the files were found if ordered is True.
+    """
+    if processes:
+        from multiprocessing import Pool
+    else:
+        from multiprocessing.pool import ThreadPool as Pool
+    pool = Pool(max_workers)
+    try:
+        filenames = find_card_files(paths, pattern)
+        if ordered:
+            results = pool.imap(read_card_result, filenames, chunk_size)
+        else:
+            results = pool.imap_unordered(
+                read_card_result, filenames, chunk_size)
+        for result in results:
+            yield result
+    finally:
+        pool.terminate()
+
+
+def card_json(card, lane_id, type_id, **fields):
+    """
+    Returns the LeanKit card dictionary for a card parsed by parse_card, to
+    add to lane_id with the card type type_id.
+
+    Any other fields, e.g. Priority=2, are included as they are.
+    """
+    result = {
+        "LaneId": lane_id,
+        "TypeId": type_id,
+        "Title": card["title"],
+        "Description": card["body"],
+        "ExternalSystemUrl": card["link_url"],
+    }
+    result.update(fields)
+    return result
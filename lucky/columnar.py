@@ -0,0 +1,287 @@
+import csv
+import os
+from array import array
+from collections import Counter
+
+# Columns holding an integer for each card, unassigned users and missing
+# card types are stored as MISSING.
+INTEGER_COLUMNS = [
+    "board_id", "lane_id", "position", "card_id", "type_id", "user"]
+MISSING = -1
+
+FORMATS = ["npz", "arrow", "csv"]
+EXTENSIONS = {".npz": "npz", ".arrow": "arrow", ".csv": "csv"}
+
+CSV_HEADERS = [
+    "board_id", "lane_id", "lane", "position", "card_id", "title", "type_id",
+    "type", "user"]
+
+
+def get_numpy():
+    """
+    Returns the numpy module, or None if it isn't installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return
+    return numpy
+
+
+def get_pyarrow():
+    """
+    Returns the pyarrow module, or None if it isn't installed.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        return
+    return pyarrow
+
+
+def encode(value):
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    return value
+
+
+class CardColumns(object):
+    """
+    The cards of one or more boards, held as a column for each field rather
+    than an object for each card.
+
+    The integer columns are arrays (NumPy arrays when column() is called
+    with NumPy installed), and titles is a list. Users are interned, the
+    user column holds an index into users. lanes and card_types map the
+    lane and card type ids to their names.
+
+        columns = CardColumns.from_boards(
+            boards.get_many(board_ids), identifiers=boards.get_identifiers)
+        columns.cards_per_lane()
+        columns.write("cards.npz")
+
+    NumPy and PyArrow are used when they're installed, but aren't required.
+    """
+
+    def __init__(self, use_numpy=True):
+        self._columns = dict((name, array("l")) for name in INTEGER_COLUMNS)
+        self.titles = []
+        self.users = []
+        self._user_codes = {}
+        self.lanes = {}
+        self.card_types = {}
+        self.numpy = get_numpy() if use_numpy else None
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def from_boards(cls, boards, identifiers=None, use_numpy=True):
+        """
+        Returns the columns for the cards of the boards.
+
+        boards can also be BoardResults from Boards.get_many, those that
+        failed are skipped. identifiers is an optional function returning
+        the identifiers for a board id, e.g. Boards.get_identifiers, used
+        for the lane and card type names.
+        """
+        columns = cls(use_numpy)
+        for board in boards:
+            board = getattr(board, "board", board)
+            if board is None:
+                continue
+            board_identifiers = None
+            if identifiers is not None:
+                board_identifiers = identifiers(board.id)
+            columns.add_board(board, board_identifiers)
+        return columns
+
+    def intern_user(self, name):
+        """
+        Returns the code for the user name, adding it to users if it's new.
+        """
+        if not name:
+            return MISSING
+        code = self._user_codes.get(name)
+        if code is None:
+            code = self._user_codes[name] = len(self.users)
+            self.users.append(name)
+        return code
+
+    def add_board(self, board, identifiers=None):
+        """
+        Appends the cards of the board to the columns.
+        """
+        if identifiers is not None:
+            self.lanes.update(identifiers["lanes"])
+            self.card_types.update(identifiers["card_types"])
+        else:
+            self.lanes.update((lane.id, lane.title) for lane in board.lanes)
+            self.card_types.update(board.card_types)
+
+        columns = self._columns
+        board_ids = columns["board_id"].append
+        lane_ids = columns["lane_id"].append
+        positions = columns["position"].append
+        card_ids = columns["card_id"].append
+        type_ids = columns["type_id"].append
+        users = columns["user"].append
+        titles = self.titles.append
+        intern_user = self.intern_user
+        for lane in board.lanes:
+            for position, card in enumerate(lane.iter_cards()):
+                board_ids(board.id)
+                lane_ids(lane.id)
+                positions(position)
+                card_ids(card.id)
+                type_ids(MISSING if card.type_id is None else card.type_id)
+                users(intern_user(card.assigned_user))
+                titles(card.title)
+
+    def column(self, name):
+        """
+        Returns the integer column, as a NumPy array if NumPy is available.
+        """
+        values = self._columns[name]
+        if self.numpy is not None:
+            return self.numpy.frombuffer(
+                values, dtype=self.numpy.dtype(values.typecode))
+        return values
+
+    def count_by(self, name):
+        """
+        Returns a dictionary of the number of cards with each value in the
+        integer column.
+        """
+        values = self.column(name)
+        if self.numpy is not None:
+            keys, counts = self.numpy.unique(values, return_counts=True)
+            return dict(zip(keys.tolist(), counts.tolist()))
+        return dict(Counter(values))
+
+    def cards_per_lane(self):
+        return self.count_by("lane_id")
+
+    def cards_per_type(self):
+        return self.count_by("type_id")
+
+    def cards_per_user(self):
+        """
+        Returns the number of cards assigned to each user name, with None for
+        unassigned cards.
+        """
+        return dict(
+            (None if code == MISSING else self.users[code], count)
+            for code, count in self.count_by("user").items())
+
+    def rows(self):
+        """
+        Yields a tuple of the values in CSV_HEADERS for each card.
+        """
+        columns = self._columns
+        lanes = self.lanes
+        card_types = self.card_types
+        users = self.users
+        for i, title in enumerate(self.titles):
+            type_id = columns["type_id"][i]
+            user = columns["user"][i]
+            yield (columns["board_id"][i], columns["lane_id"][i],
+                   lanes.get(columns["lane_id"][i]), columns["position"][i],
+                   columns["card_id"][i], title,
+                   None if type_id == MISSING else type_id,
+                   card_types.get(type_id),
+                   None if user == MISSING else users[user])
+
+    def write_csv(self, path):
+        with open(path, "wb") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(CSV_HEADERS)
+            writer.writerows(
+                [encode(value) for value in row] for row in self.rows())
+
+    def write_npz(self, path):
+        """
+        Writes the columns and the lane, card type and user names to a
+        NumPy .npz file.
+        """
+        numpy = self.numpy or get_numpy()
+        arrays = dict(
+            (name, numpy.frombuffer(values, dtype=values.typecode))
+            for name, values in self._columns.items())
+        lane_ids = sorted(self.lanes)
+        type_ids = sorted(self.card_types)
+        arrays.update({
+            "title": numpy.array(self.titles, dtype=unicode),
+            "users": numpy.array(self.users, dtype=unicode),
+            "lane_ids": numpy.array(lane_ids, dtype="l"),
+            "lane_titles": numpy.array(
+                [self.lanes[lane_id] for lane_id in lane_ids], dtype=unicode),
+            "type_ids": numpy.array(type_ids, dtype="l"),
+            "type_names": numpy.array(
+                [self.card_types[type_id] for type_id in type_ids],
+                dtype=unicode),
+        })
+        with open(path, "wb") as f:
+            numpy.savez_compressed(f, **arrays)
+
+    def write_arrow(self, path):
+        """
+        Writes the cards to an Arrow IPC file, with the user, lane and card
+        type names dictionary-encoded.
+        """
+        pyarrow = get_pyarrow()
+
+        def dictionary(codes, names):
+            return pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array([None if code == MISSING else code
+                               for code in codes], type=pyarrow.int32()),
+                pyarrow.array(names, type=pyarrow.string()))
+
+        lane_ids = sorted(self.lanes)
+        lane_codes = dict((lane_id, i) for i, lane_id in enumerate(lane_ids))
+        type_ids = sorted(self.card_types)
+        type_codes = dict((type_id, i) for i, type_id in enumerate(type_ids))
+        columns = self._columns
+        names = ["board_id", "lane_id", "position", "card_id", "type_id"]
+        arrays = [pyarrow.array(columns[name], type=pyarrow.int64())
+                  for name in names]
+        names += ["title", "lane", "type", "user"]
+        arrays += [
+            pyarrow.array(self.titles, type=pyarrow.string()),
+            dictionary([lane_codes.get(lane_id, MISSING)
+                        for lane_id in columns["lane_id"]],
+                       [self.lanes[lane_id] for lane_id in lane_ids]),
+            dictionary([type_codes.get(type_id, MISSING)
+                        for type_id in columns["type_id"]],
+                       [self.card_types[type_id] for type_id in type_ids]),
+            dictionary(columns["user"], self.users),
+        ]
+        table = pyarrow.Table.from_arrays(arrays, names=names)
+        with pyarrow.OSFile(path, "wb") as sink:
+            writer = pyarrow.RecordBatchFileWriter(sink, table.schema)
+            writer.write_table(table)
+            writer.close()
+
+    def write(self, path, format=None):
+        """
+        Writes the cards to path in the format, which defaults to the one
+        for the file extension, or the best one available.
+
+        If the library needed for the format isn't installed, a CSV file is
+        written instead, with the extension changed to .csv.
+
+        Returns the (format, path) written.
+        """
+        if format is None:
+            format = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            format = "arrow" if get_pyarrow() is not None else \
+                "npz" if get_numpy() is not None else "csv"
+        if format not in FORMATS:
+            raise ValueError("Unknown export format %r" % format)
+        if (format == "npz" and get_numpy() is None or
+                format == "arrow" and get_pyarrow() is None):
+            format = "csv"
+            path = os.path.splitext(path)[0] + ".csv"
+        getattr(self, "write_" + format)(path)
+        return format, path
@@ -1,26 +1,41 @@
 from os.path import expanduser
-from datetime import datetime
 from urlparse import urljoin
 from ConfigParser import ConfigParser, NoOptionError
 
+from .dates import get_date_parser
+
 default_date_format = "%m/%d/%Y"
+default_base_url = "https://{account}.leankitkanban.com/Kanban/API/"
 
 
 class Config(object):
 
     def __init__(
-            self, account, email, password, date_format=default_date_format):
+            self, account, email, password, date_format=default_date_format,
+            base_url=None):
         self.account = account
         self.email = email
         self.password = password
         self.date_format = date_format
+        self._base_url = base_url
 
     def parse_date(self, date):
-        return datetime.strptime(date, self.date_format)
+        return get_date_parser(self.date_format).parse(date)
+
+    def parse_dates(self, dates):
+        """
+        Yields the date for each of the date strings, parsed with the
+        date_format.
+        """
+        return get_date_parser(self.date_format).parse_dates(dates)
 
     @property
     def base_url(self):
-        return "https://{account}.leankitkanban.com/Kanban/API/".format(
+        """
+        The URL that API paths are relative to, this can be overridden to
+        talk to a server other than LeanKit's, e.g. for testing.
+        """
+        return (self._base_url or default_base_url).format(
             account=self.account)
 
     def get_url_for_path(self, path):
@@ -38,30 +53,67 @@ class Config(object):
                 return
         return cls(
             env["LK_ACCOUNT"], env["LK_EMAIL"],
-            env["LK_PASSWORD"], env.get("LK_DATE_FORMAT", default_date_format))
+            env["LK_PASSWORD"], env.get("LK_DATE_FORMAT", default_date_format),
+            env.get("LK_BASE_URL"))
 
     @classmethod
-    def load_from_homedir(cls):
+    def _read_homedir(cls):
+        config_path = expanduser("~/.luckyrc")
+        parser = ConfigParser()
+        if parser.read([config_path]) == [config_path]:
+            return parser
+
+    @classmethod
+    def _load_section(cls, parser, section):
+        if not parser.has_section(section):
+            return None
+        if parser.has_option(section, "date_format"):
+            date_format = parser.get(section, "date_Format")
+        else:
+            date_format = default_date_format
+        base_url = None
+        if parser.has_option(section, "base_url"):
+            base_url = parser.get(section, "base_url")
+        try:
+            return cls(
+                parser.get(section, "account"),
+                parser.get(section, "email"),
+                parser.get(section, "password"),
+                date_format,
+                base_url
+            )
+        except NoOptionError:
+            return
+
+    @classmethod
+    def load_from_homedir(cls, section="config"):
         """
-        Attempts to configure from a ConfigParser file in ~/.luckyrc.
+        Attempts to configure from a ConfigParser file in ~/.luckyrc, using
+        the [config] section unless another section is named.
 
         Returns None if not all the required fields found.
         """
-        config_path = expanduser("~/.luckyrc")
-        parser = ConfigParser()
-        if parser.read([config_path]) == [config_path]:
-            if not parser.has_section("config"):
-                return None
-            if parser.has_option("config", "date_format"):
-                date_format = parser.get("config", "date_Format")
-            else:
-                date_format = default_date_format
-            try:
-                return cls(
-                    parser.get("config", "account"),
-                    parser.get("config", "email"),
-                    parser.get("config", "password"),
-                    date_format
-                )
-            except NoOptionError:
-                return
+        parser = cls._read_homedir()
+        if parser is not None:
+            return cls._load_section(parser, section)
+
+    @classmethod
+    def load_all_from_homedir(cls):
+        """
+        Returns a Config for each section of ~/.luckyrc with an account,
+        email and password, in the order of the file, e.g.
+
+            [config]
+            account = first
+            ...
+
+            [second]
+            account = second
+            ...
+        """
+        parser = cls._read_homedir()
+        if parser is None:
+            return []
+        configs = [cls._load_section(parser, section)
+                   for section in parser.sections()]
+        return [config for config in configs if config is not None]
@@ -0,0 +1,114 @@
+import re
+from datetime import datetime
+
+MEMO_SIZE = 4096
+
+# Patterns for the directives we can parse without strptime, matching the
+# same input that strptime accepts for them.
+DIRECTIVES = {
+    "d": r"(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])",
+    "m": r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+    "Y": r"(?P<Y>\d\d\d\d)",
+    "y": r"(?P<y>\d\d)",
+    "H": r"(?P<H>2[0-3]|[0-1]\d|\d)",
+    "M": r"(?P<M>[0-5]\d|\d)",
+    "S": r"(?P<S>6[0-1]|[0-5]\d|\d)",
+}
+
+
+def compile_format(date_format):
+    """
+    Returns a compiled regular expression for the strptime style format, or
+    None if it uses directives that aren't supported or repeats a directive.
+    """
+    parts = []
+    seen = set()
+    i = 0
+    while i < len(date_format):
+        character = date_format[i]
+        if character == "%":
+            directive = date_format[i + 1:i + 2]
+            if directive == "%":
+                parts.append("%")
+            elif directive in DIRECTIVES and directive not in seen:
+                seen.add(directive)
+                parts.append(DIRECTIVES[directive])
+            else:
+                return
+            i += 2
+        elif character.isspace():
+            parts.append(r"\s+")
+            i += 1
+        else:
+            parts.append(re.escape(character))
+            i += 1
+    return re.compile("".join(parts) + r"\Z", re.IGNORECASE)
+
+
+class DateParser(object):
+    """
+    Parses dates in a strptime format, giving the same results as
+    datetime.strptime.
+
+    Common numeric formats are compiled to a regular expression once, rather
+    than having strptime interpret the format on each call, and the results
+    for recently parsed strings are remembered. Anything the compiled form
+    can't handle, including invalid dates, is passed to strptime so that the
+    same errors are raised.
+    """
+
+    def __init__(self, date_format, memo_size=MEMO_SIZE):
+        self.format = date_format
+        self.pattern = compile_format(date_format)
+        self.memo_size = memo_size
+        self._memo = {}
+
+    def parse(self, value):
+        result = self._memo.get(value)
+        if result is None:
+            result = self._parse(value)
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[value] = result
+        return result
+
+    def _parse(self, value):
+        match = self.pattern and self.pattern.match(value)
+        if not match:
+            return datetime.strptime(value, self.format)
+        fields = match.groupdict()
+        if fields.get("Y") is not None:
+            year = int(fields["Y"])
+        elif fields.get("y") is not None:
+            year = int(fields["y"])
+            year += 1900 if year >= 69 else 2000
+        else:
+            year = 1900
+        try:
+            return datetime(
+                year, int(fields.get("m") or 1), int(fields.get("d") or 1),
+                int(fields.get("H") or 0), int(fields.get("M") or 0),
+                int(fields.get("S") or 0))
+        except ValueError:
+            return datetime.strptime(value, self.format)
+
+    def parse_dates(self, values):
+        """
+        Yields the date for each of the values.
+        """
+        parse = self.parse
+        for value in values:
+            yield parse(value).date()
+
+
+_parsers = {}
+
+
+def get_date_parser(date_format):
+    """
+    Returns the shared DateParser for the format.
+    """
+    parser = _parsers.get(date_format)
+    if parser is None:
+        parser = _parsers[date_format] = DateParser(date_format)
+    return parser
@@ -0,0 +1,27 @@
+# LeanKit reply codes for successful requests, any other code is an error.
+SUCCESS_REPLY_CODES = frozenset([200, 201, 202, 203])
+
+
+class LuckyError(Exception):
+    """
+    Base class for the errors raised by lucky.
+    """
+
+
+class APIError(LuckyError):
+    """
+    Raised when LeanKit responds to a request with an error.
+
+    status_code is the HTTP status, and reply_code and reply_text are the
+    ReplyCode and ReplyText from the response body where there was one.
+    """
+
+    def __init__(self, url, status_code, reply_code=None, reply_text=None):
+        self.url = url
+        self.status_code = status_code
+        self.reply_code = reply_code
+        self.reply_text = reply_text
+        message = "%s returned HTTP %s" % (url, status_code)
+        if reply_code is not None:
+            message += ", ReplyCode %s: %s" % (reply_code, reply_text)
+        super(APIError, self).__init__(message)
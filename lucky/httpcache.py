@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from os.path import expanduser, join
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from .errors import SUCCESS_REPLY_CODES
+
+DEFAULT_MAX_AGE = 60
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+CACHED_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+REPLY_CODE = re.compile(br'"ReplyCode"\s*:\s*(\d+)')
+
+
+def get_default_cache_directory(env=os.environ):
+    return join(
+        env.get("XDG_CACHE_HOME") or expanduser("~/.cache"), "lucky")
+
+
+def parse_max_age(cache_control):
+    """
+    Returns the max-age from a Cache-Control header, or None.
+    """
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    if match:
+        return int(match.group(1))
+
+
+def is_success_reply(body):
+    """
+    Returns False if the body is a LeanKit reply with an error ReplyCode,
+    which LeanKit sends with a 200 status.
+
+    The ReplyCode is found without parsing the body, it comes first in
+    LeanKit's replies.
+    """
+    match = REPLY_CODE.search(body)
+    return match is None or int(match.group(1)) in SUCCESS_REPLY_CODES
+
+
+class CachedResponse(Response):
+    """
+    A response served from the cache, with no connection behind it.
+    """
+    from_cache = True
+
+    def close(self):
+        pass
+
+
+class ResponseCache(object):
+    """
+    Stores response bodies on disk, keyed by URL and account.
+
+    Each entry is a .body file with the response body, and a .json file with
+    the headers needed to revalidate it. Once the files take more than
+    max_size bytes, the least recently used entries are removed.
+    """
+
+    def __init__(
+            self, directory, max_age=DEFAULT_MAX_AGE,
+            max_size=DEFAULT_MAX_SIZE, clock=time.time):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_size = max_size
+        self.clock = clock
+
+    @staticmethod
+    def key(url, account):
+        return hashlib.sha1(
+            ("%s\n%s" % (account, url)).encode("utf-8")).hexdigest()
+
+    def _path(self, key, suffix):
+        return join(self.directory, key + suffix)
+
+    def _write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.rename(tmp_path, path)
+
+    def load(self, key):
+        """
+        Returns (metadata, body) for the entry, or None if there isn't one.
+        """
+        try:
+            with open(self._path(key, ".json"), "rb") as f:
+                metadata = json.loads(f.read().decode("utf-8"))
+            with open(self._path(key, ".body"), "rb") as f:
+                body = f.read()
+        except (IOError, OSError, ValueError):
+            return
+        os.utime(self._path(key, ".json"), None)
+        return metadata, body
+
+    def is_fresh(self, metadata):
+        max_age = metadata.get("max_age")
+        if max_age is None:
+            max_age = self.max_age
+        return self.clock() - metadata["stored"] < max_age
+
+    def store(self, key, url, headers, body):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        metadata = {
+            "url": url,
+            "stored": self.clock(),
+            "max_age": parse_max_age(headers.get("Cache-Control")),
+            "headers": dict((name, headers[name]) for name in CACHED_HEADERS
+                            if name in headers),
+        }
+        self._write(self._path(key, ".body"), body)
+        self._write(
+            self._path(key, ".json"), json.dumps(metadata).encode("utf-8"))
+        self.evict()
+
+    def touch(self, key, metadata):
+        """
+        Marks a revalidated entry as fresh again.
+        """
+        metadata["stored"] = self.clock()
+        self._write(
+            self._path(key, ".json"), json.dumps(metadata).encode("utf-8"))
+
+    def remove(self, key):
+        for suffix in [".json", ".body"]:
+            try:
+                os.unlink(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is no bigger
+        than max_size.
+        """
+        entries = {}
+        total = 0
+        for filename in os.listdir(self.directory):
+            key, suffix = os.path.splitext(filename)
+            if suffix not in (".json", ".body"):
+                continue
+            try:
+                stat = os.stat(join(self.directory, filename))
+            except OSError:
+                # Removed by another thread sharing the cache.
+                continue
+            total += stat.st_size
+            if suffix == ".json":
+                entries[key] = stat.st_mtime
+        for key in sorted(entries, key=entries.get):
+            if total <= self.max_size:
+                break
+            for suffix in [".json", ".body"]:
+                try:
+                    total -= os.path.getsize(self._path(key, suffix))
+                except OSError:
+                    pass
+            self.remove(key)
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                try:
+                    os.unlink(join(self.directory, filename))
+                except OSError:
+                    pass
+
+
+class CachingTransport(object):
+    """
+    Wraps a Transport, serving GET requests from a ResponseCache.
+
+    Cached responses are returned without a request for max_age seconds
+    (or the server's Cache-Control max-age), after which they're revalidated
+    with If-None-Match/If-Modified-Since if the server sent an ETag or
+    Last-Modified header, and fetched again otherwise. LeanKit error replies
+    aren't cached, even though they're sent with a 200 status.
+    """
+
+    def __init__(self, transport, cache):
+        self.transport = transport
+        self.cache = cache
+
+    def get(self, url, auth=None, **kwargs):
+        account = auth[0] if auth else ""
+        key = self.cache.key(url, account)
+        entry = self.cache.load(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            metadata, body = entry
+            if self.cache.is_fresh(metadata):
+                return self._cached_response(url, metadata, body)
+            cached_headers = metadata["headers"]
+            if "ETag" in cached_headers:
+                headers["If-None-Match"] = cached_headers["ETag"]
+            if "Last-Modified" in cached_headers:
+                headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        # The body is always read in full so that it can be cached.
+        kwargs.pop("stream", None)
+        response = self.transport.get(
+            url, auth=auth, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key, metadata)
+            return self._cached_response(url, metadata, body)
+        if (response.status_code == 200 and
+                is_success_reply(response.content)):
+            self.cache.store(key, url, response.headers, response.content)
+        return response
+
+    def post(self, url, auth=None, **kwargs):
+        """
+        Writes aren't cached, and as they may change any of the cached
+        responses, a successful write clears the cache.
+        """
+        response = self.transport.post(url, auth=auth, **kwargs)
+        if response.status_code < 400:
+            self.cache.clear()
+        return response
+
+    def _cached_response(self, url, metadata, body):
+        response = CachedResponse()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(metadata["headers"])
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        self.transport.close()
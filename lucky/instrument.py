@@ -0,0 +1,107 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+PHASES = ["connect", "transfer", "decode", "build"]
+
+
+class RequestTiming(object):
+    """
+    The time spent on each phase of a request, in seconds.
+
+    connect is the time until the response headers arrived (including the
+    time spent waiting for the rate limiter and on retries), transfer the
+    time reading the body, decode parsing the JSON and build creating the
+    Board, Lane and Card objects. bytes is the size of the body and objects
+    the number of objects built.
+    """
+
+    def __init__(self, path, endpoint):
+        self.path = path
+        self.endpoint = endpoint
+        self.connect = 0.0
+        self.transfer = 0.0
+        self.decode = 0.0
+        self.build = 0.0
+        self.bytes = 0
+        self.objects = 0
+
+    @property
+    def total(self):
+        return self.connect + self.transfer + self.decode + self.build
+
+    def __repr__(self):
+        return (
+            "<RequestTiming %s connect=%.3f transfer=%.3f decode=%.3f "
+            "build=%.3f bytes=%d objects=%d>" % (
+                self.path, self.connect, self.transfer, self.decode,
+                self.build, self.bytes, self.objects))
+
+
+def count_objects(obj):
+    """
+    Returns the number of objects that were built for obj, counting a Board
+    or Lane with the cards that have been built for it.
+    """
+    if obj is None:
+        return 0
+    lanes = getattr(obj, "lanes", None)
+    if lanes is not None:
+        return 1 + sum(count_objects(lane) for lane in lanes)
+    cards = getattr(obj, "_cards", None)
+    if cards is not None:
+        return 1 + len(cards)
+    return 1
+
+
+class Profiler(object):
+    """
+    Collects a RequestTiming for each request made by the Boards it's passed
+    to, and calls each of the callbacks with it.
+    """
+
+    def __init__(self, callbacks=None, clock=time.time):
+        self.callbacks = list(callbacks or [])
+        self.clock = clock
+        self.timings = []
+        self._lock = threading.Lock()
+
+    def start(self, path, endpoint):
+        return RequestTiming(path, endpoint)
+
+    def record(self, timing):
+        with self._lock:
+            self.timings.append(timing)
+        for callback in self.callbacks:
+            callback(timing)
+
+    def summary(self):
+        """
+        Returns a dictionary of the totals for each endpoint, in the order
+        they were first requested.
+        """
+        totals = OrderedDict()
+        for timing in self.timings:
+            total = totals.get(timing.endpoint)
+            if total is None:
+                total = totals[timing.endpoint] = dict(
+                    (name, 0) for name in
+                    ["requests", "bytes", "objects"] + PHASES)
+            total["requests"] += 1
+            for name in ["bytes", "objects"] + PHASES:
+                total[name] += getattr(timing, name)
+        return totals
+
+    def report(self, output=sys.stderr):
+        """
+        Writes a table of the totals for each endpoint.
+        """
+        pattern = "%-40s %8s %10s %8s" + " %9s" * len(PHASES) + "\n"
+        output.write(pattern % tuple(
+            ["endpoint", "requests", "bytes", "objects"] + PHASES))
+        for endpoint, total in self.summary().items():
+            output.write(pattern % tuple(
+                [endpoint, total["requests"], total["bytes"],
+                 total["objects"]] +
+                ["%.3fs" % total[name] for name in PHASES]))
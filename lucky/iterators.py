@@ -0,0 +1,35 @@
+from itertools import islice
+
+
+def batches(items, size):
+    """
+    Yields lists of up to size items.
+    """
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def map_concurrently(function, items, max_workers=4, ordered=False):
+    """
+    Calls function with each of the items from a pool of max_workers
+    threads, yielding the results as they complete, or in the order of the
+    items if ordered is True.
+
+    function should return its errors rather than raise them, an exception
+    stops the iteration.
+    """
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(max_workers)
+    try:
+        if ordered:
+            results = pool.imap(function, items)
+        else:
+            results = pool.imap_unordered(function, items)
+        for result in results:
+            yield result
+    finally:
+        pool.terminate()
@@ -0,0 +1,218 @@
+import re
+import shlex
+from collections import namedtuple
+
+from .errors import LuckyError
+
+FIELDS = ["board", "lane", "id", "user", "type", "title"]
+OPERATORS = ["=", "!=", "~"]
+
+TERM = re.compile(r"^(\w+)(!=|=|~)(.*)$", re.DOTALL)
+
+Term = namedtuple("Term", ["field", "operator", "value"])
+QueryResult = namedtuple("QueryResult", ["board", "lane", "card"])
+
+
+class QueryError(LuckyError):
+    """
+    Raised for query expressions that can't be parsed.
+    """
+
+
+def parse_term(text):
+    """
+    Parses a term like "user=John Doe", "lane!=Done" or "title~login".
+    """
+    match = TERM.match(text)
+    if match is None:
+        raise QueryError(
+            "Expected field=value, field!=value or field~value, got %r" %
+            text)
+    field, operator, value = match.groups()
+    field = field.lower()
+    if field not in FIELDS:
+        raise QueryError("Unknown field %r, expected one of %s" % (
+            field, ", ".join(FIELDS)))
+    return Term(field, operator, value)
+
+
+def parse_query(expression):
+    """
+    Returns the Terms in the expression, which are separated by spaces,
+    values containing spaces can be quoted.
+    """
+    if isinstance(expression, unicode):
+        expression = expression.encode("utf-8")
+    return [parse_term(text) for text in shlex.split(expression)]
+
+
+def compare(operator, expected, get_value):
+    """
+    Returns a predicate comparing the value returned by get_value with
+    expected, called with the predicate's arguments. ~ matches
+    case-insensitive substrings.
+    """
+    if operator == "=":
+        return lambda *args: get_value(*args) == expected
+    if operator == "!=":
+        return lambda *args: get_value(*args) != expected
+    expected = expected.lower()
+    return lambda *args: expected in (get_value(*args) or "").lower()
+
+
+def as_id(value):
+    """
+    Returns value as an integer id if it's numeric, or None.
+    """
+    if value.isdigit():
+        return int(value)
+
+
+class Query(object):
+    """
+    A compiled query matching cards on boards, e.g.
+
+        Query('lane=Ready user="John Doe" title~login')
+
+    All the terms must match. Lanes can be given by id or title, and card
+    types by id or name, ~ matches a case-insensitive substring.
+
+    The expression is parsed and the card predicates are built once, lane
+    and type names are resolved for each board. Where a term can be
+    answered by one of the board's lookups, only the smallest set of
+    candidate cards from the lookups is checked rather than every card.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.terms = parse_query(expression)
+        self._predicates = []
+        self._board_predicates = []
+        for term in self.terms:
+            if term.field == "board":
+                self._board_predicates.append(compare(
+                    term.operator, term.value, lambda board: str(board.id)))
+            elif term.field == "title":
+                self._predicates.append(compare(
+                    term.operator, term.value.decode("utf-8"),
+                    lambda lane, card: card.title))
+            elif term.field == "user":
+                self._predicates.append(compare(
+                    term.operator, term.value.decode("utf-8"),
+                    lambda lane, card: card.assigned_user))
+            elif term.field == "id" and term.operator == "~":
+                self._predicates.append(compare(
+                    term.operator, term.value,
+                    lambda lane, card: str(card.id)))
+            elif term.field == "id":
+                self._predicates.append(compare(
+                    term.operator, as_id(term.value),
+                    lambda lane, card: card.id))
+
+    def _lane_ids(self, board, value):
+        lane_id = as_id(value)
+        if lane_id is not None and board.get_lane_by_id(lane_id) is not None:
+            return set([lane_id])
+        value = value.decode("utf-8")
+        return set(lane.id for lane in board.lanes if lane.title == value)
+
+    def _type_ids(self, board, value):
+        type_id = as_id(value)
+        if type_id is not None:
+            return set([type_id])
+        value = value.decode("utf-8").lower()
+        return set(type_id for type_id, name in board.card_types.items()
+                   if name.lower() == value)
+
+    def _bind(self, board):
+        """
+        Returns the predicates for the board, and (count, pairs) for each set
+        of candidate cards from the board's lookups, where pairs yields the
+        (lane, card) for each of the count cards.
+        """
+        predicates = list(self._predicates)
+        candidates = []
+        for term in self.terms:
+            if term.field == "lane":
+                if term.operator == "~":
+                    predicates.append(compare(
+                        term.operator, term.value.decode("utf-8"),
+                        lambda lane, card: lane.title))
+                    continue
+                lane_ids = self._lane_ids(board, term.value)
+                if term.operator == "=":
+                    lanes = [board.get_lane_by_id(lane_id)
+                             for lane_id in lane_ids]
+                    predicates.append(
+                        lambda lane, card, ids=lane_ids: lane.id in ids)
+                    candidates.append((
+                        sum(len(lane.cards) for lane in lanes),
+                        ((lane, card) for lane in lanes
+                         for card in lane.cards)))
+                else:
+                    predicates.append(
+                        lambda lane, card, ids=lane_ids: lane.id not in ids)
+            elif term.field == "type":
+                if term.operator == "~":
+                    value = term.value.decode("utf-8").lower()
+                    type_ids = set(
+                        type_id for type_id, name in board.card_types.items()
+                        if value in name.lower())
+                else:
+                    type_ids = self._type_ids(board, term.value)
+                if term.operator == "!=":
+                    predicates.append(
+                        lambda lane, card, ids=type_ids:
+                        card.type_id not in ids)
+                else:
+                    predicates.append(
+                        lambda lane, card, ids=type_ids: card.type_id in ids)
+                    candidates.append(self._indexed(board, [
+                        card for type_id in type_ids
+                        for card in board.get_cards_by_type(type_id)]))
+            elif term.field == "user" and term.operator == "=":
+                candidates.append(self._indexed(
+                    board, board.get_cards_by_user(
+                        term.value.decode("utf-8"))))
+            elif term.field == "id" and term.operator == "=":
+                card = board.get_card_by_id(as_id(term.value))
+                candidates.append(self._indexed(
+                    board, [card] if card is not None else []))
+        return predicates, candidates
+
+    def _indexed(self, board, cards):
+        return len(cards), ((board.get_lane_for_card(card.id), card)
+                            for card in cards)
+
+    def match(self, board):
+        """
+        Yields a QueryResult for each matching card on the board.
+        """
+        for predicate in self._board_predicates:
+            if not predicate(board):
+                return
+        predicates, candidates = self._bind(board)
+        if candidates:
+            count, pairs = min(candidates, key=lambda candidate: candidate[0])
+        else:
+            pairs = ((lane, card) for lane in board.lanes
+                     for card in lane.iter_cards())
+        for lane, card in pairs:
+            for predicate in predicates:
+                if not predicate(lane, card):
+                    break
+            else:
+                yield QueryResult(board, lane, card)
+
+    def run(self, boards):
+        """
+        Yields a QueryResult for each matching card on the boards, which can
+        also be BoardResults from Boards.get_many, skipping those that
+        failed.
+        """
+        for board in boards:
+            board = getattr(board, "board", board)
+            if board is None:
+                continue
+            for result in self.match(board):
+                yield result
@@ -1,34 +1,63 @@
 #!/usr/bin/env python
 import argparse
+import csv
+import json
 import sys
 import os
+from cStringIO import StringIO
+from itertools import chain, islice
 from os.path import abspath, join, dirname
 from collections import namedtuple
 
 # sys.path.insert(0, abspath(join(dirname(__file__), "..")))
 
 from lucky.config import Config
-from lucky.board import Boards
+from lucky.iterators import batches
+
+# The modules that make requests (and so import requests) are imported by
+# the subcommands that need them, so that --help, argument errors and
+# offline subcommands start quickly.
+
+
+OUTPUT_FORMATS = ["table", "json", "csv", "tsv"]
+
+# Number of rows used to size the columns of a streamed table, and written
+# with each call to output.write.
+SAMPLE_ROWS = 100
+BATCH_ROWS = 100
+
+
+def column_widths(rows):
+    """
+    Returns the width of the widest value or header in each column.
+    """
+    widths = [len(header) for header in rows[0]._fields]
+    for row in rows:
+        for i, value in enumerate(row):
+            length = len(value) if isinstance(value, basestring) else \
+                len(str(value))
+            if length > widths[i]:
+                widths[i] = length
+    return widths
+
+
+def table_patterns(row, widths):
+    formats = []
+    hformats = []
+    for i in range(len(row)):
+        if isinstance(row[i], int):
+            formats.append("%%%dd" % widths[i])
+        else:
+            formats.append("%%-%ds" % widths[i])
+        hformats.append("%%-%ds" % widths[i])
+    return " | ".join(formats), " | ".join(hformats)
 
 
 def pprinttable(rows, output=sys.stdout):
     if len(rows) > 1:
         headers = rows[0]._fields
-        lens = []
-        for i in range(len(rows[0])):
-            lens.append(
-                len(max([x[i] for x in rows] + [headers[i]],
-                    key=lambda x: len(str(x)))))
-        formats = []
-        hformats = []
-        for i in range(len(rows[0])):
-            if isinstance(rows[0][i], int):
-                formats.append("%%%dd" % lens[i])
-            else:
-                formats.append("%%-%ds" % lens[i])
-            hformats.append("%%-%ds" % lens[i])
-        pattern = " | ".join(formats)
-        hpattern = " | ".join(hformats)
+        lens = column_widths(rows)
+        pattern, hpattern = table_patterns(rows[0], lens)
         separator = "-+-".join(["-" * n for n in lens])
         output.write((hpattern + "\n") % tuple(headers))
         output.write(separator + "\n")
@@ -41,8 +70,117 @@ def pprinttable(rows, output=sys.stdout):
             output.write("%*s = %s" % (hwidth, row._fields[i], row[i]) + "\n")
 
 
+def stream_table(rows, output=sys.stdout, sample=SAMPLE_ROWS, widths=None):
+    """
+    Writes the rows as a table as they arrive from the iterable.
+
+    The column widths are taken from widths if provided, or from the first
+    sample rows, later values that are wider than their column are written
+    in full.
+    """
+    rows = iter(rows)
+    first = list(islice(rows, sample))
+    if len(first) < 2:
+        # A single row is written vertically, just like pprinttable.
+        pprinttable(first, output=output)
+        return
+    headers = first[0]._fields
+    widths = widths or column_widths(first)
+    pattern, hpattern = table_patterns(first[0], widths)
+    pattern += "\n"
+    output.write((hpattern + "\n") % tuple(headers))
+    output.write("-+-".join(["-" * n for n in widths]) + "\n")
+    for batch in batches(chain(first, rows), BATCH_ROWS):
+        output.write("".join([pattern % tuple(row) for row in batch]))
+
+
+def write_json(rows, output=sys.stdout):
+    """
+    Writes the rows as a JSON list of objects as they arrive from the
+    iterable.
+    """
+    separator = "[\n"
+    for batch in batches(rows, BATCH_ROWS):
+        output.write(separator + ",\n".join(
+            [json.dumps(row._asdict()) for row in batch]))
+        separator = ",\n"
+    output.write("[]\n" if separator == "[\n" else "\n]\n")
+
+
+def encode(value):
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    return value
+
+
+def write_delimited(rows, output=sys.stdout, delimiter=","):
+    """
+    Writes the rows with a header line in CSV format (or TSV with a tab
+    delimiter) as they arrive from the iterable.
+    """
+    buf = StringIO()
+    writer = csv.writer(buf, delimiter=delimiter, lineterminator="\n")
+    header = True
+    for batch in batches(rows, BATCH_ROWS):
+        if header:
+            writer.writerow(batch[0]._fields)
+            header = False
+        writer.writerows([[encode(value) for value in row] for row in batch])
+        output.write(buf.getvalue())
+        buf.seek(0)
+        buf.truncate()
+
+
+def write_rows(rows, args, output=sys.stdout):
+    """
+    Writes the rows in the output format selected in args.
+    """
+    output_format = getattr(args, "format", "table")
+    if output_format == "json":
+        write_json(rows, output)
+    elif output_format in ("csv", "tsv"):
+        write_delimited(
+            rows, output, "," if output_format == "csv" else "\t")
+    elif getattr(args, "stream", False):
+        stream_table(rows, output)
+    else:
+        pprinttable(list(rows), output=output)
+
+
 def create_parser():
     parser = argparse.ArgumentParser(description="Leankit command-line tool")
+    parser.add_argument(
+        "--no-cache",
+        help="Don't use the response cache",
+        default=False, action="store_true")
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory to store cached responses in (default "
+             "~/.cache/lucky)")
+    parser.add_argument(
+        "--snapshot",
+        help="Read boards from this snapshot file where they're in it")
+    parser.add_argument(
+        "--profile",
+        help="Print a summary of the time spent on requests at exit",
+        default=False, action="store_true")
+    parser.add_argument(
+        "--account",
+        help="Section of ~/.luckyrc to read the account from (default "
+             "config)")
+    parser.add_argument(
+        "--all-accounts",
+        help="List the boards in every account in ~/.luckyrc",
+        default=False, action="store_true")
+    parser.add_argument(
+        "--format",
+        help="Output format",
+        choices=OUTPUT_FORMATS, default="table")
+    parser.add_argument(
+        "--stream",
+        help="Write table rows as they arrive, sizing the columns from the "
+             "first rows",
+        default=False, action="store_true")
     subparsers = parser.add_subparsers(
         title="subcommands", help="subcommand help",
         description="valid subcommands",
@@ -64,49 +202,343 @@ def create_parser():
     show_cards.add_argument("board", help="Board id to display")
     show_cards.add_argument("lane", help="Lane id to display")
 
+    snapshot = subparsers.add_parser(
+        "snapshot", help="Save boards to a snapshot file for offline use")
+    snapshot.add_argument("output", help="Snapshot file to write")
+    snapshot.add_argument("boards", nargs="+", help="Board ids to save")
+
+    query = subparsers.add_parser(
+        "query", help="Display the cards on boards matching a query")
+    query.add_argument(
+        "expression",
+        help="Terms that must all match, e.g. 'lane=Ready user=\"John Doe\" "
+             "title~login', the fields are board, lane, id, user, type and "
+             "title, and the operators =, != and ~ (contains)")
+    query.add_argument("boards", nargs="+", help="Board ids to search")
+
+    search = subparsers.add_parser(
+        "search",
+        help="Search an index of card titles, kept in a SQLite file so that "
+             "only the matching words are read")
+    search.add_argument(
+        "text", help="Words to search for, each matching the start of a word "
+                     "in the title, a word of only a letter or two can match "
+                     "most cards and take seconds")
+    search.add_argument(
+        "boards", nargs="*",
+        help="Board ids to add or update in the index before searching")
+    search.add_argument(
+        "--index",
+        help="Index file to use (default titles.db in the cache directory)")
+    search.add_argument(
+        "--limit", type=int, default=100,
+        help="Maximum number of cards to display (default 100)")
+
+    diff_board = subparsers.add_parser(
+        "diff-board",
+        help="Show the card changes since a board was saved to a snapshot")
+    diff_board.add_argument("board", help="Board id to compare")
+    diff_board.add_argument(
+        "before", help="Snapshot file holding the earlier copy of the board")
+
+    watch = subparsers.add_parser(
+        "watch", help="Poll boards for changes, writing each event as JSON")
+    watch.add_argument("boards", nargs="+", help="Board ids to watch")
+    watch.add_argument(
+        "--min-interval", type=float, default=5,
+        help="Shortest time in seconds between polls of a busy board")
+    watch.add_argument(
+        "--max-interval", type=float, default=300,
+        help="Longest time in seconds between polls of a quiet board")
+    watch.add_argument(
+        "--workers", type=int, default=4,
+        help="Number of boards polled at once")
+
+    export = subparsers.add_parser(
+        "export", help="Export the cards on boards as columns for analysis")
+    export.add_argument(
+        "output", help="File to write, .npz, .arrow or .csv")
+    export.add_argument("boards", nargs="+", help="Board ids to export")
+    export.add_argument(
+        "--export-format", choices=["npz", "arrow", "csv"],
+        help="Format to write (default from the output extension), CSV is "
+             "written if the library for the format isn't installed")
+
+    import_cards = subparsers.add_parser(
+        "import-cards", help="Add cards to a lane from card files")
+    import_cards.add_argument("board", help="Board id to add the cards to")
+    import_cards.add_argument("lane", help="Lane id to add the cards to")
+    import_cards.add_argument("type", help="Card type id for the cards")
+    import_cards.add_argument(
+        "paths", nargs="+",
+        help="Card files, glob patterns or directories of card files")
+    import_cards.add_argument(
+        "--pattern", default="*",
+        help="Pattern for the files to read from directories")
+    import_cards.add_argument(
+        "--workers", type=int, default=4,
+        help="Number of files parsed and batches sent at once")
+    import_cards.add_argument(
+        "--processes", default=False, action="store_true",
+        help="Parse the files in processes rather than threads")
+    import_cards.add_argument(
+        "--batch-size", type=int, default=100,
+        help="Number of cards added with each request")
+    import_cards.add_argument(
+        "--dry-run", default=False, action="store_true",
+        help="Only parse the files, reporting any errors")
+
     return parser
 
 
+def get_boards(config, args):
+    """
+    Returns a Boards for the config, reading through the response cache
+    unless it has been disabled.
+    """
+    from lucky.board import Boards
+    snapshot = getattr(args, "snapshot", None)
+    profiler = getattr(args, "profiler", None)
+    if args is None or args.no_cache:
+        boards = Boards(config, profiler=profiler)
+        if snapshot:
+            boards.open_snapshot(snapshot)
+        return boards
+
+    from lucky.httpcache import (
+        CachingTransport, ResponseCache, get_default_cache_directory)
+    from lucky.transport import get_default_transport
+    transport = CachingTransport(
+        get_default_transport(),
+        ResponseCache(args.cache_dir or get_default_cache_directory()))
+    boards = Boards(config, transport=transport, profiler=profiler)
+    if snapshot:
+        boards.open_snapshot(snapshot)
+    return boards
+
+
+def list_all_accounts(configs, args, output=sys.stdout):
+    from lucky.accounts import MultiAccountBoards
+    board_tuple = namedtuple("Board", ["account", "id", "title"])
+
+    def boards(accounts):
+        for result in accounts.list():
+            if result.error is not None:
+                sys.stderr.write("Listing boards in %s failed: %s\n" % (
+                    result.account, result.error))
+                continue
+            yield board_tuple(
+                result.account, str(result.board_id), result.board["title"])
+
+    with MultiAccountBoards(configs) as accounts:
+        write_rows(boards(accounts), args, output=output)
+
+
 def list_boards(config, args, output=sys.stdout):
     board_tuple = namedtuple("Board", ["id", "title"])
-    boards = []
-    for board in Boards(config).list():
-        boards.append(board_tuple(str(board["board_id"]), board["title"]))
-    pprinttable(boards, output=output)
+    boards = (board_tuple(str(board["board_id"]), board["title"])
+              for board in get_boards(config, args).list())
+    write_rows(boards, args, output=output)
 
 
-def show_board(config, args):
-    board = Boards(config).get(args.board)
-    items = []
+def show_board(config, args, output=sys.stdout):
+    board = get_boards(config, args).get(args.board, lazy_cards=True)
     board_tuple = namedtuple("Lane", ["id", "title"])
-    for lane in board.lanes:
-        items.append(board_tuple(str(lane.id), lane.title))
-    pprinttable(items)
+    items = (board_tuple(str(lane.id), lane.title) for lane in board.lanes)
+    write_rows(items, args, output=output)
 
 
-def show_cards(config, args):
-    board = Boards(config).get(args.board)
-    items = []
+def show_cards(config, args, output=sys.stdout):
+    board = get_boards(config, args).get(args.board)
     card_tuple = namedtuple("Card", ["id", "title", "user", "type"])
     lane = board.get_lane_by_id(int(args.lane))
-    for card in lane.cards:
-        items.append(
-            card_tuple(
-                str(card.id),
-                card.title,
-                card.assigned_user,
-                board.card_types[card.type_id]))
-    pprinttable(items)
+    items = (
+        card_tuple(
+            str(card.id),
+            card.title,
+            card.assigned_user,
+            board.card_types[card.type_id])
+        for card in lane.cards)
+    write_rows(items, args, output=output)
 
 
-def main():
-    parser = create_parser()
-    args = parser.parse_args()
+def save_snapshot(config, args, output=sys.stdout):
+    from lucky.snapshot import SnapshotStore
+    boards = get_boards(config, args)
+    saved_tuple = namedtuple("Saved", ["id", "title", "lanes", "cards"])
+    with SnapshotStore(args.output, config) as store:
+        items = []
+        for board_id in args.boards:
+            board = boards.get(board_id)
+            store.save(board)
+            items.append(saved_tuple(
+                str(board.id), board.title, str(len(board.lanes)),
+                str(sum(len(lane.cards) for lane in board.lanes))))
+    write_rows(items, args, output=output)
 
-    config = Config.load_from_env(os.environ) or Config.load_from_homedir()
-    if not config:
-        sys.exit("No configuration loaded")
 
+def query_cards(config, args, output=sys.stdout):
+    from lucky.query import Query, QueryError
+    try:
+        query = Query(args.expression)
+    except (QueryError, ValueError) as e:
+        sys.exit("Invalid query: %s" % e)
+    card_tuple = namedtuple(
+        "Card", ["board", "lane", "id", "title", "user", "type"])
+
+    def matches():
+        for result in get_boards(config, args).get_many(
+                args.boards, ordered=True):
+            if result.error is not None:
+                sys.stderr.write("Fetching board %s failed: %s\n" % (
+                    result.board_id, result.error))
+                continue
+            board = result.board
+            for match in query.match(board):
+                yield card_tuple(
+                    str(board.id), match.lane.title, str(match.card.id),
+                    match.card.title, match.card.assigned_user,
+                    board.card_types.get(match.card.type_id))
+
+    write_rows(matches(), args, output=output)
+
+
+def search_cards(config, args, output=sys.stdout):
+    from lucky.httpcache import get_default_cache_directory
+    from lucky.search import TitleIndex
+    path = args.index or join(
+        args.cache_dir or get_default_cache_directory(), "titles.db")
+    if not os.path.isdir(dirname(abspath(path))):
+        os.makedirs(dirname(abspath(path)))
+    with TitleIndex(path) as index:
+        if args.boards:
+            for result in get_boards(config, args).get_many(args.boards):
+                if result.error is not None:
+                    sys.stderr.write("Fetching board %s failed: %s\n" % (
+                        result.board_id, result.error))
+                    continue
+                index.add_board(result.board)
+        elif not index:
+            sys.exit(
+                "No cards have been indexed, give the board ids to index")
+        hits = index.search(args.text, limit=args.limit)
+    hit_tuple = namedtuple("Card", ["board", "id", "title"])
+    items = [hit_tuple(str(hit.board_id), str(hit.card_id), hit.title)
+             for hit in hits]
+    write_rows(items, args, output=output)
+
+
+def describe_change_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, basestring):
+        return value
+    # Added and removed cards are described by their titles.
+    return getattr(value, "title", None) or str(value)
+
+
+def diff_board(config, args, output=sys.stdout):
+    from lucky.snapshot import SnapshotStore
+    with SnapshotStore(args.before, config) as store:
+        before = store.get(int(args.board))
+    if before is None:
+        sys.exit("Board %s isn't in %s" % (args.board, args.before))
+    boards = get_boards(config, args)
+    # Always compare with the current board, rather than one from --snapshot.
+    boards.snapshot = None
+    after = boards.get(args.board)
+    change_tuple = namedtuple(
+        "Change", ["change", "card_id", "before", "after"])
+    items = (
+        change_tuple(
+            change.kind, str(change.card_id),
+            describe_change_value(change.before),
+            describe_change_value(change.after))
+        for change in before.diff(after))
+    write_rows(items, args, output=output)
+
+
+def watch_boards(config, args, output=sys.stdout, polls=None):
+    from lucky.sync import event_type
+    from lucky.watch import BoardWatcher
+    # Updates must come from LeanKit, not from the response cache.
+    args.no_cache = True
+
+    def write_event(board_id, event):
+        output.write(json.dumps(dict(
+            event, BoardId=board_id, Type=event_type(event))) + "\n")
+        output.flush()
+
+    def write_error(board_id, error):
+        sys.stderr.write("Polling board %s failed: %s\n" % (board_id, error))
+
+    boards = get_boards(config, args)
+    # Watch the current boards, rather than starting from --snapshot.
+    boards.snapshot = None
+    watcher = BoardWatcher(
+        boards, args.boards, write_event, write_error,
+        min_interval=args.min_interval, max_interval=args.max_interval,
+        max_workers=args.workers)
+    try:
+        watcher.run(polls)
+    except KeyboardInterrupt:
+        pass
+
+
+def export_cards(config, args, output=sys.stdout):
+    from lucky.columnar import CardColumns
+    boards = get_boards(config, args)
+    results = list(boards.get_many(args.boards, ordered=True))
+    for result in results:
+        if result.error is not None:
+            raise result.error
+    columns = CardColumns.from_boards(
+        results, identifiers=boards.get_identifiers)
+    output_format, path = columns.write(args.output, args.export_format)
+    exported_tuple = namedtuple(
+        "Exported", ["file", "format", "boards", "cards"])
+    write_rows([exported_tuple(
+        path, output_format, str(len(results)), str(len(columns)))],
+        args, output=output)
+
+
+def import_cards(config, args, output=sys.stdout):
+    from lucky.cards import card_json, ingest_cards
+    imported_tuple = namedtuple("Imported", ["file", "card_id", "error"])
+    parsed = ingest_cards(
+        args.paths, max_workers=args.workers, processes=args.processes,
+        pattern=args.pattern)
+    failed = []
+    sources = {}
+
+    def cards():
+        for result in parsed:
+            if result.error is not None:
+                failed.append(result)
+                continue
+            card = card_json(result.card, int(args.lane), int(args.type))
+            sources[id(card)] = result.filename
+            yield card
+
+    def rows():
+        if args.dry_run:
+            for result in parsed:
+                yield imported_tuple(
+                    result.filename, "", str(result.error or ""))
+            return
+        for result in get_boards(config, args).add_cards(
+                args.board, cards(), batch_size=args.batch_size,
+                max_workers=args.workers):
+            yield imported_tuple(
+                sources.pop(id(result.card)), str(result.card_id or ""),
+                str(result.error or ""))
+        for result in failed:
+            yield imported_tuple(result.filename, "", str(result.error))
+
+    write_rows(rows(), args, output=output)
+
+
+def run(config, args):
     if args.command == "list-boards":
         list_boards(config, args)
 
@@ -116,5 +548,58 @@ def main():
     elif args.command == "show-cards":
         show_cards(config, args)
 
+    elif args.command == "snapshot":
+        save_snapshot(config, args)
+
+    elif args.command == "query":
+        query_cards(config, args)
+
+    elif args.command == "search":
+        search_cards(config, args)
+
+    elif args.command == "diff-board":
+        diff_board(config, args)
+
+    elif args.command == "watch":
+        watch_boards(config, args)
+
+    elif args.command == "export":
+        export_cards(config, args)
+
+    elif args.command == "import-cards":
+        import_cards(config, args)
+
+
+def main():
+    parser = create_parser()
+    args = parser.parse_args()
+
+    if args.all_accounts:
+        if args.command != "list-boards":
+            sys.exit("--all-accounts can only be used with list-boards")
+        configs = Config.load_all_from_homedir()
+        if not configs:
+            sys.exit("No configuration loaded")
+        list_all_accounts(configs, args)
+        return
+
+    if args.account:
+        config = Config.load_from_homedir(args.account)
+    else:
+        config = Config.load_from_env(os.environ) or \
+            Config.load_from_homedir()
+    if not config:
+        sys.exit("No configuration loaded")
+
+    args.profiler = None
+    if args.profile:
+        from lucky.instrument import Profiler
+        args.profiler = Profiler()
+    try:
+        run(config, args)
+    finally:
+        if args.profiler is not None:
+            args.profiler.report(sys.stderr)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,221 @@
+import re
+import sqlite3
+from collections import namedtuple
+
+from .sync import CARD_DELETED, event_type
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+# Added to a prefix for the end of the range of words starting with it.
+PREFIX_END = u"\uffff"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    board_id INTEGER,
+    card_id INTEGER,
+    title TEXT,
+    PRIMARY KEY (board_id, card_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS words (
+    word TEXT,
+    board_id INTEGER,
+    card_id INTEGER,
+    PRIMARY KEY (word, board_id, card_id)
+) WITHOUT ROWID;
+"""
+
+SearchHit = namedtuple("SearchHit", ["board_id", "card_id", "title"])
+
+
+def tokenize(text):
+    """
+    Returns the lower-cased words in the text.
+    """
+    if isinstance(text, str):
+        text = text.decode("utf-8")
+    return WORD.findall((text or u"").lower())
+
+
+class TitleIndex(object):
+    """
+    An inverted index of the words in card titles, across any number of
+    boards, held in a SQLite file, or in memory if no path is given.
+
+        with TitleIndex("titles.db") as index:
+            for result in boards.get_many(board_ids):
+                index.add_board(result.board)
+            index.search("log pag")
+
+    Each search word matches title words starting with it, and all the words
+    must match. The words are the primary key of the words table, so each
+    search word is a range lookup, and searching an index file only reads
+    the pages for the matching words rather than loading the whole index.
+
+    Boards can be added again as they change, or events applied from a
+    BoardSync, and only the cards that changed are re-indexed.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM titles").fetchone()[0]
+
+    def __nonzero__(self):
+        # Checks for a card without counting them all, as __len__ would.
+        return self.connection.execute(
+            "SELECT 1 FROM titles LIMIT 1").fetchone() is not None
+
+    def __contains__(self, key):
+        return self.connection.execute(
+            "SELECT 1 FROM titles WHERE board_id = ? AND card_id = ?",
+            key).fetchone() is not None
+
+    @property
+    def board_ids(self):
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT board_id FROM titles ORDER BY board_id")]
+
+    def _index(self, connection, board_id, cards, previous):
+        """
+        Indexes the cards, previous maps the ids of the cards already
+        indexed to their titles.
+        """
+        removed = []
+        added = []
+        for card in cards:
+            title = card.title or u""
+            if card.id in previous:
+                if previous[card.id] == title:
+                    continue
+                removed.append((card.id, previous[card.id]))
+            added.append((card.id, title))
+        self._remove(connection, board_id, removed)
+        connection.executemany(
+            "INSERT INTO titles VALUES (?, ?, ?)",
+            [(board_id, card_id, title) for card_id, title in added])
+        connection.executemany(
+            "INSERT INTO words VALUES (?, ?, ?)",
+            [(word, board_id, card_id) for card_id, title in added
+             for word in set(tokenize(title))])
+
+    def _remove(self, connection, board_id, cards):
+        """
+        Removes the cards, a list of (card_id, title) pairs.
+        """
+        connection.executemany(
+            "DELETE FROM titles WHERE board_id = ? AND card_id = ?",
+            [(board_id, card_id) for card_id, title in cards])
+        connection.executemany(
+            "DELETE FROM words WHERE word = ? AND board_id = ? AND "
+            "card_id = ?",
+            [(word, board_id, card_id) for card_id, title in cards
+             for word in set(tokenize(title))])
+
+    def _titles(self, board_id, card_ids=None):
+        if card_ids is None:
+            return dict(self.connection.execute(
+                "SELECT card_id, title FROM titles WHERE board_id = ?",
+                (board_id,)))
+        titles = {}
+        for card_id in card_ids:
+            row = self.connection.execute(
+                "SELECT title FROM titles WHERE board_id = ? AND card_id = ?",
+                (board_id, card_id)).fetchone()
+            if row is not None:
+                titles[card_id] = row[0]
+        return titles
+
+    def add_card(self, board_id, card):
+        """
+        Indexes the card's title, replacing the one indexed for it before.
+        """
+        with self.connection as connection:
+            self._index(connection, board_id, [card],
+                        self._titles(board_id, [card.id]))
+
+    def remove_card(self, board_id, card_id):
+        """
+        Removes the card from the index, if it's in it.
+        """
+        with self.connection as connection:
+            self._remove(connection, board_id,
+                         self._titles(board_id, [card_id]).items())
+
+    def add_board(self, board):
+        """
+        Indexes the cards on the board, re-indexing only those that have been
+        added or retitled, and removing those no longer on it, since the
+        board was last added.
+        """
+        previous = self._titles(board.id)
+        cards = [card for lane in board.lanes for card in lane.iter_cards()]
+        card_ids = set(card.id for card in cards)
+        with self.connection as connection:
+            self._remove(connection, board.id, [
+                (card_id, title) for card_id, title in previous.items()
+                if card_id not in card_ids])
+            self._index(connection, board.id, cards, previous)
+
+    def remove_board(self, board_id):
+        with self.connection as connection:
+            self._remove(connection, board_id, self._titles(board_id).items())
+
+    def apply(self, board, events):
+        """
+        Updates the index for the events returned by BoardSync.poll, once
+        they have been applied to the board.
+        """
+        for event in events:
+            card_id = event.get("CardId")
+            card = board.get_card_by_id(card_id)
+            if card is not None:
+                self.add_card(board.id, card)
+            elif event_type(event) == CARD_DELETED:
+                self.remove_card(board.id, card_id)
+            else:
+                # The board was refreshed, or the card left it, so any of its
+                # cards could have changed.
+                self.add_board(board)
+                return
+
+    def search(self, text, board_ids=None, limit=None):
+        """
+        Returns a SearchHit, ordered by board and card id, for each card with
+        a title word starting with each word in text, on the boards in
+        board_ids if provided.
+        """
+        words = sorted(set(tokenize(text)))
+        if not words:
+            return []
+        matches = " INTERSECT ".join(
+            ["SELECT DISTINCT board_id, card_id FROM words "
+             "WHERE word >= ? AND word < ?"] * len(words))
+        args = []
+        for word in words:
+            args.extend([word, word + PREFIX_END])
+        sql = ("SELECT titles.board_id, titles.card_id, titles.title "
+               "FROM (%s) AS matches JOIN titles "
+               "USING (board_id, card_id)" % matches)
+        if board_ids is not None:
+            board_ids = list(board_ids)
+            sql += " WHERE titles.board_id IN (%s)" % ", ".join(
+                "?" * len(board_ids))
+            args.extend(board_ids)
+        sql += " ORDER BY titles.board_id, titles.card_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [SearchHit(*row) for row in self.connection.execute(sql, args)]
@@ -0,0 +1,188 @@
+import sqlite3
+import time
+
+from .board import Board, Card, Lane
+
+# Read the snapshot through a memory-map of up to this many bytes.
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    active INTEGER,
+    version INTEGER,
+    saved REAL
+);
+CREATE TABLE IF NOT EXISTS card_types (
+    board_id INTEGER,
+    id INTEGER,
+    name TEXT,
+    PRIMARY KEY (board_id, id)
+);
+CREATE TABLE IF NOT EXISTS lanes (
+    board_id INTEGER,
+    id INTEGER,
+    position INTEGER,
+    title TEXT,
+    lane_index INTEGER,
+    card_limit INTEGER,
+    PRIMARY KEY (board_id, id)
+);
+CREATE INDEX IF NOT EXISTS lanes_by_title ON lanes (board_id, title);
+CREATE TABLE IF NOT EXISTS cards (
+    board_id INTEGER,
+    id INTEGER,
+    lane_id INTEGER,
+    position INTEGER,
+    title TEXT,
+    type_id INTEGER,
+    assigned_user TEXT,
+    PRIMARY KEY (board_id, id)
+);
+CREATE INDEX IF NOT EXISTS cards_by_lane
+    ON cards (board_id, lane_id, position);
+CREATE INDEX IF NOT EXISTS cards_by_user ON cards (board_id, assigned_user);
+CREATE INDEX IF NOT EXISTS cards_by_type ON cards (board_id, type_id);
+"""
+
+CARD_COLUMNS = "id, title, type_id, assigned_user"
+
+
+class SnapshotStore(object):
+    """
+    Saves boards to a local SQLite file, and serves boards, lanes and cards
+    from it without fetching or parsing JSON.
+
+    Lookups by lane, card, user and type go through indexes, and the file is
+    read through a memory-map.
+    """
+
+    def __init__(self, path, config=None, clock=time.time):
+        self.path = path
+        self.config = config
+        self.clock = clock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA mmap_size = %d" % MMAP_SIZE)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def save(self, board):
+        """
+        Stores the board, replacing any earlier snapshot of it.
+        """
+        with self.connection as connection:
+            for table, column in [("boards", "id"), ("card_types", "board_id"),
+                                  ("lanes", "board_id"),
+                                  ("cards", "board_id")]:
+                connection.execute(
+                    "DELETE FROM %s WHERE %s = ?" % (table, column),
+                    (board.id,))
+            connection.execute(
+                "INSERT INTO boards VALUES (?, ?, ?, ?, ?, ?)",
+                (board.id, board.title, board.description, board.active,
+                 board.version, self.clock()))
+            connection.executemany(
+                "INSERT INTO card_types VALUES (?, ?, ?)",
+                [(board.id, type_id, name)
+                 for type_id, name in board.card_types.items()])
+            connection.executemany(
+                "INSERT INTO lanes VALUES (?, ?, ?, ?, ?, ?)",
+                [(board.id, lane.id, position, lane.title, lane.index,
+                  lane.card_limit)
+                 for position, lane in enumerate(board.lanes)])
+            connection.executemany(
+                "INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._card_rows(board))
+
+    def _card_rows(self, board):
+        for lane in board.lanes:
+            for position, card in enumerate(lane.iter_cards()):
+                yield (board.id, card.id, lane.id, position, card.title,
+                       card.type_id, card.assigned_user)
+
+    def list(self):
+        """
+        Yields (board_id, title, saved) for each board in the snapshot.
+        """
+        for row in self.connection.execute(
+                "SELECT id, title, saved FROM boards ORDER BY id"):
+            yield row
+
+    def __contains__(self, board_id):
+        return self.connection.execute(
+            "SELECT 1 FROM boards WHERE id = ?", (board_id,)).fetchone() \
+            is not None
+
+    def get(self, board_id):
+        """
+        Returns the Board with the supplied id, or None if it's not in the
+        snapshot.
+        """
+        row = self.connection.execute(
+            "SELECT id, title, description, active, version FROM boards "
+            "WHERE id = ?", (board_id,)).fetchone()
+        if row is None:
+            return
+        board = Board(self.config, row[0], row[1], row[2], bool(row[3]))
+        board.version = row[4]
+        board.card_types = dict(self.connection.execute(
+            "SELECT id, name FROM card_types WHERE board_id = ?",
+            (board_id,)))
+        lanes = [self._lane(row) for row in self.connection.execute(
+            "SELECT id, title, lane_index, card_limit FROM lanes "
+            "WHERE board_id = ? ORDER BY position", (board_id,))]
+        lanes_by_id = dict((lane.id, lane) for lane in lanes)
+        for row in self.connection.execute(
+                "SELECT lane_id, " + CARD_COLUMNS + " FROM cards "
+                "WHERE board_id = ? ORDER BY lane_id, position",
+                (board_id,)):
+            lanes_by_id[row[0]].cards.append(self._card(row[1:]))
+        board.lanes = lanes
+        return board
+
+    def _lane(self, row):
+        return Lane(self.config, row[0], row[1], row[2], row[3])
+
+    def _card(self, row):
+        return Card(self.config, row[0], row[1], row[2], row[3])
+
+    def _cards(self, where, args):
+        return [self._card(row) for row in self.connection.execute(
+            "SELECT " + CARD_COLUMNS + " FROM cards WHERE " + where, args)]
+
+    def get_lane_by_id(self, board_id, lane_id):
+        """
+        Returns the Lane with its cards, or None if it's not in the snapshot.
+        """
+        row = self.connection.execute(
+            "SELECT id, title, lane_index, card_limit FROM lanes "
+            "WHERE board_id = ? AND id = ?", (board_id, lane_id)).fetchone()
+        if row is None:
+            return
+        lane = self._lane(row)
+        lane.cards = self._cards(
+            "board_id = ? AND lane_id = ? ORDER BY position",
+            (board_id, lane_id))
+        return lane
+
+    def get_card_by_id(self, board_id, card_id):
+        cards = self._cards("board_id = ? AND id = ?", (board_id, card_id))
+        if cards:
+            return cards[0]
+
+    def get_cards_by_user(self, board_id, user):
+        return self._cards(
+            "board_id = ? AND assigned_user = ?", (board_id, user))
+
+    def get_cards_by_type(self, board_id, type_id):
+        return self._cards("board_id = ? AND type_id = ?", (board_id, type_id))
@@ -0,0 +1,151 @@
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+WILDCARD = "*"
+
+_decoder = json.JSONDecoder()
+
+
+def _matches(path, pattern):
+    if len(path) != len(pattern):
+        return False
+    for key, expected in zip(path, pattern):
+        if expected != WILDCARD and key != expected:
+            return False
+    return True
+
+
+class _Reader(object):
+    """
+    Incrementally decodes a JSON document from an iterable of byte chunks,
+    holding only the undecoded part of the document in memory.
+    """
+
+    def __init__(self, chunks, encoding="utf-8"):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder(encoding)()
+        self.buffer = u""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=0):
+        """
+        Reads chunks until at least size more characters are available, or
+        the end of the document is reached.
+
+        Returns False if there was nothing left to read.
+        """
+        if self.eof:
+            return False
+        pending = [self.buffer[self.pos:]]
+        read = 0
+        while True:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                pending.append(self.text_decoder.decode(b"", True))
+                self.eof = True
+                break
+            text = self.text_decoder.decode(chunk)
+            pending.append(text)
+            read += len(text)
+            if read > size:
+                break
+        self.buffer = u"".join(pending)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character, or None at the end of
+        the document.
+        """
+        while True:
+            while (self.pos < len(self.buffer) and
+                    self.buffer[self.pos] in WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return
+
+    def expect(self, character):
+        if self.peek() != character:
+            raise ValueError(
+                "Expected %r at %d" % (character, self.pos))
+        self.pos += 1
+
+    def decode(self):
+        """
+        Decodes the complete value starting at the current position.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # The value is incomplete, read at least as much again.
+                if not self.fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next
+            # chunk.
+            if end == len(self.buffer) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def walk(self, path, patterns):
+        """
+        Yields (path, value) for each value in the document whose path matches
+        one of the patterns, descending into all other containers rather
+        than decoding them whole.
+        """
+        if any(_matches(path, pattern) for pattern in patterns):
+            yield path, self.decode()
+            return
+        character = self.peek()
+        if character == "{":
+            self.pos += 1
+            first = True
+            while self.peek() != "}":
+                if not first:
+                    self.expect(",")
+                key = self.decode()
+                self.expect(":")
+                for item in self.walk(path + (key,), patterns):
+                    yield item
+                first = False
+            self.pos += 1
+        elif character == "[":
+            self.pos += 1
+            index = 0
+            while self.peek() != "]":
+                if index:
+                    self.expect(",")
+                for item in self.walk(path + (index,), patterns):
+                    yield item
+                index += 1
+            self.pos += 1
+        elif character is None:
+            raise ValueError("Unexpected end of document")
+        else:
+            self.decode()
+
+
+def iter_json(chunks, patterns):
+    """
+    Parses the JSON document read from chunks, yielding (path, value) for
+    each value whose path matches one of the patterns as soon as it has been
+    read.
+
+    Paths are tuples of object keys and list indexes, "*" in a pattern
+    matches any key or index, e.g. ("ReplyData", 0, "*") yields each of the
+    items in the first element of ReplyData.
+
+    Values that don't match are discarded as they're read, so only the
+    matching values are ever held in memory.
+    """
+    return _Reader(chunks).walk((), [tuple(p) for p in patterns])
@@ -0,0 +1,134 @@
+from .board import Board, Card
+
+CARD_CREATED = "CardCreation"
+CARD_MOVED = "CardMove"
+CARD_DELETED = "CardDelete"
+
+# CardId used by events summarising more changes than can be listed.
+NUMEROUS_EVENTS = -1
+
+
+def event_type(event):
+    """
+    Returns the event type without the "Event"/"EventDTO" suffix, e.g.
+    "CardMove" for "CardMoveEvent".
+    """
+    name = event.get("EventType") or ""
+    for suffix in ["EventDTO", "Event"]:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class BoardSync(object):
+    """
+    Keeps a Board up to date by applying the changes made since the version
+    last seen, rather than fetching the whole board again.
+
+        sync = BoardSync(Boards(config), board_id)
+        while True:
+            for event in sync.poll():
+                ...
+
+    Moves and deletions are applied from the events alone, created and
+    changed cards are fetched individually, and the whole board is only
+    fetched again when LeanKit reports that it needs refreshing. Cards moved
+    to or created in the backlog or archive, which a Board doesn't hold, are
+    removed from the board.
+    """
+
+    def __init__(self, boards, board_id=None, board=None):
+        self.boards = boards
+        if board is None:
+            board = boards.get(board_id)
+        self.board = board
+
+    @property
+    def version(self):
+        return self.board.version
+
+    def poll(self):
+        """
+        Applies the changes since the last version seen to the board, and
+        returns the list of events applied.
+        """
+        updates = self.boards.check_for_updates(
+            self.board.id, self.board.version)
+        if not updates["HasUpdates"]:
+            return []
+        events = updates["Events"] or []
+        if self._requires_refresh(updates, events):
+            self.refresh(updates.get("NewPayload"))
+        else:
+            self.apply(events)
+            self.board.version = updates["CurrentBoardVersion"]
+        return events
+
+    def _requires_refresh(self, updates, events):
+        if updates.get("RequiresRefesh") or updates.get("RequiresRefresh"):
+            return True
+        for event in events:
+            if (event.get("RequiresBoardRefresh") or
+                    event.get("CardId") == NUMEROUS_EVENTS):
+                return True
+        return False
+
+    def refresh(self, data=None):
+        """
+        Replaces the board with a complete copy, from data if provided.
+
+        The copy is always fetched from LeanKit, as a copy from a snapshot
+        would take the board back to an older version.
+        """
+        if data is not None:
+            board = Board.create_from_board_json(self.boards.config, data)
+        else:
+            board = self.boards.get(self.board.id, use_snapshot=False)
+        self.board.replace_with(board)
+
+    def apply(self, events):
+        """
+        Applies a list of events to the board in place.
+        """
+        board = self.board
+        changed = []
+        for event in events:
+            card_id = event["CardId"]
+            kind = event_type(event)
+            if kind == CARD_DELETED:
+                if board.get_card_by_id(card_id) is not None:
+                    board.remove_card(card_id)
+                if card_id in changed:
+                    changed.remove(card_id)
+            elif (kind == CARD_MOVED and
+                    board.get_card_by_id(card_id) is not None and
+                    event.get("ToLaneId") is not None):
+                if board.get_lane_by_id(event["ToLaneId"]) is not None:
+                    board.move_card(card_id, event["ToLaneId"])
+                else:
+                    # Moved to the backlog or archive, which the board
+                    # doesn't hold.
+                    board.remove_card(card_id)
+            elif card_id not in changed:
+                changed.append(card_id)
+
+        for card_id in changed:
+            self._update_card(card_id)
+
+    def _update_card(self, card_id):
+        board = self.board
+        data = self.boards.get_card_json(board.id, card_id)
+        card = Card.create_from_card_json(self.boards.config, data)
+        lane = board.get_lane_for_card(card_id)
+        if board.get_lane_by_id(data["LaneId"]) is None:
+            # The card is in the backlog or archive, which the board doesn't
+            # hold, so it has left the board.
+            if lane is not None:
+                board.remove_card(card_id)
+            return
+        if lane is None:
+            board.add_card(data["LaneId"], card, data.get("Index"))
+            return
+        board.update_card(card)
+        if lane.id != data["LaneId"]:
+            board.move_card(card_id, data["LaneId"], data.get("Index"))
@@ -0,0 +1,316 @@
+import random
+import re
+import threading
+import time
+from urlparse import urlsplit
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+DEFAULT_RATE = 25
+DEFAULT_BURST = 50
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class RateLimiter(object):
+    """
+    Token bucket allowing rate requests per second on average, and bursts of
+    up to burst requests.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available.
+        """
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+
+
+class RetryPolicy(object):
+    """
+    Decides whether and when to retry a failed request.
+
+    Failed requests are retried up to max_retries times, waiting a random
+    time of up to backoff * 2 ** attempt seconds (capped at max_backoff), or
+    for as long as the server asks with Retry-After if that's longer.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30,
+                 statuses=RETRY_STATUSES, random=random.random):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.random = random
+
+    def should_retry(self, attempt, response=None):
+        if attempt >= self.max_retries:
+            return False
+        return response is None or response.status_code in self.statuses
+
+    def delay(self, attempt, response=None):
+        delay = self.random() * min(
+            self.max_backoff, self.backoff * (2 ** attempt))
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(
+                response.headers.get("Retry-After"))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def parse_retry_after(value, clock=time.time):
+    """
+    Returns the number of seconds to wait from a Retry-After header, which
+    can either be a number of seconds or an HTTP date.
+    """
+    if not value:
+        return
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    from email.utils import mktime_tz, parsedate_tz
+    parsed = parsedate_tz(value)
+    if parsed is not None:
+        return max(0, mktime_tz(parsed) - clock())
+
+
+def endpoint_for_url(url):
+    """
+    Returns the URL path with the numeric ids replaced, so that requests for
+    different boards and cards are counted together.
+    """
+    return re.sub(r"/\d+(?=/|$)", "/{id}", urlsplit(url).path)
+
+
+class EndpointStats(object):
+    """
+    Counters for the requests made to an endpoint.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def mean_time(self):
+        if self.requests:
+            return self.total_time / self.requests
+        return 0.0
+
+    def __repr__(self):
+        return (
+            "<EndpointStats requests=%d retries=%d errors=%d coalesced=%d "
+            "mean_time=%.3f max_time=%.3f>" % (
+                self.requests, self.retries, self.errors, self.coalesced,
+                self.mean_time, self.max_time))
+
+
+class _InFlight(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class Transport(object):
+    """
+    Wraps a pooled requests.Session so that connections (and their TLS
+    sessions) are kept alive and reused across requests.
+
+    A single Transport can be shared between any number of Boards instances,
+    the credentials are supplied per-request.
+
+    pool_connections is the number of per-host pools to keep, pool_maxsize is
+    the number of connections kept open to each host, and if pool_block is
+    True, no more than pool_maxsize connections will be opened to a host at
+    once.
+
+    Each request takes a token from the rate_limiter, which is shared by all
+    transports by default, failed requests are retried according to the
+    retry policy, and identical GETs made while one is in flight share its
+    response. Per-endpoint counters are kept in stats.
+    """
+
+    def __init__(
+            self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+            keep_alive=True, session=None, rate_limiter=None, retry=None,
+            sleep=time.sleep, clock=time.time):
+        # requests is slow to import, so only import it once it's needed.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.session = session or requests.Session()
+        for prefix in ["https://", "http://"]:
+            self.session.mount(prefix, HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block))
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.retry = retry or RetryPolicy()
+        self.sleep = sleep
+        self.clock = clock
+        self.stats = {}
+        self._request_errors = (
+            requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _count(self, url, **counts):
+        """
+        Adds to the counters for the endpoint of the url.
+        """
+        endpoint = endpoint_for_url(url)
+        with self._lock:
+            stats = self.stats.get(endpoint)
+            if stats is None:
+                stats = self.stats[endpoint] = EndpointStats()
+            for name, value in counts.items():
+                setattr(stats, name, getattr(stats, name) + value)
+            if "total_time" in counts:
+                stats.max_time = max(stats.max_time, counts["total_time"])
+
+    def get(self, url, auth=None, **kwargs):
+        """
+        Perform a GET request over the pooled session.
+
+        Streamed requests aren't shared, as their body can only be read
+        once.
+        """
+        if kwargs.get("stream"):
+            return self._request("GET", url, auth, kwargs)
+
+        key = (url, auth, repr(sorted((kwargs.get("headers") or {}).items())))
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+        if not leader:
+            self._count(url, coalesced=1)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.response
+
+        try:
+            call.response = self._request("GET", url, auth, kwargs)
+            # Read the body before sharing the response.
+            call.response.content
+            return call.response
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def post(self, url, auth=None, **kwargs):
+        """
+        Perform a POST request over the pooled session.
+
+        As a POST may not be safe to repeat, it's only retried when the
+        server rejected it with a 429 status without processing it.
+        """
+        return self._request("POST", url, auth, kwargs)
+
+    def _should_retry(self, method, attempt, response):
+        if method != "GET" and (response is None or
+                                response.status_code != 429):
+            return False
+        return self.retry.should_retry(attempt, response)
+
+    def _request(self, method, url, auth, kwargs):
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            start = self.clock()
+            response = None
+            try:
+                response = self.session.request(
+                    method, url, auth=auth, **kwargs)
+            except self._request_errors:
+                if not self._should_retry(method, attempt, None):
+                    self._count(url, errors=1)
+                    raise
+            finally:
+                self._count(url, requests=1, total_time=self.clock() - start)
+
+            if response is not None and \
+                    not self._should_retry(method, attempt, response):
+                if response.status_code >= 400:
+                    self._count(url, errors=1)
+                return response
+            if response is not None:
+                # Read the body so that the connection is released.
+                response.content
+            self._count(url, retries=1)
+            self.sleep(self.retry.delay(attempt, response))
+            attempt += 1
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+
+_default_transport = None
+_default_rate_limiter = None
+
+
+def get_default_rate_limiter():
+    """
+    Returns the RateLimiter shared by all Transports created without an
+    explicit rate_limiter.
+    """
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        _default_rate_limiter = RateLimiter()
+    return _default_rate_limiter
+
+
+def get_default_transport():
+    """
+    Returns the Transport shared by all Boards created without an explicit
+    transport, creating it on first use.
+    """
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = Transport()
+    return _default_transport
@@ -0,0 +1,164 @@
+import heapq
+import random
+import threading
+import time
+
+from .sync import BoardSync
+
+DEFAULT_MIN_INTERVAL = 5
+DEFAULT_MAX_INTERVAL = 300
+
+# How much the interval for a board grows after a poll without changes,
+# and shrinks after a poll with changes.
+BACKOFF = 1.5
+SPEEDUP = 0.5
+
+# Each interval is varied randomly by up to this fraction, so that boards
+# polled at the same interval drift apart rather than polling together.
+JITTER = 0.1
+
+
+class WatchedBoard(object):
+    """
+    The polling state for a board.
+    """
+
+    def __init__(self, board_id, interval):
+        self.board_id = board_id
+        self.interval = interval
+        self.sync = None
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+
+
+class BoardWatcher(object):
+    """
+    Polls many boards for changes from a single scheduler.
+
+        watcher = BoardWatcher(Boards(config), board_ids, callback)
+        watcher.run()
+
+    Each board is polled with check_for_updates through a BoardSync, so
+    only the first poll fetches the whole board. Boards that had changes
+    are polled again sooner, down to min_interval seconds, and boards
+    without changes less often, up to max_interval seconds. The first polls
+    are spread over min_interval seconds, and each interval is jittered, so
+    that boards don't poll in bursts.
+
+    callback is called with the board id and each event applied, and
+    error_callback with the board id and the exception when a poll fails.
+    """
+
+    def __init__(self, boards, board_ids, callback=None,
+                 error_callback=None, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, max_workers=4,
+                 clock=time.time, sleep=None, random=random.random):
+        self.boards = boards
+        self.callback = callback
+        self.error_callback = error_callback
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_workers = max_workers
+        self.clock = clock
+        self.random = random
+        self.watched = {}
+        self._queue = []
+        self._stopped = threading.Event()
+        # Waiting on the stopped event lets stop() interrupt the wait.
+        self.sleep = sleep or self._stopped.wait
+        board_ids = list(board_ids)
+        now = clock()
+        for i, board_id in enumerate(board_ids):
+            self.watched[board_id] = WatchedBoard(board_id, min_interval)
+            start = now + min_interval * float(i) / len(board_ids)
+            heapq.heappush(self._queue, (start, i, board_id))
+        self._sequence = len(board_ids)
+
+    def _schedule(self, watched, now):
+        delay = watched.interval * (1 + JITTER * (2 * self.random() - 1))
+        self._sequence += 1
+        heapq.heappush(
+            self._queue, (now + delay, self._sequence, watched.board_id))
+
+    def _poll(self, watched):
+        """
+        Returns the events applied to the board, or the exception raised
+        while polling it.
+        """
+        try:
+            if watched.sync is None:
+                watched.sync = BoardSync(self.boards, watched.board_id)
+                return []
+            return watched.sync.poll()
+        except Exception as e:
+            return e
+
+    def _due(self, now):
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(self.watched[heapq.heappop(self._queue)[2]])
+        return due
+
+    def poll_due(self, pool=None):
+        """
+        Polls the boards that are due, and returns the number polled.
+        """
+        due = self._due(self.clock())
+        if not due:
+            return 0
+        if pool is None or len(due) == 1:
+            results = [self._poll(watched) for watched in due]
+        else:
+            results = pool.map(self._poll, due)
+        now = self.clock()
+        for watched, result in zip(due, results):
+            watched.polls += 1
+            if isinstance(result, Exception):
+                watched.errors += 1
+                watched.interval = min(
+                    self.max_interval, watched.interval * BACKOFF)
+                if self.error_callback is not None:
+                    self.error_callback(watched.board_id, result)
+            elif result:
+                watched.changes += 1
+                watched.interval = max(
+                    self.min_interval, watched.interval * SPEEDUP)
+                if self.callback is not None:
+                    for event in result:
+                        self.callback(watched.board_id, event)
+            else:
+                watched.interval = min(
+                    self.max_interval, watched.interval * BACKOFF)
+            self._schedule(watched, now)
+        return len(due)
+
+    def next_poll(self):
+        """
+        Returns the time the next board is due to be polled.
+        """
+        return self._queue[0][0]
+
+    def run(self, polls=None):
+        """
+        Polls the boards as they become due until stop is called, or until
+        polls boards have been polled.
+        """
+        if not self._queue:
+            return
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(self.max_workers)
+        try:
+            polled = 0
+            while not self._stopped.is_set():
+                polled += self.poll_due(pool)
+                if polls is not None and polled >= polls:
+                    return
+                wait = self.next_poll() - self.clock()
+                if wait > 0:
+                    self.sleep(wait)
+        finally:
+            pool.terminate()
+
+    def stop(self):
+        self._stopped.set()
@@ -1,7 +1,34 @@
+from io import BytesIO
 from os import path
 import inspect
 
-from httmock import urlmatch
+from httmock import response, urlmatch
+
+
+class RawBody(BytesIO):
+    """
+    Stand-in for the urllib3 response body of a streamed response.
+    """
+
+    def release_conn(self):
+        pass
+
+
+class FakeClock(object):
+    """
+    Stand-in for time.time and time.sleep, sleeping moves the time on.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
 
 
 def get_fixture_path(fixture_name):
@@ -31,6 +58,9 @@ def mock_url(url, fixture, mock_requests=None):
     def mock_url(url, request):
         if mock_requests is not None:
             mock_requests.append(request)
-        return data
+        # Provide the raw body too, so that streamed responses can be read.
+        result = response(content=data, request=request)
+        result.raw = RawBody(data)
+        return result
     return mock_url
 
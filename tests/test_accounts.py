@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+from httmock import HTTMock, response, urlmatch
+
+import lucky
+from lucky.accounts import MultiAccountBoards
+from lucky.errors import APIError
+
+from .helpers import RawBody, load_fixture
+
+
+@urlmatch(path=r".*\/Boards(\/\d+)?$")
+def mock_accounts(url, request):
+    if url.netloc.startswith("broken."):
+        return response(404, "", request=request)
+    if url.path.endswith("/Boards"):
+        data = load_fixture("get_boards.json")
+    else:
+        data = load_fixture("get_board.json")
+    result = response(content=data, request=request)
+    result.raw = RawBody(data)
+    return result
+
+
+class MultiAccountBoardsTestCase(TestCase):
+
+    def setUp(self):
+        self.accounts = MultiAccountBoards([
+            lucky.Config(account, "testing@example.com", "password")
+            for account in ["first", "second", "broken"]])
+        self.addCleanup(self.accounts.close)
+
+    def test_accounts_have_own_transports(self):
+        """
+        Each account has its own connection pool and rate limiter.
+        """
+        first = self.accounts.accounts["first"].transport
+        second = self.accounts.accounts["second"].transport
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.session, second.session)
+        self.assertIsNot(first.rate_limiter, second.rate_limiter)
+
+    def test_list(self):
+        """
+        MultiAccountBoards.list merges the boards from all the accounts,
+        reporting the accounts that failed.
+        """
+        with HTTMock(mock_accounts):
+            results = list(self.accounts.list())
+        boards = sorted((result.account, result.board_id)
+                        for result in results if result.error is None)
+        self.assertEqual(
+            [("first", 101), ("first", 102), ("first", 103),
+             ("second", 101), ("second", 102), ("second", 103)],
+            boards)
+        errors = [result for result in results if result.error is not None]
+        self.assertEqual(["broken"], [result.account for result in errors])
+        self.assertIsInstance(errors[0].error, APIError)
+
+    def test_get_many(self):
+        """
+        MultiAccountBoards.get_many fetches boards from several accounts.
+        """
+        with HTTMock(mock_accounts):
+            results = sorted(self.accounts.get_many(
+                [("first", 101000), ("second", 101000), ("broken", 1)]))
+        self.assertEqual(
+            ["broken", "first", "second"],
+            [result.account for result in results])
+        self.assertIsInstance(results[0].error, APIError)
+        self.assertEqual(6, len(results[1].board.lanes))
+        self.assertIsNone(results[2].error)
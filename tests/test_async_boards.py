@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+import mock
+from httmock import HTTMock
+
+import lucky
+from lucky.async_boards import AsyncBoards
+from lucky.board import Board
+from lucky.errors import APIError
+from lucky.transport import Transport
+
+from .helpers import mock_url
+
+
+class AsyncBoardsTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.boards = AsyncBoards(config, concurrency=2)
+
+    def tearDown(self):
+        self.boards.close()
+
+    def test_list(self):
+        """
+        AsyncBoards.list() resolves to the boards in the account.
+        """
+        with HTTMock(mock_url(r".*\/Boards$", "get_boards.json")):
+            boards = self.boards.list().get(5)
+        self.assertEqual([101, 102, 103], [b["board_id"] for b in boards])
+
+    def test_get(self):
+        """
+        AsyncBoards.get() resolves to the same Board objects as Boards.get().
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            pending = [self.boards.get("12345") for i in range(4)]
+            boards = AsyncBoards.gather(pending, 5)
+        self.assertEqual(4, len(boards))
+        for board in boards:
+            self.assertIsInstance(board, Board)
+            self.assertEqual("Simple Board", board.title)
+
+    def test_get_identifiers(self):
+        """
+        AsyncBoards.get_identifiers() resolves to the board identifiers.
+        """
+        mock_request = mock_url(
+            r".*\/Boards\/12345/GetBoardIdentifiers$",
+            "get_board_identifiers.json")
+        with HTTMock(mock_request):
+            result = self.boards.get_identifiers(12345).get(5)
+        self.assertEqual({1: "demouser@leankitkanban.com"}, result["users"])
+
+    def test_gather_reraises_errors(self):
+        """
+        AsyncBoards.gather() raises the error from a failed request.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "error_reply.json")):
+            pending = [self.boards.get("12345")]
+            with self.assertRaises(APIError) as raised:
+                AsyncBoards.gather(pending, 5)
+        self.assertEqual(205, raised.exception.reply_code)
+
+    def test_close_closes_own_transport(self):
+        """
+        AsyncBoards.close() closes the transport it created, but not one it
+        was given.
+        """
+        config = lucky.Config("testing", "testing@example.com", "password")
+        with mock.patch.object(Transport, "close") as close:
+            with AsyncBoards(config):
+                pass
+            self.assertEqual(1, close.call_count)
+            with AsyncBoards(config, transport=Transport()):
+                pass
+            self.assertEqual(1, close.call_count)
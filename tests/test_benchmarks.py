@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from lucky.board import Boards
+from lucky.config import Config
+from lucky.errors import APIError
+from lucky.transport import RateLimiter, Transport
+
+from benchmarks.server import FakeLeanKitServer, SyntheticAPI
+from benchmarks.throughput import measure, previous_run
+
+
+class FakeLeanKitServerTestCase(TestCase):
+
+    def setUp(self):
+        self.server = FakeLeanKitServer(
+            SyntheticAPI(boards=2, lanes=3, cards_per_lane=4)).start()
+        self.addCleanup(self.server.stop)
+        self.transport = Transport(rate_limiter=RateLimiter())
+        self.addCleanup(self.transport.close)
+        config = Config("benchmark", "benchmark@example.com", "password",
+                        base_url=self.server.base_url)
+        self.boards = Boards(config, transport=self.transport)
+
+    def test_list(self):
+        """
+        The server lists the synthetic boards.
+        """
+        self.assertEqual(
+            [1, 2], [board["board_id"] for board in self.boards.list()])
+
+    def test_get(self):
+        """
+        The server serves boards of the requested size.
+        """
+        board = self.boards.get(2)
+        self.assertEqual(3, len(board.lanes))
+        self.assertEqual(4, len(board.lanes[0].cards))
+
+    def test_get_identifiers(self):
+        """
+        The server serves the identifiers for a board.
+        """
+        identifiers = self.boards.get_identifiers(1)
+        self.assertEqual("Lane 0", identifiers["lanes"][1000])
+
+    def test_missing_board(self):
+        """
+        Boards that weren't generated aren't found.
+        """
+        self.assertRaises(APIError, self.boards.get, 3)
+
+    def test_measure(self):
+        """
+        measure reports the throughput and latencies for the calls.
+        """
+        result = measure("Boards.get", lambda: self.boards.get(1), 4, 2)
+        self.assertEqual("Boards.get", result["name"])
+        self.assertEqual(4, result["runs"])
+        self.assertTrue(result["per_second"] > 0)
+        self.assertTrue(result["p50_ms"] <= result["max_ms"])
+
+
+class PreviousRunTestCase(TestCase):
+
+    def test_previous_run(self):
+        """
+        previous_run returns the last run with the same parameters.
+        """
+        runs = [{"parameters": {"cards": 1}, "label": "0.1"},
+                {"parameters": {"cards": 2}, "label": "0.2"},
+                {"parameters": {"cards": 1}, "label": "0.3"}]
+        self.assertEqual("0.3", previous_run(runs, {"cards": 1})["label"])
+        self.assertIsNone(previous_run(runs, {"cards": 3}))
@@ -1,13 +1,20 @@
 # Copyright 2014 Kevin McDermott
+import pickle
 from datetime import date
 from unittest import TestCase
 
 from httmock import HTTMock
+import mock
+
+from httmock import response, urlmatch
 
 import lucky
-from lucky.board import Boards
+from lucky.board import (
+    Boards, Card, CardChange, Lane, CARD_ADDED, CARD_MOVED, CARD_REASSIGNED,
+    CARD_REMOVED, CARD_RETITLED, CARD_TYPE_CHANGED)
+from lucky.errors import APIError
 
-from .helpers import mock_url
+from .helpers import RawBody, mock_url
 
 test_lanes = {
     101101: "Backlog",
@@ -79,7 +86,29 @@ class BoardsTestCase(TestCase):
         If we get an error, we should raise an application specific error
         with the details so that effective debugging can be carried out.
         """
-        # TODO: Test this with an error response
+        with HTTMock(mock_url(r".*\/Boards$", "error_reply.json")):
+            with self.assertRaises(APIError) as context:
+                list(self.boards.list())
+        self.assertEqual(205, context.exception.reply_code)
+        self.assertEqual(
+            "The requested board was not found.",
+            context.exception.reply_text)
+
+    def test_list_with_http_error(self):
+        """
+        An HTTP error status raises an APIError with the status.
+        """
+        @urlmatch(path=r".*\/Boards$")
+        def mock_request(url, request):
+            result = response(401, "Unauthorized", request=request)
+            result.raw = RawBody("Unauthorized")
+            return result
+
+        with HTTMock(mock_request):
+            with self.assertRaises(APIError) as context:
+                list(self.boards.list())
+        self.assertEqual(401, context.exception.status_code)
+        self.assertIsNone(context.exception.reply_code)
 
     def test_get(self):
         """
@@ -104,12 +133,85 @@ class BoardsTestCase(TestCase):
              101306: "Defect"},
             board.card_types)
 
+    def test_get_streamed(self):
+        """
+        Boards.get(board_id, stream=True) builds the same board from the
+        streamed response.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            board = self.boards.get("12345")
+            streamed = self.boards.get("12345", stream=True)
+
+        self.assertEqual(board.title, streamed.title)
+        self.assertEqual(board.description, streamed.description)
+        self.assertEqual(board.active, streamed.active)
+        self.assertEqual(board.card_types, streamed.card_types)
+        self.assertEqual(
+            [(lane.id, [card.id for card in lane.cards])
+             for lane in board.lanes],
+            [(lane.id, [card.id for card in lane.cards])
+             for lane in streamed.lanes])
+        self.assertEqual(101107, streamed.get_lane_for_card(101622).id)
+
+    def test_iter_lanes(self):
+        """
+        Boards.iter_lanes(board_id) yields the lanes of the board.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            lanes = list(self.boards.iter_lanes("12345"))
+        self.assertEqual(
+            ["Ready", "In Process", "Development",
+             "Testing", "Deployment", "Done"],
+            [lane.title for lane in lanes])
+
     def test_get_with_error(self):
         """
         If we get an error, we should raise an application specific error
         with the details so that effective debugging can be carried out.
         """
-        # TODO: Test this with an error response
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "error_reply.json")):
+            with self.assertRaises(APIError) as context:
+                self.boards.get("12345")
+            self.assertRaises(
+                APIError, self.boards.get, "12345", stream=True)
+        self.assertEqual(205, context.exception.reply_code)
+        self.assertIn("Boards/12345", str(context.exception))
+
+    def test_get_many(self):
+        """
+        Boards.get_many(board_ids) yields a result for each of the boards.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/1234[56]$", "get_board.json")):
+            results = list(self.boards.get_many(["12345", "12346"]))
+        self.assertEqual(
+            ["12345", "12346"], sorted(r.board_id for r in results))
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual("Simple Board", result.board.title)
+
+    def test_get_many_ordered(self):
+        """
+        Boards.get_many(board_ids, ordered=True) yields the results in the
+        order the boards were requested.
+        """
+        board_ids = [str(i) for i in range(12340, 12350)]
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            results = list(self.boards.get_many(
+                board_ids, max_workers=3, ordered=True))
+        self.assertEqual(board_ids, [r.board_id for r in results])
+
+    def test_get_many_with_error(self):
+        """
+        A board that fails to be fetched is reported with its error without
+        affecting the other boards.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json"),
+                     mock_url(r".*\/Boards\/12346$", "get_boards.json")):
+            results = list(self.boards.get_many(
+                ["12345", "12346"], ordered=True))
+        self.assertEqual("Simple Board", results[0].board.title)
+        self.assertIsNone(results[1].board)
+        self.assertIsNotNone(results[1].error)
 
     def test_get_identifiers(self):
         """
@@ -141,22 +243,52 @@ class BoardsTestCase(TestCase):
 
     def test_get_identifiers_with_error(self):
         """
+        Errors fetching the identifiers raise an APIError, and aren't cached.
+        """
+        mock_request = mock_url(
+            r".*\/Boards\/12345/GetBoardIdentifiers$", "error_reply.json")
+        with HTTMock(mock_request):
+            self.assertRaises(APIError, self.boards.get_identifiers, 12345)
+        self.assertEqual(0, len(self.boards.identifier_cache))
+
+    def test_get_newer_if_exists(self):
+        """
+        Boards.get_newer_if_exists(board_id, version_id) returns a greater
+        version of the board than the one passed.
+        """
+        mock_request = mock_url(
+            r".*\/Board\/101000\/BoardVersion\/211\/GetNewerIfExists$",
+            "get_board.json")
+        with HTTMock(mock_request):
+            board = self.boards.get_newer_if_exists(101000, 211)
+        self.assertEqual("Simple Board", board.title)
+        self.assertEqual(212, board.version)
+
+    def test_get_newer_if_exists_with_no_newer_version(self):
+        """
+        Boards.get_newer_if_exists(board_id, version_id) returns None if there
+        is no newer version of the board.
         """
-        # TODO: Test this with an error response
+        mock_request = mock_url(
+            r".*\/Board\/101000\/BoardVersion\/212\/GetNewerIfExists$",
+            "get_newer_if_exists1.json")
+        with HTTMock(mock_request):
+            self.assertIsNone(self.boards.get_newer_if_exists(101000, 212))
 
-#    def test_get_newer_if_exists(self):
-#        """
-#        Boards.get_newer_if_exists(board_id, version_id) returns a greater
-#        version of the board than the one passed.
-#        """
+    def test_get_board_history_since(self):
+        """
+        Boards.get_board_history_since(board_id, version_id) returns the
+        events on the board since the version passed.
 
-#    def test_get_board_history_since(self):
-#        """
-#        Boards.get_board_history_since(board_id, version_id) returns a greater
-#        version of the board than the one passed.
-#
-#        http://myaccount.leankitkanban.com/Kanban/Api/Board/101000/BoardVersion/213/GetBoardHistorySince
-#        """
+        http://myaccount.leankitkanban.com/Kanban/Api/Board/101000/BoardVersion/213/GetBoardHistorySince
+        """
+        mock_request = mock_url(
+            r".*\/Board\/101000\/BoardVersion\/213\/GetBoardHistorySince$",
+            "get_board_history_since2.json")
+        with HTTMock(mock_request):
+            events = self.boards.get_board_history_since(101000, 213)
+        self.assertEqual(6, len(events))
+        self.assertEqual(101621, events[0]["CardId"])
 
 
 class BoardTest(TestCase):
@@ -189,3 +321,162 @@ class BoardTest(TestCase):
         self.assertEqual("Ready", lane.title)
         self.assertEqual(2, len(lane.cards))
         self.assertEqual("Sample 11", lane.cards[0].title)
+
+    def test_compact_objects(self):
+        """
+        Boards, lanes and cards are built without per-instance dictionaries.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            board = self.boards.get("12345")
+        lane = board.lanes[0]
+        for obj in [board, lane, lane.cards[0]]:
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_get_card_by_id(self):
+        """
+        Board.get_card_by_id returns the card with the specified id, and
+        Board.get_lane_for_card returns the lane it's in.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            board = self.boards.get("12345")
+        self.assertEqual("Sample 19", board.get_card_by_id(101622).title)
+        self.assertEqual(101107, board.get_lane_for_card(101622).id)
+        self.assertIsNone(board.get_card_by_id(1))
+
+    def test_get_cards_by_user_and_type(self):
+        """
+        Board.get_cards_by_user and Board.get_cards_by_type return the
+        matching cards.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            board = self.boards.get("12345")
+        self.assertEqual(
+            [101614], [c.id for c in board.get_cards_by_user("John Doe")])
+        self.assertEqual(
+            [101622], [c.id for c in board.get_cards_by_type(101304)])
+        self.assertEqual([], board.get_cards_by_user("Nobody"))
+
+    def test_changes_keep_indexes_consistent(self):
+        """
+        Adding, moving, updating and removing cards and lanes keeps the
+        lookups up to date.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            board = self.boards.get("12345")
+
+        board.add_card(
+            101108, Card(None, 1, "New card", 101304, "Jane Doe"))
+        self.assertEqual(101108, board.get_lane_for_card(1).id)
+        self.assertEqual([1], [c.id for c in board.get_cards_by_user(
+            "Jane Doe")])
+
+        board.move_card(1, 101104)
+        self.assertEqual([], board.get_lane_by_id(101108).cards)
+        self.assertEqual(
+            [1], [c.id for c in board.get_lane_by_id(101104).cards])
+
+        board.update_card(Card(None, 1, "Renamed", 101306, "John Doe"))
+        self.assertEqual("Renamed", board.get_card_by_id(1).title)
+        self.assertEqual([], board.get_cards_by_user("Jane Doe"))
+        self.assertEqual(2, len(board.get_cards_by_user("John Doe")))
+
+        board.remove_card(1)
+        self.assertIsNone(board.get_card_by_id(1))
+        self.assertEqual([], board.get_lane_by_id(101104).cards)
+
+        lane = Lane(None, 2, "Extra", 7, 0)
+        lane.cards = [Card(None, 3, "Extra card", 101303, "")]
+        board.add_lane(lane)
+        self.assertIs(lane, board.get_lane_by_title("Extra"))
+        self.assertIs(lane, board.get_lane_for_card(3))
+
+        board.remove_lane(101107)
+        self.assertIsNone(board.get_lane_by_id(101107))
+        self.assertIsNone(board.get_card_by_id(101614))
+
+    def test_diff(self):
+        """
+        Board.diff returns the cards added, removed, moved and changed
+        between two copies of a board.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            before = self.boards.get("12345")
+            after = self.boards.get("12345")
+        self.assertEqual([], before.diff(after))
+
+        after.move_card(101614, 101104)
+        after.update_card(Card(None, 101614, "Renamed", 101304, "Jane Doe"))
+        after.remove_card(101622)
+        added = Card(None, 1, "New card", 101303, "")
+        after.add_card(101108, added)
+        self.assertEqual([
+            CardChange(CARD_MOVED, 101614, 101107, 101104),
+            CardChange(CARD_REASSIGNED, 101614, "John Doe", "Jane Doe"),
+            CardChange(CARD_RETITLED, 101614, "Sample 11", "Renamed"),
+            CardChange(CARD_TYPE_CHANGED, 101614, 101306, 101304),
+            CardChange(CARD_REMOVED, 101622, before.get_card_by_id(101622),
+                       None),
+            CardChange(CARD_ADDED, 1, None, added),
+        ], before.diff(after))
+
+    def test_diff_compares_fields(self):
+        """
+        Board.diff compares the fields themselves, so changes between values
+        with equal hashes are still found.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            before = self.boards.get("12345")
+            after = self.boards.get("12345")
+        before.update_card(Card(None, 101614, "Sample 11", -1, "John Doe"))
+        after.update_card(Card(None, 101614, "Sample 11", -2, "John Doe"))
+        self.assertEqual(
+            [CardChange(CARD_TYPE_CHANGED, 101614, -1, -2)],
+            before.diff(after))
+
+    def test_pickle(self):
+        """
+        Boards, including those with lazy lanes, can be pickled and
+        unpickled with their indexes rebuilt.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            board = self.boards.get("12345")
+            lazy_board = self.boards.get("12345", lazy_cards=True)
+        for protocol in [0, pickle.HIGHEST_PROTOCOL]:
+            for original in [board, lazy_board]:
+                copy = pickle.loads(pickle.dumps(original, protocol))
+                self.assertEqual([], original.diff(copy))
+                self.assertEqual(original.version, copy.version)
+                self.assertEqual(original.card_types, copy.card_types)
+                self.assertEqual(
+                    "Sample 11", copy.get_card_by_id(101614).title)
+                self.assertEqual(
+                    101107, copy.get_lane_for_card(101614).id)
+                self.assertIs(
+                    copy.get_lane_by_title("Ready"),
+                    copy.get_lane_by_id(101107))
+
+    def test_lazy_cards(self):
+        """
+        Boards.get(board_id, lazy_cards=True) only builds the cards in a lane
+        when they're accessed.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            with mock.patch.object(
+                    Card, "create_from_card_json",
+                    wraps=Card.create_from_card_json) as create_card:
+                board = self.boards.get("12345", lazy_cards=True)
+                self.assertEqual(6, len(board.lanes))
+                self.assertEqual(0, create_card.call_count)
+
+                lane = board.get_lane_by_title("Ready")
+                self.assertEqual(
+                    ["Sample 11", "Sample 19"],
+                    [card.title for card in lane.iter_cards()])
+                self.assertEqual(2, create_card.call_count)
+
+                self.assertEqual("Sample 11", lane.cards[0].title)
+                self.assertIs(lane.cards[0], lane.cards[0])
+                self.assertEqual(4, create_card.call_count)
+                self.assertEqual(
+                    "Sample 19", board.get_card_by_id(101622).title)
+                self.assertEqual(4, create_card.call_count)
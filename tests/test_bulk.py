@@ -0,0 +1,174 @@
+import json
+from unittest import TestCase
+
+from httmock import HTTMock, response, urlmatch
+
+import lucky
+from lucky.board import Boards, CardMove, CardResult
+from lucky.errors import APIError, LuckyError
+from lucky.iterators import batches
+
+
+def mock_writes(captured, failing_titles=()):
+    """
+    Replies to AddCards and UpdateCards as LeanKit does, failing any batch
+    containing one of the failing_titles, and to MoveCard.
+    """
+    @urlmatch(path=r".*\/Board\/\d+\/.*")
+    def mock_request(url, request):
+        captured.append(request)
+        if request.body:
+            cards = json.loads(request.body)
+            if any(card["Title"] in failing_titles for card in cards):
+                return response(200, {
+                    "ReplyCode": 500, "ReplyText": "Lane is over its limit",
+                    "ReplyData": [None]}, request=request)
+        if url.path.endswith("/AddCards"):
+            data = [[dict(card, Id=1000 + int(card["Title"]))
+                     for card in cards]]
+        elif url.path.endswith("/UpdateCards"):
+            data = [{"BoardVersion": 2, "UpdatedCardsCount": len(cards)}]
+        else:
+            data = [{"BoardVersion": 2}]
+        return response(200, {
+            "ReplyCode": 201, "ReplyText": "Cards added",
+            "ReplyData": data}, request=request)
+    return mock_request
+
+
+class BulkCardsTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.boards = Boards(config)
+
+    def test_batches(self):
+        """
+        batches splits the items into lists of up to size items.
+        """
+        self.assertEqual(
+            [[0, 1], [2, 3], [4]], list(batches(iter(range(5)), 2)))
+
+    def test_add_cards(self):
+        """
+        Boards.add_cards sends the cards in batches, and reports the id of
+        each card added.
+        """
+        captured = []
+        cards = [{"LaneId": 101, "TypeId": 5, "Title": str(i)}
+                 for i in range(5)]
+        with HTTMock(mock_writes(captured)):
+            results = list(self.boards.add_cards(
+                12345, cards, batch_size=2, ordered=True))
+        self.assertEqual(3, len(captured))
+        self.assertEqual("POST", captured[0].method)
+        self.assertTrue(captured[0].url.endswith("/Board/12345/AddCards"))
+        # The batches are sent concurrently, so may arrive in any order.
+        self.assertEqual(
+            [cards[:2], cards[2:4], cards[4:]],
+            sorted(json.loads(request.body) for request in captured))
+        self.assertEqual(
+            [CardResult(card, 1000 + i, None)
+             for i, card in enumerate(cards)], results)
+
+    def test_failed_batch(self):
+        """
+        If a batch fails, each of its cards is reported with the error, and
+        the other batches are still sent.
+        """
+        captured = []
+        cards = [{"LaneId": 101, "TypeId": 5, "Title": str(i)}
+                 for i in range(4)]
+        with HTTMock(mock_writes(captured, failing_titles=["2"])):
+            results = list(self.boards.add_cards(12345, cards, batch_size=2))
+        results.sort(key=lambda result: result.card["Title"])
+        self.assertEqual([1000, 1001, None, None],
+                         [result.card_id for result in results])
+        self.assertIsInstance(results[2].error, APIError)
+        self.assertEqual(500, results[3].error.reply_code)
+
+    def test_cards_missing_from_reply(self):
+        """
+        Cards missing from the AddCards reply are reported with an error.
+        """
+        @urlmatch(path=r".*\/AddCards$")
+        def mock_request(url, request):
+            card = json.loads(request.body)[0]
+            return response(200, {
+                "ReplyCode": 201, "ReplyText": "Cards added",
+                "ReplyData": [[dict(card, Id=1000)]]}, request=request)
+
+        cards = [{"LaneId": 101, "TypeId": 5, "Title": str(i)}
+                 for i in range(3)]
+        with HTTMock(mock_request):
+            results = list(self.boards.add_cards(12345, cards))
+        self.assertEqual(cards, [result.card for result in results])
+        self.assertEqual([1000, None, None],
+                         [result.card_id for result in results])
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, LuckyError)
+        self.assertIs(results[1].error, results[2].error)
+
+    def test_cards_missing_from_update_count(self):
+        """
+        If UpdateCards reports fewer cards updated than were sent, the cards
+        in the batch are reported with an error.
+        """
+        @urlmatch(path=r".*\/UpdateCards$")
+        def mock_request(url, request):
+            cards = json.loads(request.body)
+            return response(200, {
+                "ReplyCode": 201, "ReplyText": "Cards updated",
+                "ReplyData": [{"BoardVersion": 2,
+                               "UpdatedCardsCount": len(cards) - 1}]},
+                request=request)
+
+        cards = [{"Id": 10 + i, "Title": str(i)} for i in range(3)]
+        with HTTMock(mock_request):
+            results = list(self.boards.update_cards(
+                12345, cards, batch_size=2, ordered=True))
+        self.assertEqual([10, 11, 12], [result.card_id for result in results])
+        self.assertIsInstance(results[0].error, LuckyError)
+        self.assertIs(results[0].error, results[1].error)
+        self.assertIsInstance(results[2].error, LuckyError)
+
+    def test_wip_override_comment(self):
+        """
+        A WIP override comment is sent with each batch.
+        """
+        captured = []
+        with HTTMock(mock_writes(captured)):
+            list(self.boards.add_cards(
+                12345, [{"Title": "1"}], wip_override_comment="urgent fix"))
+        self.assertTrue(captured[0].url.endswith(
+            "/AddCards?wipOverrideComment=urgent+fix"))
+
+    def test_update_cards(self):
+        """
+        Boards.update_cards sends the cards in batches.
+        """
+        captured = []
+        cards = [{"Id": 10 + i, "Title": str(i)} for i in range(3)]
+        with HTTMock(mock_writes(captured)):
+            results = list(self.boards.update_cards(
+                12345, cards, batch_size=3))
+        self.assertEqual(1, len(captured))
+        self.assertTrue(captured[0].url.endswith("/Board/12345/UpdateCards"))
+        self.assertEqual([10, 11, 12],
+                         sorted(result.card_id for result in results))
+
+    def test_move_cards(self):
+        """
+        Boards.move_cards moves each card to its lane and position.
+        """
+        captured = []
+        with HTTMock(mock_writes(captured)):
+            results = list(self.boards.move_cards(
+                12345, [(10, 101, 0), CardMove(11, 102, 3)], ordered=True))
+        self.assertEqual(
+            ["/Kanban/API/Board/12345/MoveCard/10/Lane/101/Position/0",
+             "/Kanban/API/Board/12345/MoveCard/11/Lane/102/Position/3"],
+            sorted(request.path_url for request in captured))
+        self.assertEqual([CardResult(CardMove(10, 101, 0), 10, None),
+                          CardResult(CardMove(11, 102, 3), 11, None)],
+                         results)
@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+from httmock import HTTMock
+
+import lucky
+from lucky.board import Boards
+from lucky.cache import IdentifierCache
+
+from .helpers import FakeClock, mock_url
+
+
+class IdentifierCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = IdentifierCache(ttl=10, max_boards=2, clock=self.clock)
+
+    def test_get_missing(self):
+        """
+        IdentifierCache.get returns None and counts a miss for an unknown
+        board.
+        """
+        self.assertIsNone(self.cache.get("101"))
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+
+    def test_get_cached(self):
+        """
+        IdentifierCache.get returns the stored identifiers and counts a hit.
+        """
+        self.cache.set("101", {"users": {}})
+        self.assertEqual({"users": {}}, self.cache.get("101"))
+        self.assertEqual((1, 0), (self.cache.hits, self.cache.misses))
+
+    def test_expiry(self):
+        """
+        Identifiers are not returned once the TTL has passed.
+        """
+        self.cache.set("101", {"users": {}})
+        self.clock.now += 10
+        self.assertIsNone(self.cache.get("101"))
+        self.assertEqual(0, len(self.cache))
+
+    def test_least_recently_used_evicted(self):
+        """
+        When more than max_boards boards are held, the least recently used
+        board is dropped.
+        """
+        self.cache.set("101", {})
+        self.cache.set("102", {})
+        self.cache.get("101")
+        self.cache.set("103", {})
+        self.assertIsNone(self.cache.get("102"))
+        self.assertEqual({}, self.cache.get("101"))
+        self.assertEqual({}, self.cache.get("103"))
+
+    def test_invalidate(self):
+        """
+        IdentifierCache.invalidate drops a single board, or all boards.
+        """
+        self.cache.set("101", {})
+        self.cache.set("102", {})
+        self.cache.invalidate("101")
+        self.assertEqual(1, len(self.cache))
+        self.cache.invalidate()
+        self.assertEqual(0, len(self.cache))
+
+
+class BoardsIdentifierCacheTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.boards = Boards(config)
+
+    def test_get_identifiers_is_cached(self):
+        """
+        Boards.get_identifiers only fetches the identifiers once until they're
+        invalidated.
+        """
+        captured = []
+        mock_request = mock_url(
+            r".*\/Boards\/12345/GetBoardIdentifiers$",
+            "get_board_identifiers.json", captured)
+        with HTTMock(mock_request):
+            first = self.boards.get_identifiers(12345)
+            second = self.boards.get_identifiers("12345")
+            self.assertEqual(1, len(captured))
+            self.assertEqual(first, second)
+
+            self.boards.invalidate_identifiers(12345)
+            self.boards.get_identifiers(12345)
+        self.assertEqual(2, len(captured))
+        self.assertEqual(1, self.boards.identifier_cache.hits)
+        self.assertEqual(2, self.boards.identifier_cache.misses)
@@ -0,0 +1,139 @@
+import csv
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+
+import mock
+from httmock import HTTMock
+
+import lucky
+from lucky.board import Boards
+from lucky.columnar import MISSING, CardColumns, get_numpy, get_pyarrow
+
+from .helpers import mock_url
+
+
+class CardColumnsTestCase(TestCase):
+
+    use_numpy = False
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.boards = Boards(config)
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            self.board = self.boards.get(101000)
+        self.columns = CardColumns.from_boards(
+            [self.board, self.board], use_numpy=self.use_numpy)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_columns(self):
+        """
+        CardColumns holds a column of each field of the cards.
+        """
+        self.assertEqual(4, len(self.columns))
+        self.assertEqual(
+            [101614, 101622, 101614, 101622],
+            list(self.columns.column("card_id")))
+        self.assertEqual([101107] * 4, list(self.columns.column("lane_id")))
+        self.assertEqual(["John Doe"], self.columns.users)
+        self.assertEqual(
+            [0, MISSING, 0, MISSING], list(self.columns.column("user")))
+        self.assertEqual("Ready", self.columns.lanes[101107])
+        self.assertEqual("Defect", self.columns.card_types[101306])
+
+    def test_counts(self):
+        """
+        The cards can be counted by lane, type and user.
+        """
+        self.assertEqual({101107: 4}, self.columns.cards_per_lane())
+        self.assertEqual(
+            {101306: 2, 101304: 2}, self.columns.cards_per_type())
+        self.assertEqual(
+            {"John Doe": 2, None: 2}, self.columns.cards_per_user())
+
+    def test_identifiers(self):
+        """
+        The lane and card type names can come from the board identifiers.
+        """
+        with HTTMock(mock_url(r".*\/GetBoardIdentifiers$",
+                              "get_board_identifiers.json")):
+            columns = CardColumns.from_boards(
+                [self.board], identifiers=self.boards.get_identifiers)
+        self.assertEqual("Deployment:Ready", columns.lanes[101114])
+
+    def test_write_csv(self):
+        """
+        The cards can be written to a CSV file.
+        """
+        path = os.path.join(self.directory, "cards.csv")
+        self.assertEqual(("csv", path), self.columns.write(path))
+        with open(path) as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(5, len(rows))
+        self.assertEqual(
+            ["101000", "101107", "Ready", "0", "101614",
+             "Sample 11", "101306", "Defect", "John Doe"],
+            rows[1])
+
+    @mock.patch("lucky.columnar.get_numpy", return_value=None)
+    def test_write_falls_back_to_csv(self, get_numpy_mock):
+        """
+        If NumPy isn't installed, a CSV file is written in place of an NPZ
+        file.
+        """
+        path = os.path.join(self.directory, "cards.npz")
+        self.assertEqual(
+            ("csv", os.path.join(self.directory, "cards.csv")),
+            self.columns.write(path))
+
+
+@skipIf(get_numpy() is None, "NumPy isn't installed")
+class NumPyCardColumnsTestCase(CardColumnsTestCase):
+
+    use_numpy = True
+
+    def test_write_npz(self):
+        """
+        The cards can be written to a NumPy .npz file.
+        """
+        path = os.path.join(self.directory, "cards.npz")
+        self.assertEqual(("npz", path), self.columns.write(path))
+        data = get_numpy().load(path)
+        self.assertEqual(
+            [101614, 101622, 101614, 101622], data["card_id"].tolist())
+        self.assertEqual([u"John Doe"], data["users"].tolist())
+
+
+@skipIf(get_pyarrow() is None, "PyArrow isn't installed")
+class ArrowCardColumnsTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            board = Boards(config).get(101000)
+        self.columns = CardColumns.from_boards([board, board])
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_write_arrow(self):
+        """
+        The cards can be written to an Arrow file, with the names
+        dictionary-encoded.
+        """
+        pyarrow = get_pyarrow()
+        path = os.path.join(self.directory, "cards.arrow")
+        self.assertEqual(("arrow", path), self.columns.write(path))
+        with pyarrow.OSFile(path, "rb") as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+        self.assertEqual(
+            ["board_id", "lane_id", "position", "card_id", "type_id",
+             "title", "lane", "type", "user"],
+            table.schema.names)
+        columns = table.to_pydict()
+        self.assertEqual([101614, 101622, 101614, 101622], columns["card_id"])
+        self.assertEqual([u"Sample 11", u"Sample 19"] * 2, columns["title"])
+        self.assertEqual([u"Ready"] * 4, columns["lane"])
+        self.assertEqual([u"Defect", u"Feature"] * 2, columns["type"])
+        self.assertEqual([u"John Doe", None] * 2, columns["user"])
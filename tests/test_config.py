@@ -29,6 +29,17 @@ class ConfigTestCase(TestCase):
             "https://testing.leankitkanban.com/Kanban/API/Boards/12345",
             config.get_url_for_path("Boards/12345"))
 
+    def test_base_url_override(self):
+        """
+        Config.base_url can be overridden to use a different server.
+        """
+        config = Config(
+            "testing", "testing@example.com", "password",
+            base_url="http://localhost:8000/Kanban/API/")
+        self.assertEqual(
+            "http://localhost:8000/Kanban/API/Boards/12345",
+            config.get_url_for_path("Boards/12345"))
+
     def test_load_from_env(self):
         """
         We can configure the application with appropriate entries in the env.
@@ -50,6 +61,16 @@ class ConfigTestCase(TestCase):
         config = Config.load_from_env(env)
         self.assertEqual("%m/%d/%Y", config.date_format)
 
+    def test_load_from_env_with_base_url(self):
+        """
+        The base URL can be overridden with LK_BASE_URL.
+        """
+        env = {"LK_ACCOUNT": "example", "LK_EMAIL": "testing@example.com",
+               "LK_PASSWORD": "password",
+               "LK_BASE_URL": "http://localhost:8000/Kanban/API/"}
+        config = Config.load_from_env(env)
+        self.assertEqual("http://localhost:8000/Kanban/API/", config.base_url)
+
     def test_load_from_missing_env(self):
         """Attempt to load from environment with no config"""
         config = Config.load_from_env({})
@@ -73,6 +94,29 @@ class ConfigTestCase(TestCase):
 
         expanduser_mock.assert_called_once_with("~/.luckyrc")
 
+    @mock.patch("lucky.config.expanduser")
+    def test_load_section_from_homedir(self, expanduser_mock):
+        """
+        Config.load_from_homedir can read an account from another section.
+        """
+        expanduser_mock.return_value = get_fixture_path("luckyrc_accounts")
+        config = Config.load_from_homedir("second")
+        self.assertEqual("second", config.account)
+        self.assertEqual("%Y-%m-%d", config.date_format)
+        self.assertIsNone(Config.load_from_homedir("missing"))
+
+    @mock.patch("lucky.config.expanduser")
+    def test_load_all_from_homedir(self, expanduser_mock):
+        """
+        Config.load_all_from_homedir returns a Config for each complete
+        section of ~/.luckyrc.
+        """
+        expanduser_mock.return_value = get_fixture_path("luckyrc_accounts")
+        configs = Config.load_all_from_homedir()
+        self.assertEqual(
+            [("first", "first@example.com"), ("second", "second@example.com")],
+            [(config.account, config.email) for config in configs])
+
     @mock.patch("lucky.config.expanduser")
     def test_load_from_missing_homedir_file(self, expanduser_mock):
         """Attempt to load from missing ~/.luckyrc.
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from unittest import TestCase
+
+from lucky.config import Config
+from lucky.dates import DateParser, compile_format
+
+
+class DateParserTestCase(TestCase):
+
+    def test_compile_format(self):
+        """
+        Formats with unsupported or repeated directives aren't compiled.
+        """
+        self.assertIsNotNone(compile_format("%m/%d/%Y %H:%M:%S"))
+        self.assertIsNone(compile_format("%b %d %Y"))
+        self.assertIsNone(compile_format("%d %d"))
+
+    def test_same_results_as_strptime(self):
+        """
+        DateParser.parse gives the same result as datetime.strptime.
+        """
+        cases = [
+            ("%m/%d/%Y", ["08/19/2009", "8/9/2009", "12/31/1999"]),
+            ("%Y-%m-%d", ["2014-02-28", "2014-2-1"]),
+            ("%d.%m.%y", ["01.02.03", "1.2.99", "31.12.68"]),
+            ("%Y-%m-%d %H:%M:%S",
+             ["2014-02-28  23:59:59", "2014-02-28 1:2:3"]),
+            ("%b %d %Y", ["Aug 19 2009"]),
+        ]
+        for date_format, values in cases:
+            parser = DateParser(date_format)
+            for value in values:
+                self.assertEqual(
+                    datetime.strptime(value, date_format), parser.parse(value))
+
+    def test_same_errors_as_strptime(self):
+        """
+        DateParser.parse raises ValueError for input that strptime rejects.
+        """
+        parser = DateParser("%m/%d/%Y")
+        for value in ["02/30/2014", "13/01/2014", "08/19/2009x", "", "a"]:
+            self.assertRaises(ValueError, parser.parse, value)
+
+    def test_memo_is_bounded(self):
+        """
+        DateParser remembers at most memo_size results.
+        """
+        parser = DateParser("%Y-%m-%d", memo_size=2)
+        for value in ["2014-01-01", "2014-01-02", "2014-01-03"]:
+            parser.parse(value)
+        self.assertTrue(len(parser._memo) <= 2)
+
+    def test_config_parse_dates(self):
+        """
+        Config.parse_dates yields dates parsed with the configured format.
+        """
+        config = Config("testing", "testing@example.com", "password",
+                        "%Y-%m-%d")
+        self.assertEqual(
+            [date(2014, 1, 2), date(2014, 1, 2), date(2015, 3, 4)],
+            list(config.parse_dates(
+                ["2014-01-02", "2014-01-02", "2015-03-04"])))
+        self.assertEqual(
+            datetime(2014, 1, 2), config.parse_date("2014-01-02"))
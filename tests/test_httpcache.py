@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import mock
+from httmock import HTTMock, response, urlmatch
+
+import lucky
+from lucky.board import Boards
+from lucky.httpcache import CachingTransport, ResponseCache
+from lucky.transport import Transport
+
+from .helpers import FakeClock, RawBody, load_fixture
+
+BOARDS_URL = "https://testing.leankitkanban.com/Kanban/API/Boards"
+AUTH = ("testing@example.com", "password")
+
+
+def mock_boards(captured, headers=None, status_code=200,
+                fixture="get_boards.json"):
+    data = load_fixture(fixture)
+
+    @urlmatch(path=r".*\/Boards$")
+    def mock_request(url, request):
+        captured.append(request)
+        result = response(status_code, data, headers, request=request)
+        result.raw = RawBody(data)
+        return result
+    return mock_request
+
+
+class CachingTransportTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.cache = ResponseCache(self.directory, max_age=60,
+                                   clock=self.clock)
+        self.transport = CachingTransport(Transport(), self.cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fresh_responses_are_served_from_cache(self):
+        """
+        A second request within max_age is answered from the cache.
+        """
+        captured = []
+        with HTTMock(mock_boards(captured)):
+            first = self.transport.get(BOARDS_URL, auth=AUTH)
+            second = self.transport.get(BOARDS_URL, auth=AUTH)
+        self.assertEqual(1, len(captured))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first.json(), second.json())
+
+    def test_cache_is_per_account(self):
+        """
+        Requests for the same URL with different accounts aren't shared.
+        """
+        captured = []
+        with HTTMock(mock_boards(captured)):
+            self.transport.get(BOARDS_URL, auth=AUTH)
+            self.transport.get(BOARDS_URL, auth=("other@example.com", "pw"))
+        self.assertEqual(2, len(captured))
+
+    def test_revalidation(self):
+        """
+        Once max_age has passed, the response is revalidated with the ETag,
+        and a 304 response is answered from the cache.
+        """
+        captured = []
+        with HTTMock(mock_boards(captured, {"ETag": '"v1"'})):
+            first = self.transport.get(BOARDS_URL, auth=AUTH)
+        self.clock.now += 60
+        with HTTMock(mock_boards(captured, status_code=304)):
+            second = self.transport.get(BOARDS_URL, auth=AUTH)
+            self.transport.get(BOARDS_URL, auth=AUTH)
+        self.assertEqual(2, len(captured))
+        self.assertEqual('"v1"', captured[1].headers["If-None-Match"])
+        self.assertEqual(first.content, second.content)
+
+    def test_server_max_age(self):
+        """
+        The server's Cache-Control max-age is used in place of max_age.
+        """
+        captured = []
+        with HTTMock(mock_boards(captured, {"Cache-Control": "max-age=5"})):
+            self.transport.get(BOARDS_URL, auth=AUTH)
+            self.clock.now += 5
+            self.transport.get(BOARDS_URL, auth=AUTH)
+        self.assertEqual(2, len(captured))
+        self.assertNotIn("If-None-Match", captured[1].headers)
+
+    def test_error_replies_are_not_cached(self):
+        """
+        LeanKit error replies sent with a 200 status aren't cached.
+        """
+        captured = []
+        with HTTMock(mock_boards(captured, fixture="error_reply.json")):
+            self.transport.get(BOARDS_URL, auth=AUTH)
+        with HTTMock(mock_boards(captured)):
+            response = self.transport.get(BOARDS_URL, auth=AUTH)
+            self.transport.get(BOARDS_URL, auth=AUTH)
+        self.assertEqual(2, len(captured))
+        self.assertEqual(200, response.json()["ReplyCode"])
+
+    def test_clear_and_evict_ignore_removed_files(self):
+        """
+        Files removed by another thread while clearing or evicting are
+        skipped.
+        """
+        self.cache.store("0", "url", {}, b"x" * 100)
+        self.cache.max_size = 0
+        with mock.patch("os.stat", side_effect=OSError):
+            self.cache.evict()
+        with mock.patch("os.unlink", side_effect=OSError):
+            self.cache.clear()
+
+    def test_writes_clear_the_cache(self):
+        """
+        A successful POST clears the cached responses.
+        """
+        captured = []
+        with HTTMock(mock_boards(captured)):
+            self.transport.get(BOARDS_URL, auth=AUTH)
+            self.transport.post(BOARDS_URL, auth=AUTH, data="[]")
+            self.transport.get(BOARDS_URL, auth=AUTH)
+        self.assertEqual(["GET", "POST", "GET"],
+                         [request.method for request in captured])
+
+    def test_eviction(self):
+        """
+        The least recently used entries are removed when the cache grows
+        beyond max_size.
+        """
+        body = b"x" * 100
+        self.cache.max_size = 400
+        for i in range(4):
+            self.clock.now += 1
+            self.cache.store(str(i), "url", {}, body)
+            os.utime(os.path.join(self.directory, "%d.json" % i),
+                     (self.clock.now, self.clock.now))
+        self.assertIsNone(self.cache.load("0"))
+        self.assertIsNone(self.cache.load("1"))
+        self.assertIsNotNone(self.cache.load("3"))
+
+    def test_boards_through_cache(self):
+        """
+        Boards.list() can be served from the cache.
+        """
+        captured = []
+        config = lucky.Config("testing", "testing@example.com", "password")
+        boards = Boards(config, transport=self.transport)
+        with HTTMock(mock_boards(captured)):
+            self.assertEqual(3, len(list(boards.list())))
+            self.assertEqual(3, len(list(boards.list())))
+        self.assertEqual(1, len(captured))
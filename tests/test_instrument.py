@@ -0,0 +1,63 @@
+from cStringIO import StringIO
+from unittest import TestCase
+
+from httmock import HTTMock
+
+import lucky
+from lucky.board import Boards
+from lucky.instrument import Profiler
+
+from .helpers import mock_url
+
+
+class ProfilerTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.recorded = []
+        self.profiler = Profiler(callbacks=[self.recorded.append])
+        self.boards = Boards(config, profiler=self.profiler)
+
+    def test_get_is_timed(self):
+        """
+        Fetching a board records its size, phases and the objects built.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/12345$", "get_board.json")):
+            self.boards.get("12345")
+        self.assertEqual(1, len(self.recorded))
+        timing = self.recorded[0]
+        self.assertEqual("Boards/12345", timing.path)
+        self.assertEqual("/Boards/{id}", timing.endpoint)
+        self.assertTrue(timing.bytes > 0)
+        # The board, six lanes and two cards.
+        self.assertEqual(9, timing.objects)
+        for phase in ["connect", "transfer", "decode", "build"]:
+            self.assertTrue(getattr(timing, phase) >= 0)
+
+    def test_streams_are_timed(self):
+        """
+        Streamed requests are recorded once they've been read.
+        """
+        with HTTMock(mock_url(r".*\/Boards$", "get_boards.json")):
+            boards = self.boards.list()
+            next(boards)
+            self.assertEqual([], self.recorded)
+            list(boards)
+        self.assertEqual(1, len(self.recorded))
+        self.assertEqual(3, self.recorded[0].objects)
+
+    def test_report(self):
+        """
+        Profiler.report writes the totals for each endpoint.
+        """
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            self.boards.get("1")
+            self.boards.get("2", stream=True)
+        summary = self.profiler.summary()
+        self.assertEqual(2, summary["/Boards/{id}"]["requests"])
+        # The streamed board is built after the response has been read, so
+        # only its lanes and cards are counted.
+        self.assertEqual(17, summary["/Boards/{id}"]["objects"])
+        output = StringIO()
+        self.profiler.report(output)
+        self.assertIn("/Boards/{id}", output.getvalue())
@@ -1,8 +1,13 @@
 import os
+import shutil
 import unittest
 import tempfile
 
-from lucky.cards import parse_card
+from lucky.cards import (
+    MMAP_THRESHOLD, CardFileError, card_json, find_card_files, ingest_cards,
+    parse_card, read_card)
+
+CARD = "testing %d\n----\nthis is the body\n----\nhttp://bugs.example.com\n"
 
 
 class CardFileTestCase(unittest.TestCase):
@@ -45,3 +50,85 @@ class CardFileTestCase(unittest.TestCase):
         self.assertEqual({
             "title": "testing", "body": "this is the body\n",
             "link_url": "http://bugs.example.com"}, result)
+
+    def test_card_json(self):
+        """
+        card_json returns the LeanKit card for a parsed card file.
+        """
+        card = {"title": "testing", "body": "this is the body\n",
+                "link_url": "http://bugs.example.com"}
+        self.assertEqual({
+            "LaneId": 101, "TypeId": 5, "Title": "testing",
+            "Description": "this is the body\n",
+            "ExternalSystemUrl": "http://bugs.example.com",
+            "Priority": 2}, card_json(card, 101, 5, Priority=2))
+
+    def test_read_card_with_large_body(self):
+        """
+        Large card files are read through a memory-map.
+        """
+        body = "x" * MMAP_THRESHOLD + "\n"
+        filename = self.create_file(
+            "testing\n----\n" + body + "----\nhttp://bugs.example.com\n")
+        result = read_card(filename)
+        self.assertEqual(body, result["body"])
+        self.assertEqual("http://bugs.example.com", result["link_url"])
+
+    def test_read_card_with_incomplete_file(self):
+        """
+        read_card raises a CardFileError for files that aren't cards.
+        """
+        filename = self.create_file("testing\n----\nthis is the body\n")
+        with self.assertRaises(CardFileError) as context:
+            read_card(filename)
+        self.assertEqual(filename, context.exception.filename)
+
+
+class IngestCardsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        os.mkdir(os.path.join(self.directory, "sub"))
+        for i, name in enumerate(["a.txt", "b.txt", "sub/c.txt"]):
+            with open(os.path.join(self.directory, name), "w") as f:
+                f.write(CARD % i)
+        with open(os.path.join(self.directory, "broken.txt"), "w") as f:
+            f.write("broken\n")
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_find_card_files(self):
+        """
+        find_card_files expands directories recursively and glob patterns.
+        """
+        self.assertEqual(
+            [self.path("a.txt"), self.path("b.txt"), self.path("broken.txt"),
+             self.path("sub/c.txt")],
+            list(find_card_files([self.directory])))
+        self.assertEqual(
+            [self.path("a.txt"), self.path("b.txt")],
+            list(find_card_files([self.path("[ab].txt")])))
+
+    def test_ingest_cards(self):
+        """
+        ingest_cards yields the parsed card or the error for each file.
+        """
+        results = list(ingest_cards(
+            [self.directory, self.path("missing.txt")], ordered=True))
+        self.assertEqual(
+            ["testing 0", "testing 1", None, "testing 2", None],
+            [result.card and result.card["title"] for result in results])
+        self.assertIsInstance(results[2].error, CardFileError)
+        self.assertIsInstance(results[4].error, IOError)
+
+    def test_ingest_cards_with_processes(self):
+        """
+        Files can be parsed in a pool of processes.
+        """
+        results = sorted(ingest_cards(
+            [self.directory], max_workers=2, processes=True))
+        self.assertEqual(
+            [None, None, CardFileError, None],
+            [result.error and type(result.error) for result in results])
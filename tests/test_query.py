@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+import mock
+from httmock import HTTMock
+
+import lucky
+from lucky.board import Boards, Card, Lane
+from lucky.query import Query, QueryError, Term, parse_query
+
+from .helpers import mock_url
+
+
+class QueryTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            self.board = Boards(config).get(101000)
+        self.board.add_card(
+            101104, Card(None, 1, "Fix the login page", 101306, "Jane Doe"))
+        self.board.add_card(
+            101104, Card(None, 2, "Login with SSO", 101304, "John Doe"))
+
+    def matching(self, expression):
+        return sorted(result.card.id
+                      for result in Query(expression).run([self.board]))
+
+    def test_parse_query(self):
+        """
+        parse_query splits the expression into terms, values can be quoted.
+        """
+        self.assertEqual(
+            [Term("lane", "=", "Ready"), Term("user", "!=", "John Doe"),
+             Term("title", "~", "login")],
+            parse_query('lane=Ready user!="John Doe" title~login'))
+        self.assertRaises(QueryError, parse_query, "colour=red")
+        self.assertRaises(QueryError, parse_query, "login")
+
+    def test_fields(self):
+        """
+        Cards can be matched by lane, user, type, title and id.
+        """
+        self.assertEqual([101614, 101622], self.matching("lane=Ready"))
+        self.assertEqual([101614, 101622], self.matching("lane=101107"))
+        self.assertEqual([1, 2], self.matching("lane~develop"))
+        self.assertEqual([2, 101614], self.matching('user="John Doe"'))
+        self.assertEqual([1, 101614], self.matching("type=Defect"))
+        self.assertEqual([2, 101622], self.matching("type=101304"))
+        self.assertEqual([1, 2], self.matching("title~LOGIN"))
+        self.assertEqual([2], self.matching("id=2"))
+        self.assertEqual([101614, 101622], self.matching("id~016"))
+        self.assertEqual([1, 2, 101622], self.matching("id!=101614"))
+        self.assertEqual([2, 101622], self.matching("type!=defect"))
+
+    def test_all_terms_match(self):
+        """
+        Cards must match all the terms.
+        """
+        self.assertEqual(
+            [2], self.matching('title~login user="John Doe"'))
+        self.assertEqual(
+            [101614], self.matching('lane!=Development user="John Doe"'))
+        self.assertEqual([], self.matching("board=1 lane=Ready"))
+        self.assertEqual(
+            [101614, 101622], self.matching("board=101000 lane=Ready"))
+
+    def test_lookups_replace_scans(self):
+        """
+        Terms that the board's lookups can answer don't scan the lanes.
+        """
+        with mock.patch.object(
+                Lane, "iter_cards", side_effect=AssertionError("scanned")):
+            self.assertEqual(
+                [2], self.matching('user="John Doe" title~login'))
+
+    def test_results_include_lanes(self):
+        """
+        Each result has the board and lane holding the card.
+        """
+        results = list(Query("id=1").run([self.board]))
+        self.assertIs(self.board, results[0].board)
+        self.assertEqual(101104, results[0].lane.id)
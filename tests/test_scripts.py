@@ -1,9 +1,15 @@
 # Copyright 2014 Kevin McDermott
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
 from datetime import date
 from unittest import TestCase
 from cStringIO import StringIO
 
-from httmock import HTTMock
+import mock
+from httmock import HTTMock, response, urlmatch
 
 from lucky import scripts
 import lucky
@@ -25,3 +31,280 @@ class ScriptTestCase(TestCase):
         with HTTMock(mock_url(r".*\/Boards$", "get_boards.json")):
             stdout = StringIO()
             scripts.list_boards(self.config, None, output=stdout)
+
+    def test_get_boards_with_cache(self):
+        """
+        get_boards reads through the response cache unless --no-cache is
+        passed.
+        """
+        parser = scripts.create_parser()
+        args = parser.parse_args(["--cache-dir", "/tmp/cache", "list-boards"])
+        boards = scripts.get_boards(self.config, args)
+        self.assertEqual("/tmp/cache", boards.transport.cache.directory)
+
+        args = parser.parse_args(["--no-cache", "list-boards"])
+        boards = scripts.get_boards(self.config, args)
+        self.assertFalse(hasattr(boards.transport, "cache"))
+
+    def parse_args(self, *args):
+        return scripts.create_parser().parse_args(list(args) + ["list-boards"])
+
+    def list_boards(self, *args):
+        with HTTMock(mock_url(r".*\/Boards$", "get_boards.json")):
+            stdout = StringIO()
+            scripts.list_boards(
+                self.config, self.parse_args("--no-cache", *args),
+                output=stdout)
+        return stdout.getvalue()
+
+    def test_list_boards_table(self):
+        """
+        list_boards outputs a table of the boards by default.
+        """
+        self.assertEqual(
+            "id  | title       \n"
+            "----+-------------\n"
+            "101 | Test Board A\n"
+            "102 | Test Board B\n"
+            "103 | Test Board C\n", self.list_boards())
+
+    def test_list_boards_streamed(self):
+        """
+        With --stream, list_boards outputs the same table as it reads the
+        boards.
+        """
+        self.assertEqual(self.list_boards(), self.list_boards("--stream"))
+
+    def test_list_boards_json(self):
+        """
+        With --format json, list_boards outputs a JSON list of the boards.
+        """
+        self.assertEqual(
+            [{"id": "101", "title": "Test Board A"},
+             {"id": "102", "title": "Test Board B"},
+             {"id": "103", "title": "Test Board C"}],
+            json.loads(self.list_boards("--format", "json")))
+
+    def test_list_boards_csv_and_tsv(self):
+        """
+        With --format csv or tsv, list_boards outputs delimited rows with a
+        header.
+        """
+        self.assertEqual(
+            "id,title\n101,Test Board A\n102,Test Board B\n"
+            "103,Test Board C\n", self.list_boards("--format", "csv"))
+        self.assertEqual(
+            "id\ttitle\n101\tTest Board A\n102\tTest Board B\n"
+            "103\tTest Board C\n", self.list_boards("--format", "tsv"))
+
+    def test_stream_table_sampled_widths(self):
+        """
+        stream_table sizes the columns from the sampled rows, writing later
+        wider values in full.
+        """
+        row = namedtuple("Row", ["id", "title"])
+        rows = iter([row("1", "a"), row("2", "b"), row("3", "longer")])
+        stdout = StringIO()
+        scripts.stream_table(rows, output=stdout, sample=2)
+        self.assertEqual(
+            "id | title\n"
+            "---+------\n"
+            "1  | a    \n"
+            "2  | b    \n"
+            "3  | longer\n", stdout.getvalue())
+
+    def test_json_with_no_rows(self):
+        """
+        write_json outputs an empty list when there are no rows.
+        """
+        stdout = StringIO()
+        scripts.write_json(iter([]), output=stdout)
+        self.assertEqual([], json.loads(stdout.getvalue()))
+
+    def test_query(self):
+        """
+        query writes the cards on the boards that match the expression.
+        """
+        args = scripts.create_parser().parse_args(
+            ["--no-cache", "--format", "csv", "query", "type=Defect",
+             "101000"])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            scripts.query_cards(self.config, args, output=stdout)
+        self.assertEqual(
+            "board,lane,id,title,user,type\n"
+            "101000,Ready,101614,Sample 11,John Doe,Defect\n",
+            stdout.getvalue())
+
+    def test_search(self):
+        """
+        search indexes the boards given and writes the matching cards, later
+        searches use the saved index.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        parser = scripts.create_parser()
+        args = parser.parse_args(
+            ["--no-cache", "--cache-dir", directory, "--format", "csv",
+             "search", "sample 19", "101000"])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            scripts.search_cards(self.config, args, output=stdout)
+        self.assertEqual(
+            "board,id,title\n101000,101622,Sample 19\n", stdout.getvalue())
+
+        args = parser.parse_args(
+            ["--cache-dir", directory, "--format", "csv", "search", "samp"])
+        stdout = StringIO()
+        scripts.search_cards(self.config, args, output=stdout)
+        self.assertEqual(
+            "board,id,title\n101000,101614,Sample 11\n"
+            "101000,101622,Sample 19\n", stdout.getvalue())
+
+    def test_diff_board(self):
+        """
+        diff-board lists the changes between the board in a snapshot and
+        the current board.
+        """
+        from lucky.board import Boards, Card
+        from lucky.snapshot import SnapshotStore
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "before.db")
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            board = Boards(self.config).get(101000)
+        board.update_card(Card(None, 101614, "Old title", 101306, "John Doe"))
+        with SnapshotStore(path, self.config) as store:
+            store.save(board)
+
+        parser = scripts.create_parser()
+        args = parser.parse_args(
+            ["--no-cache", "--format", "csv", "diff-board", "101000", path])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json")):
+            scripts.diff_board(self.config, args, output=stdout)
+        self.assertEqual(
+            "change,card_id,before,after\n"
+            "retitled,101614,Old title,Sample 11\n", stdout.getvalue())
+
+    def test_watch(self):
+        """
+        watch writes the events from each board as JSON lines.
+        """
+        parser = scripts.create_parser()
+        args = parser.parse_args(
+            ["watch", "101000", "--min-interval", "0.001"])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json"),
+                     mock_url(r".*\/CheckForUpdates$",
+                              "check_for_updates.json"),
+                     mock_url(r".*\/GetCard\/101700$", "get_card.json")):
+            scripts.watch_boards(self.config, args, output=stdout, polls=2)
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(
+            ["CardMove", "CardDelete", "CardCreation"],
+            [event["Type"] for event in events])
+        self.assertEqual("101000", events[0]["BoardId"])
+        self.assertTrue(args.no_cache)
+
+    def test_watch_ignores_snapshot(self):
+        """
+        watch polls the current boards, not those in --snapshot.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "old.db")
+        parser = scripts.create_parser()
+        args = parser.parse_args(
+            ["--snapshot", path, "watch", "101000", "--min-interval",
+             "0.001"])
+        captured = []
+        with mock.patch("lucky.snapshot.SnapshotStore.get") as get, \
+                HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json",
+                                 captured),
+                        mock_url(r".*\/CheckForUpdates$",
+                                 "check_for_updates_none.json")):
+            scripts.watch_boards(
+                self.config, args, output=StringIO(), polls=2)
+        self.assertEqual(0, get.call_count)
+        self.assertEqual(1, len(captured))
+
+    def test_list_all_accounts(self):
+        """
+        list_all_accounts lists the boards in each of the accounts.
+        """
+        configs = [lucky.Config(account, "testing@example.com", "password")
+                   for account in ["first", "second"]]
+        args = scripts.create_parser().parse_args(
+            ["--all-accounts", "--format", "csv", "list-boards"])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards$", "get_boards.json")):
+            scripts.list_all_accounts(configs, args, output=stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual("account,id,title", lines[0])
+        self.assertEqual(
+            ["first", "first", "first", "second", "second", "second"],
+            sorted(line.split(",")[0] for line in lines[1:]))
+
+    def test_import_cards(self):
+        """
+        import-cards adds the cards from the files to the lane, and reports
+        the files that couldn't be parsed.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name, content in [
+                ("1.txt", "one\n----\nbody\n----\nhttp://example.com/1\n"),
+                ("2.txt", "two\n----\nbody\n----\nhttp://example.com/2\n"),
+                ("3.txt", "three\n")]:
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(content)
+        captured = []
+
+        @urlmatch(path=r".*\/Board\/12345\/AddCards$")
+        def mock_add_cards(url, request):
+            cards = json.loads(request.body)
+            captured.extend(cards)
+            return response(200, {
+                "ReplyCode": 201, "ReplyText": "Cards added",
+                "ReplyData": [[dict(card, Id=len(card["Title"]))
+                               for card in cards]]}, request=request)
+
+        parser = scripts.create_parser()
+        args = parser.parse_args([
+            "--no-cache", "--format", "csv", "import-cards", "12345", "101",
+            "5", directory])
+        stdout = StringIO()
+        with HTTMock(mock_add_cards):
+            scripts.import_cards(self.config, args, output=stdout)
+        self.assertEqual(
+            ["one", "two"], sorted(card["Title"] for card in captured))
+        self.assertEqual(101, captured[0]["LaneId"])
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual("file,card_id,error", lines[0])
+        self.assertEqual(
+            [os.path.join(directory, "1.txt") + ",3,",
+             os.path.join(directory, "2.txt") + ",3,"], sorted(lines[1:3]))
+        self.assertTrue(lines[3].startswith(
+            os.path.join(directory, "3.txt") + ",,"))
+
+    def test_export(self):
+        """
+        export writes the cards on the boards to a file.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "cards.csv")
+        parser = scripts.create_parser()
+        args = parser.parse_args(
+            ["--no-cache", "--format", "csv", "export", path, "101000"])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards\/\d+$", "get_board.json"),
+                     mock_url(r".*\/GetBoardIdentifiers$",
+                              "get_board_identifiers.json")):
+            scripts.export_cards(self.config, args, output=stdout)
+        self.assertEqual(
+            "file,format,boards,cards\n%s,csv,1,2\n" % path,
+            stdout.getvalue())
+        with open(path) as f:
+            self.assertEqual(3, len(f.readlines()))
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from httmock import HTTMock
+
+import lucky
+from lucky.board import Boards, Card
+from lucky.search import TitleIndex, tokenize
+from lucky.sync import BoardSync
+
+from .helpers import mock_url
+
+UPDATES_PATH = r".*\/Board\/101000\/BoardVersion\/212\/CheckForUpdates$"
+
+
+class TitleIndexTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.boards = Boards(config)
+        with HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json")):
+            self.board = self.boards.get(101000)
+        self.board.add_card(
+            101104, Card(None, 1, u"Fix the login page", 101306, None))
+        self.board.add_card(
+            101104, Card(None, 2, u"Log in with SSO", 101304, None))
+        self.index = TitleIndex()
+        self.index.add_board(self.board)
+
+    def tearDown(self):
+        self.index.close()
+
+    def matching(self, text, **kwargs):
+        return [hit.card_id for hit in self.index.search(text, **kwargs)]
+
+    def test_tokenize(self):
+        """
+        tokenize returns the lower-cased words.
+        """
+        self.assertEqual(
+            [u"fix", u"the", u"log", u"in", u"page"],
+            tokenize("Fix the log-in page!"))
+
+    def test_search(self):
+        """
+        Each word matches the start of a title word, and all must match.
+        """
+        self.assertEqual(4, len(self.index))
+        self.assertEqual([1, 2], self.matching("LOG"))
+        self.assertEqual([1], self.matching("login"))
+        self.assertEqual([1], self.matching("log pag"))
+        self.assertEqual([101614, 101622], self.matching("sample"))
+        self.assertEqual([101614], self.matching("sample 11"))
+        self.assertEqual([], self.matching("sample login"))
+        self.assertEqual([], self.matching(""))
+        self.assertEqual([1], self.matching("log", limit=1))
+        self.assertEqual([], self.matching("log", board_ids=[1]))
+        hit = self.index.search("sso")[0]
+        self.assertEqual((101000, 2, u"Log in with SSO"), hit)
+
+    def test_add_board_updates_changes(self):
+        """
+        Adding a board again re-indexes retitled cards and removes cards no
+        longer on it.
+        """
+        self.board.update_card(
+            Card(None, 1, u"Fix the signup page", 101306, None))
+        self.board.remove_card(2)
+        self.index.add_board(self.board)
+        self.assertEqual([], self.matching("log"))
+        self.assertEqual([1], self.matching("signup"))
+        self.assertNotIn((101000, 2), self.index)
+
+        self.index.remove_board(101000)
+        self.assertEqual(0, len(self.index))
+        self.assertEqual([], self.index.board_ids)
+
+    def test_apply_events(self):
+        """
+        Events from a BoardSync update the cards they refer to.
+        """
+        sync = BoardSync(self.boards, board=self.board)
+        with HTTMock(
+                mock_url(UPDATES_PATH, "check_for_updates.json"),
+                mock_url(r".*\/Board\/101000\/GetCard\/101700$",
+                         "get_card.json")):
+            events = sync.poll()
+        self.index.apply(self.board, events)
+        self.assertEqual([101622, 101700], self.matching("sample"))
+
+    def test_index_file(self):
+        """
+        An index kept in a file can be searched after it's reopened.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "titles.db")
+        with TitleIndex(path) as index:
+            self.assertFalse(index)
+            index.add_board(self.board)
+        with TitleIndex(path) as index:
+            self.assertTrue(index)
+            self.assertEqual(
+                [1, 2], [hit.card_id for hit in index.search("log")])
+            self.assertEqual([101000], index.board_ids)
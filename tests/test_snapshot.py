@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+from cStringIO import StringIO
+from unittest import TestCase
+
+from httmock import HTTMock
+
+import lucky
+from lucky import scripts
+from lucky.board import Boards
+from lucky.snapshot import SnapshotStore
+
+from .helpers import mock_url
+
+
+class SnapshotStoreTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "snapshot.db")
+        self.config = lucky.Config(
+            "testing", "testing@example.com", "password")
+        with HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json")):
+            self.board = Boards(self.config).get("101000")
+        self.store = SnapshotStore(self.path, self.config)
+        self.store.save(self.board)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_get(self):
+        """
+        SnapshotStore.get returns the board as it was saved.
+        """
+        board = self.store.get("101000")
+        self.assertEqual("Simple Board", board.title)
+        self.assertEqual(212, board.version)
+        self.assertEqual(self.board.card_types, board.card_types)
+        self.assertEqual(
+            [(lane.id, lane.title, [card.id for card in lane.cards])
+             for lane in self.board.lanes],
+            [(lane.id, lane.title, [card.id for card in lane.cards])
+             for lane in board.lanes])
+        self.assertIsNone(self.store.get(1))
+
+    def test_save_replaces_board(self):
+        """
+        Saving a board again replaces the earlier snapshot.
+        """
+        self.board.remove_card(101614)
+        self.store.save(self.board)
+        self.assertIsNone(self.store.get_card_by_id(101000, 101614))
+        self.assertEqual([(101000, u"Simple Board")],
+                         [row[:2] for row in self.store.list()])
+
+    def test_queries(self):
+        """
+        Lanes and cards can be read from the snapshot without loading the
+        board.
+        """
+        lane = self.store.get_lane_by_id(101000, 101107)
+        self.assertEqual("Ready", lane.title)
+        self.assertEqual([101614, 101622], [card.id for card in lane.cards])
+        self.assertEqual(
+            "Sample 19", self.store.get_card_by_id(101000, 101622).title)
+        self.assertEqual(
+            [101614],
+            [c.id for c in self.store.get_cards_by_user(101000, "John Doe")])
+        self.assertEqual(
+            [101622],
+            [c.id for c in self.store.get_cards_by_type(101000, 101304)])
+
+    def test_boards_reads_from_snapshot(self):
+        """
+        Boards.get returns boards from an open snapshot without a request.
+        """
+        boards = Boards(self.config)
+        boards.open_snapshot(self.path)
+        board = boards.get("101000")
+        boards.snapshot.close()
+        self.assertEqual("Simple Board", board.title)
+
+    def test_snapshot_command(self):
+        """
+        lucky snapshot saves the boards to the snapshot file.
+        """
+        path = os.path.join(self.directory, "other.db")
+        args = scripts.create_parser().parse_args(
+            ["--no-cache", "snapshot", path, "101000"])
+        stdout = StringIO()
+        with HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json")):
+            scripts.save_snapshot(self.config, args, output=stdout)
+        self.assertIn("Simple Board", stdout.getvalue())
+        with SnapshotStore(path) as store:
+            self.assertEqual("Simple Board", store.get(101000).title)
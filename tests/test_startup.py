@@ -0,0 +1,64 @@
+import subprocess
+import sys
+from os.path import abspath, dirname
+from unittest import TestCase
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+# Modules that take a noticeable time to import, and that the CLI should
+# only load once a subcommand needs the network.
+SLOW_MODULES = ["requests", "multiprocessing", "ssl", "httplib", "urllib2"]
+
+LOADED_MODULES = """
+import os
+import sys
+from lucky import scripts
+stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+sys.stderr = sys.stdout
+try:
+    scripts.create_parser().parse_args(sys.argv[1:])
+except SystemExit:
+    pass
+sys.stdout = stdout
+for name in %r:
+    if sys.modules.get(name) is not None:
+        print(name)
+""" % SLOW_MODULES
+
+
+def loaded_slow_modules(*args):
+    """
+    Returns the slow modules imported by parsing the command-line args in a
+    fresh interpreter.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-c", LOADED_MODULES] + list(args),
+        cwd=ROOT)
+    return output.decode("utf-8").split()
+
+
+class StartupTestCase(TestCase):
+
+    def test_help_imports(self):
+        """
+        lucky --help doesn't import the modules needed for requests.
+        """
+        self.assertEqual([], loaded_slow_modules("--help"))
+
+    def test_argument_error_imports(self):
+        """
+        Argument errors are reported without importing the modules needed
+        for requests.
+        """
+        self.assertEqual([], loaded_slow_modules("show-board"))
+
+    def test_library_imports(self):
+        """
+        Importing lucky.board doesn't import requests until a transport is
+        created.
+        """
+        output = subprocess.check_output(
+            [sys.executable, "-c",
+             "import sys, lucky.board; print('requests' in sys.modules)"],
+            cwd=ROOT)
+        self.assertEqual("False", output.decode("utf-8").strip())
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import json
+from unittest import TestCase
+
+from lucky.stream import iter_json
+
+from .helpers import load_fixture
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterJSONTestCase(TestCase):
+
+    def test_matching_items(self):
+        """
+        iter_json yields the values matching the pattern with their paths.
+        """
+        document = '{"ReplyCode": 200, "ReplyData": [[{"Id": 1}, {"Id": 2}]]}'
+        self.assertEqual(
+            [(("ReplyData", 0, 0), {"Id": 1}),
+             (("ReplyData", 0, 1), {"Id": 2})],
+            list(iter_json([document], [("ReplyData", 0, "*")])))
+
+    def test_small_chunks(self):
+        """
+        iter_json produces the same values however the document is split.
+        """
+        document = load_fixture("get_board.json")
+        expected = json.loads(document)["ReplyData"][0]
+        patterns = [("ReplyData", 0, "Lanes", "*"), ("ReplyData", 0, "Id")]
+        for size in [1, 3, 7, 4096]:
+            items = list(iter_json(chunked(document, size), patterns))
+            self.assertEqual(expected["Lanes"], [v for p, v in items[1:]])
+            self.assertEqual((("ReplyData", 0, "Id"), expected["Id"]),
+                             items[0])
+
+    def test_numbers_split_across_chunks(self):
+        """
+        A number at the end of a chunk is not decoded until it's complete.
+        """
+        items = list(iter_json(['[12', '34, 5', '6]'], [("*",)]))
+        self.assertEqual([((0,), 1234), ((1,), 56)], items)
+
+    def test_multibyte_characters_split_across_chunks(self):
+        """
+        UTF-8 characters split between chunks are decoded correctly.
+        """
+        document = u'["caf\xe9", "☃"]'.encode("utf-8")
+        items = list(iter_json(chunked(document, 1), [("*",)]))
+        self.assertEqual([u"caf\xe9", u"☃"], [v for p, v in items])
+
+    def test_invalid_document(self):
+        """
+        A truncated document raises a ValueError.
+        """
+        self.assertRaises(
+            ValueError, list, iter_json(['{"ReplyData": [1, '], [("x",)]))
@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from httmock import HTTMock
+
+import mock
+
+import lucky
+from lucky.board import Boards
+from lucky.sync import BoardSync, event_type
+
+from .helpers import load_fixture, mock_url
+
+UPDATES_PATH = r".*\/Board\/101000\/BoardVersion\/212\/CheckForUpdates$"
+
+
+class BoardSyncTestCase(TestCase):
+
+    def setUp(self):
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.boards = Boards(config)
+        with HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json")):
+            self.sync = BoardSync(self.boards, 101000)
+
+    def test_event_type(self):
+        """
+        event_type strips the suffixes from the event type.
+        """
+        self.assertEqual(
+            "CardMove", event_type({"EventType": "CardMoveEvent"}))
+        self.assertEqual(
+            "CardMove", event_type({"EventType": "CardMoveEventDTO"}))
+
+    def test_poll_without_updates(self):
+        """
+        BoardSync.poll() returns no events if the board hasn't changed.
+        """
+        captured = []
+        with HTTMock(mock_url(
+                UPDATES_PATH, "check_for_updates_none.json", captured)):
+            self.assertEqual([], self.sync.poll())
+        self.assertEqual(1, len(captured))
+        self.assertEqual(212, self.sync.version)
+
+    def test_poll_applies_events(self):
+        """
+        BoardSync.poll() moves, removes and adds cards in place, fetching only
+        the cards that were created.
+        """
+        captured = []
+        board = self.sync.board
+        with HTTMock(
+                mock_url(UPDATES_PATH, "check_for_updates.json", captured),
+                mock_url(r".*\/Board\/101000\/GetCard\/101700$",
+                         "get_card.json", captured)):
+            events = self.sync.poll()
+
+        self.assertEqual(3, len(events))
+        self.assertEqual(2, len(captured))
+        self.assertIs(board, self.sync.board)
+        self.assertEqual(215, board.version)
+        self.assertEqual(101108, board.get_lane_for_card(101622).id)
+        self.assertIsNone(board.get_card_by_id(101614))
+        self.assertEqual([], board.get_lane_by_id(101107).cards)
+        card = board.get_card_by_id(101700)
+        self.assertEqual("Sample 97", card.title)
+        self.assertEqual(101104, board.get_lane_for_card(101700).id)
+
+    def test_poll_card_archived(self):
+        """
+        BoardSync.poll() removes cards moved to a lane the board doesn't hold,
+        like the archive, and moves on to the new version.
+        """
+        board = self.sync.board
+        with HTTMock(mock_url(UPDATES_PATH, "check_for_updates_archive.json")):
+            events = self.sync.poll()
+        self.assertEqual(1, len(events))
+        self.assertEqual(213, board.version)
+        self.assertIsNone(board.get_card_by_id(101622))
+        self.assertIsNotNone(board.get_card_by_id(101614))
+
+    def test_apply_card_in_backlog(self):
+        """
+        BoardSync.apply() skips cards created in the backlog, and removes
+        cards changed that are now in it.
+        """
+        board = self.sync.board
+        data = json.loads(load_fixture("get_card.json"))["ReplyData"][0]
+        with mock.patch.object(
+                self.boards, "get_card_json",
+                side_effect=lambda board_id, card_id: dict(
+                    data, Id=card_id, LaneId=101101)):
+            self.sync.apply([
+                {"CardId": 101700, "EventType": "CardCreationEvent"},
+                {"CardId": 101614, "EventType": "CardMoveEvent"}])
+        self.assertIsNone(board.get_card_by_id(101700))
+        self.assertIsNone(board.get_card_by_id(101614))
+        self.assertEqual([101622], [
+            card.id for card in board.get_lane_by_id(101107).cards])
+
+    def test_refresh_ignores_snapshot(self):
+        """
+        BoardSync.refresh() fetches the board from LeanKit even when it's in
+        an open snapshot, which would take the board back to an old version.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with HTTMock(mock_url(r".*\/Boards\/101000$", "get_board.json")):
+            old = self.boards.get(101000)
+        old.version = 1
+        store = self.boards.open_snapshot(os.path.join(directory, "old.db"))
+        self.addCleanup(store.close)
+        store.save(old)
+
+        captured = []
+        with HTTMock(
+                mock_url(UPDATES_PATH, "check_for_updates_refresh.json"),
+                mock_url(r".*\/Boards\/101000$", "get_board.json",
+                         captured)):
+            self.sync.poll()
+        self.assertEqual(1, len(captured))
+        self.assertEqual(212, self.sync.version)
+
+    def test_poll_with_refresh(self):
+        """
+        BoardSync.poll() fetches the whole board when LeanKit reports that it
+        needs refreshing.
+        """
+        board = self.sync.board
+        with HTTMock(
+                mock_url(UPDATES_PATH, "check_for_updates_refresh.json"),
+                mock_url(r".*\/Boards\/101000$", "get_board.json")):
+            self.sync.poll()
+        self.assertIs(board, self.sync.board)
+        self.assertEqual(6, len(board.lanes))
@@ -0,0 +1,287 @@
+import json
+import threading
+from unittest import TestCase
+
+from httmock import HTTMock, response, urlmatch
+from requests.exceptions import ConnectionError
+
+import lucky
+from lucky.board import Boards
+from lucky.transport import (
+    RateLimiter, RetryPolicy, Transport, endpoint_for_url,
+    get_default_rate_limiter, get_default_transport, parse_retry_after)
+
+from .helpers import FakeClock, RawBody, load_fixture, mock_url
+
+BOARDS_URL = "https://testing.leankitkanban.com/Kanban/API/Boards"
+
+
+class FakeResponse(object):
+    status_code = 200
+
+    def __init__(self, data, url=None):
+        self.data = data
+        self.url = url
+
+    def json(self):
+        return self.data
+
+    def iter_content(self, chunk_size=1):
+        return iter([json.dumps(self.data)])
+
+    def close(self):
+        pass
+
+
+class FakeTransport(object):
+    """
+    Stand-in transport that records the requests made and replies with
+    canned data.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+
+    def get(self, url, auth=None, **kwargs):
+        self.requests.append((url, auth))
+        return FakeResponse(self.data, url)
+
+
+class TransportTestCase(TestCase):
+
+    def test_pool_configuration(self):
+        """
+        Transport mounts adapters configured with the pool sizes on the
+        session.
+        """
+        transport = Transport(pool_connections=3, pool_maxsize=7,
+                              pool_block=True)
+        adapter = transport.session.get_adapter("https://example.com/")
+        self.assertEqual(3, adapter._pool_connections)
+        self.assertEqual(7, adapter._pool_maxsize)
+        self.assertEqual(True, adapter._pool_block)
+
+    def test_disable_keep_alive(self):
+        """
+        With keep_alive disabled, connections are closed after each request.
+        """
+        transport = Transport(keep_alive=False)
+        self.assertEqual("close", transport.session.headers["Connection"])
+
+    def test_get_uses_session(self):
+        """
+        Transport.get makes the request through the pooled session with the
+        supplied credentials.
+        """
+        captured = []
+        transport = Transport()
+        with HTTMock(mock_url(r".*\/Boards$", "get_boards.json", captured)):
+            transport.get(BOARDS_URL,
+                          auth=("testing@example.com", "password"))
+        self.assertEqual(1, len(captured))
+        self.assertEqual(
+            "Basic dGVzdGluZ0BleGFtcGxlLmNvbTpwYXNzd29yZA==",
+            captured[0].headers["Authorization"])
+
+    def test_default_transport_is_shared(self):
+        """
+        Boards created without a transport share the default transport.
+        """
+        config = lucky.Config("testing", "testing@example.com", "password")
+        self.assertIs(get_default_transport(), Boards(config).transport)
+        self.assertIs(Boards(config).transport, Boards(config).transport)
+
+    def test_custom_transport(self):
+        """
+        Boards makes its requests through the supplied transport.
+        """
+        config = lucky.Config("testing", "testing@example.com", "password")
+        transport = FakeTransport(json.loads(load_fixture("get_boards.json")))
+        boards = list(Boards(config, transport=transport).list())
+        self.assertEqual(3, len(boards))
+        self.assertEqual(
+            [("https://testing.leankitkanban.com/Kanban/API/Boards",
+              ("testing@example.com", "password"))], transport.requests)
+
+
+def mock_statuses(captured, statuses, headers=None):
+    """
+    Replies with each of the statuses in turn, then with the boards.
+    """
+    statuses = list(statuses)
+    data = load_fixture("get_boards.json")
+
+    @urlmatch(path=r".*\/Boards$")
+    def mock_request(url, request):
+        captured.append(request)
+        status = statuses.pop(0) if statuses else 200
+        result = response(status, data, headers, request=request)
+        result.raw = RawBody(data)
+        return result
+    return mock_request
+
+
+class RateLimiterTestCase(TestCase):
+
+    def test_burst_then_rate(self):
+        """
+        RateLimiter allows a burst of requests, then waits to keep to the
+        rate.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+        for i in range(3):
+            limiter.acquire()
+        self.assertEqual([], clock.sleeps)
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual([0.5, 0.5], clock.sleeps)
+
+    def test_default_rate_limiter_is_shared(self):
+        """
+        Transports share the default rate limiter.
+        """
+        self.assertIs(get_default_rate_limiter(), Transport().rate_limiter)
+        self.assertIs(Transport().rate_limiter, Transport().rate_limiter)
+
+
+class RetryTestCase(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.transport = Transport(
+            retry=RetryPolicy(max_retries=2, random=lambda: 1.0),
+            sleep=self.clock.sleep)
+
+    def test_parse_retry_after(self):
+        """
+        Retry-After can be a number of seconds or an HTTP date.
+        """
+        self.assertEqual(120, parse_retry_after("120"))
+        self.assertEqual(
+            30, parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT",
+                                  clock=lambda: 30))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_retries_with_backoff(self):
+        """
+        Failed requests are retried with exponential backoff.
+        """
+        captured = []
+        with HTTMock(mock_statuses(captured, [503, 502])):
+            result = self.transport.get(BOARDS_URL)
+        self.assertEqual(200, result.status_code)
+        self.assertEqual(3, len(captured))
+        self.assertEqual([0.5, 1.0], self.clock.sleeps)
+
+    def test_retry_after(self):
+        """
+        Retries wait for as long as the server asks with Retry-After.
+        """
+        captured = []
+        with HTTMock(mock_statuses(captured, [429], {"Retry-After": "7"})):
+            self.transport.get(BOARDS_URL)
+        self.assertEqual([7], self.clock.sleeps)
+
+    def test_gives_up_after_max_retries(self):
+        """
+        The last failed response is returned once max_retries is reached.
+        """
+        captured = []
+        with HTTMock(mock_statuses(captured, [503, 503, 503])):
+            result = self.transport.get(BOARDS_URL)
+        self.assertEqual(503, result.status_code)
+        self.assertEqual(3, len(captured))
+        stats = self.transport.stats["/Kanban/API/Boards"]
+        self.assertEqual((3, 2, 1), (stats.requests, stats.retries,
+                                     stats.errors))
+
+    def test_retries_connection_errors(self):
+        """
+        Connection errors are retried, and raised once max_retries is
+        reached.
+        """
+        @urlmatch(path=r".*\/Boards$")
+        def mock_request(url, request):
+            raise ConnectionError("refused")
+
+        with HTTMock(mock_request):
+            self.assertRaises(
+                ConnectionError, self.transport.get, BOARDS_URL)
+        self.assertEqual(2, len(self.clock.sleeps))
+
+    def test_posts_retried_when_rate_limited(self):
+        """
+        POSTs are retried when the server rejects them with a 429.
+        """
+        captured = []
+        with HTTMock(mock_statuses(captured, [429])):
+            result = self.transport.post(BOARDS_URL, data="[]")
+        self.assertEqual(200, result.status_code)
+        self.assertEqual(["POST", "POST"],
+                         [request.method for request in captured])
+
+    def test_posts_not_retried_on_errors(self):
+        """
+        POSTs aren't retried after server errors, as they may have been
+        processed.
+        """
+        captured = []
+        with HTTMock(mock_statuses(captured, [503])):
+            result = self.transport.post(BOARDS_URL, data="[]")
+        self.assertEqual(503, result.status_code)
+        self.assertEqual(1, len(captured))
+        self.assertEqual([], self.clock.sleeps)
+
+
+class CoalescingTestCase(TestCase):
+
+    def test_endpoint_for_url(self):
+        """
+        Numeric ids are replaced in the endpoint names.
+        """
+        self.assertEqual(
+            "/Kanban/API/Board/{id}/GetCard/{id}",
+            endpoint_for_url(
+                "https://testing.leankitkanban.com/Kanban/API/Board/101/"
+                "GetCard/102"))
+
+    def test_concurrent_requests_are_shared(self):
+        """
+        Identical GETs made while one is in flight share its response.
+        """
+        transport = Transport()
+        captured = []
+        waiting = threading.Event()
+        release = threading.Event()
+        data = load_fixture("get_boards.json")
+
+        @urlmatch(path=r".*\/Boards$")
+        def mock_request(url, request):
+            captured.append(request)
+            waiting.set()
+            release.wait(5)
+            return data
+
+        results = []
+
+        def fetch():
+            results.append(transport.get(BOARDS_URL, auth=("a", "b")))
+
+        with HTTMock(mock_request):
+            first = threading.Thread(target=fetch)
+            first.start()
+            waiting.wait(5)
+            second = threading.Thread(target=fetch)
+            second.start()
+            while not getattr(transport.stats.get("/Kanban/API/Boards"),
+                              "coalesced", 0):
+                second.join(0.01)
+            release.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual(1, len(captured))
+        self.assertEqual(2, len(results))
+        self.assertIs(results[0], results[1])
@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+from lucky.board import Board
+from lucky.watch import BoardWatcher
+
+from .helpers import FakeClock
+
+
+class FakeBoards(object):
+    """
+    Reports the events in updates[board_id] on each poll, or raises them if
+    they're an exception.
+    """
+
+    def __init__(self, updates):
+        self.updates = updates
+        self.polled = []
+
+    def get(self, board_id):
+        board = Board(None, board_id, "Board %s" % board_id, "", True)
+        board.version = 1
+        return board
+
+    def check_for_updates(self, board_id, version):
+        self.polled.append(board_id)
+        events = self.updates.get(board_id, [])
+        if isinstance(events, Exception):
+            raise events
+        return {"HasUpdates": bool(events), "CurrentBoardVersion": version + 1,
+                "Events": events}
+
+
+def deleted(card_id):
+    return {"CardId": card_id, "EventType": "CardDeleteEvent"}
+
+
+class BoardWatcherTestCase(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.events = []
+        self.errors = []
+
+    def watcher(self, boards, board_ids):
+        return BoardWatcher(
+            boards, board_ids,
+            lambda board_id, event: self.events.append((board_id, event)),
+            lambda board_id, error: self.errors.append((board_id, error)),
+            min_interval=4, max_interval=60, clock=self.clock,
+            sleep=self.clock.sleep, random=lambda: 0.5)
+
+    def test_first_polls_are_spread(self):
+        """
+        The first poll of each board is spread over min_interval.
+        """
+        watcher = self.watcher(FakeBoards({}), [1, 2, 3, 4])
+        polled = []
+        for i in range(4):
+            polled.append(watcher.poll_due())
+            self.clock.sleep(1)
+        self.assertEqual([1, 1, 1, 1], polled)
+
+    def test_intervals_adapt_to_activity(self):
+        """
+        Busy boards are polled at min_interval, and quiet boards back off to
+        max_interval.
+        """
+        boards = FakeBoards({1: [deleted(10)]})
+        watcher = self.watcher(boards, [1, 2])
+        watcher.run(polls=40)
+        self.assertEqual(4, watcher.watched[1].interval)
+        self.assertEqual(60, watcher.watched[2].interval)
+        self.assertTrue(boards.polled.count(1) > 5 * boards.polled.count(2))
+        self.assertEqual((1, deleted(10)), self.events[0])
+
+    def test_errors_are_reported(self):
+        """
+        Failed polls are passed to the error callback, and the board is
+        polled again later.
+        """
+        error = ValueError("failed")
+        watcher = self.watcher(FakeBoards({1: error}), [1])
+        watcher.run(polls=3)
+        self.assertEqual([(1, error), (1, error)], self.errors)
+        self.assertEqual(2, watcher.watched[1].errors)